@@ -1,27 +1,144 @@
 import argparse
+import asyncio
 import csv
 import glob
+import itertools
 import json
 import logging
+import math
 from logging import Logger
 import os
 import re
+import sys
+from contextlib import ExitStack
 from pathlib import Path
-from time import time
-from typing import Any
+from time import perf_counter
+from typing import Any, Callable, Optional
 from dotenv import load_dotenv
 from tabulate import tabulate
 
-import adbc_driver_postgresql.dbapi
-import adbc_driver_snowflake.dbapi
-from turbodbc import Megabytes, connect, make_options
-from python_libs.config import Database, Location, read_config
-from python_libs.result import JavaResult, PythonResult, PythonResults
+from python_libs.async_drivers import AsyncDriverPlugin, LoopStallMonitor
+from python_libs.cache import ResultCache, matches_any
+from python_libs.attribution import run_attribution
+from python_libs.cold_start import run_cold_start
+from python_libs.config import (
+    AsyncConfig,
+    Database,
+    Location,
+    ProfilingConfig,
+    QueryConfig,
+    SinkConfig,
+    read_config,
+)
+from python_libs.consumers import CONSUMER_MODES, CONVERSION_MODES, BatchConsumer, make_consumer
+from python_libs.conversion import STRINGS_PLAIN, record_conversion
+from python_libs.drivers import DriverPlugin, driver_version, select_drivers
+from python_libs.history import append_run, compare_runs, make_run_id, make_run_info, read_history, select_runs
+from python_libs.load import run_load
+from python_libs.memory import MemoryTracker
+from python_libs.metrics import FetchMetrics
+from python_libs.netem_proxy import start_location_proxies
+from python_libs.partition import PartitionedDriver, make_partitioned_drivers
+from python_libs.pooling import check_strategy, run_pooling
+from python_libs.profiling import make_profiler, profile_extension
+from python_libs.result import (
+    AttributionResult,
+    ColdStartResult,
+    ComparisonResult,
+    CostModelResult,
+    CrossoverResult,
+    DurationStats,
+    IterationMetrics,
+    JavaResult,
+    JvmMetrics,
+    LoadResult,
+    PoolingResult,
+    PrepareResult,
+    PythonResult,
+    PythonResults,
+    TuningResult,
+)
+from python_libs.scaling import fastest_by_rows, find_crossovers, fit_cost_models, sweep_limits
+from python_libs.sinks import SINK_FILE_EXTENSIONS, SinkConsumer
+from python_libs.stats import IterationSchedule, summarize
+from python_libs.tpch import load_lineitem
+from python_libs.tuning import tune_driver
 
 PATH_TO_RESULTS = Path("results")
 PATH_TO_RESULT_FILES = PATH_TO_RESULTS / "result_files"
+PATH_TO_PROFILES = PATH_TO_RESULTS / "profiles"
 ERROR_MSG = "Error"
 UNSUPPORTED_MSG = "Unsupported"
+MODE_BENCHMARK = "benchmark"
+MODE_LOAD = "load"
+MODE_PREPARE = "prepare"
+MODE_COMPARE = "compare"
+MODE_COLD_START = "cold-start"
+MODE_POOLING = "pooling"
+MODE_TUNE = "tune"
+MODE_ATTRIBUTION = "attribution"
+MODE_SWEEP = "sweep"
+
+
+def bytes_to_mb(value: Optional[int]) -> Optional[float]:
+    return value / 1024 / 1024 if value is not None else None
+
+
+def cpu_per_row_us(iteration: IterationMetrics) -> Optional[float]:
+    if iteration.user_cpu is None or not iteration.rows:
+        return None
+    return (iteration.user_cpu + iteration.system_cpu) * 1000 / iteration.rows
+
+
+# Streaming metrics columns of the report: header and value getter of one iteration
+ITERATION_COLUMNS: list[tuple[str, Callable[[IterationMetrics], Optional[float]]]] = [
+    ("Execute", lambda it: it.execute_duration),
+    ("First batch", lambda it: it.first_batch_duration),
+    ("Fetch", lambda it: it.fetch_duration),
+    ("Write", lambda it: it.write_duration),
+    ("Written MB", lambda it: bytes_to_mb(it.written_bytes)),
+    ("Convert", lambda it: it.conversion_duration),
+    ("Dataframe MB", lambda it: bytes_to_mb(it.dataframe_bytes)),
+    ("Copied MB", lambda it: bytes_to_mb(it.copied_bytes)),
+    # Share of zero-copy iterations
+    ("Zero-copy", lambda it: float(it.zero_copy) if it.zero_copy is not None else None),
+    ("Rows", lambda it: it.rows),
+    ("Batches", lambda it: len(it.batches)),
+    ("Rows/s", lambda it: it.rows_per_sec),
+    ("MB/s", lambda it: it.mb_per_sec),
+    ("User CPU", lambda it: it.user_cpu),
+    ("System CPU", lambda it: it.system_cpu),
+    ("CPU us/row", lambda it: cpu_per_row_us(it)),
+    ("Peak RSS MB", lambda it: bytes_to_mb(it.memory.peak_rss_delta) if it.memory else None),
+    ("Arrow peak MB", lambda it: bytes_to_mb(it.memory.arrow_peak) if it.memory else None),
+    ("Arrow allocated MB", lambda it: bytes_to_mb(it.memory.arrow_allocated) if it.memory else None),
+    ("Native heap MB", lambda it: bytes_to_mb(it.memory.native_heap_delta) if it.memory else None),
+    ("Retained MB", lambda it: bytes_to_mb(it.memory.retained_bytes) if it.memory else None),
+]
+
+# JMH statistics and gc profiler metrics of Java results, next to memory columns of Python results
+JVM_COLUMNS: list[tuple[str, Callable[[JvmMetrics], Optional[float]]]] = [
+    ("JMH error", lambda jvm: jvm.score_error),
+    ("JMH p99", lambda jvm: jvm.percentiles.get("99.0")),
+    ("Alloc MB/s", lambda jvm: jvm.alloc_mb_per_sec),
+    ("Alloc B/op", lambda jvm: jvm.alloc_bytes_per_op),
+    ("Alloc B/row", lambda jvm: jvm.alloc_bytes_per_row),
+    ("GC count", lambda jvm: jvm.gc_count),
+    ("GC ms", lambda jvm: jvm.gc_time),
+    ("JVM CPU ms", lambda jvm: jvm.cpu_time_per_op),
+    ("JVM CPU us/row", lambda jvm: jvm.cpu_time_per_row_us),
+]
+
+# Duration statistics of measured iterations of one result
+STATS_COLUMNS: list[tuple[str, Callable[[DurationStats], float]]] = [
+    ("Median", lambda stats: stats.median),
+    ("p95", lambda stats: stats.p95),
+    ("Std", lambda stats: stats.stdev),
+    ("CI low", lambda stats: stats.ci_low),
+    ("CI high", lambda stats: stats.ci_high),
+    ("Outliers", lambda stats: stats.outliers),
+    ("Iterations", lambda stats: stats.iterations),
+]
 
 
 class PoCDbDriversExecutor:
@@ -37,7 +154,7 @@ class PoCDbDriversExecutor:
 
     @staticmethod
     def get_duration(start):
-        return int((time() - start) * 1000)
+        return (perf_counter() - start) * 1000
 
     def info(self, use_case, msg, iteration=None):
         if iteration:
@@ -51,29 +168,6 @@ class PoCDbDriversExecutor:
         cursor.execute(query)
         return cursor
 
-    @staticmethod
-    def execute_and_fetch_arrow_turbodbc(connection, query):
-        row_count = 0
-        with connection.cursor() as cursor:
-            cursor.execute(query)
-            batches = cursor.fetcharrowbatches()
-            for batch in batches:
-                row_count += batch.num_rows
-                # result.extend(batch)
-            return row_count
-
-    @staticmethod
-    def execute_and_fetch_arrow_adbc(connection, query):
-        row_count = 0
-        result = []
-        with connection.cursor() as cursor:
-            cursor.execute(query)
-            batches = cursor.fetch_record_batch()
-            for batch in batches:
-                row_count += batch.num_rows
-                result.extend(batch)
-            return row_count
-
     def execute_and_fetch_standard(self, connection, query):
         with self.execute_select(connection, query) as cursor:
             return cursor.fetchall()
@@ -81,16 +175,16 @@ class PoCDbDriversExecutor:
     def report_fetch_finished(self, use_case, iteration, duration, rows=None):
         if rows:
             self.info(
-                use_case, f"Cursor fetch finished in {duration} ms {rows=}", iteration
+                use_case, f"Cursor fetch finished in {duration:.2f} ms {rows=}", iteration
             )
         else:
-            self.info(use_case, f"Cursor fetch finished in {duration} ms", iteration)
+            self.info(use_case, f"Cursor fetch finished in {duration:.2f} ms", iteration)
 
     def report_file_write_finished(self, use_case, duration):
-        self.info(use_case, f"Write to file finished in {duration} ms")
+        self.info(use_case, f"Write to file finished in {duration:.2f} ms")
 
     def report_finished(self, use_case, duration):
-        self.info(use_case, f"Use case finished in {duration} ms")
+        self.info(use_case, f"Use case finished in {duration:.2f} ms")
 
     @staticmethod
     def average(lst: list[float]) -> float:
@@ -107,26 +201,143 @@ class PoCDbDriversExecutor:
         query: str,
         connect_func,
         connect_params: dict[str, Any],
-        iterations: int,
+        schedule: IterationSchedule,
         exec_fetch_func,
+        consumer_mode: str,
+        sink_config: Optional[SinkConfig] = None,
+        profiling: Optional[ProfilingConfig] = None,
+        strings: str = STRINGS_PLAIN,
+    ) -> PythonResult:
+        use_case = self.make_use_case(connection_type, location.name, database.name)
+        self.logger.debug(f"Running use case {use_case}")
+        durations = []
+        iteration_metrics = []
+        error = None
+        profile_file = None
+        memory_tracker = MemoryTracker()
+        try:
+            with connect_func(**connect_params) as connection, ExitStack() as profile_stack:
+                for i, warmup in schedule.run(durations):
+                    label = f"warmup {i}" if warmup else i
+                    if profiling is not None and not warmup and profile_file is None:
+                        # Measured iterations follow warmup iterations, they are profiled until the loop ends
+                        profile_file = self.make_profile_path(use_case, limit, profiling)
+                        profile_stack.enter_context(make_profiler(profiling, profile_file))
+                    self.info(use_case, "START", label)
+                    memory_tracker.start()
+                    consumer = make_consumer(consumer_mode, strings)
+                    if sink_config is not None:
+                        consumer = SinkConsumer(consumer, self.make_sink_path(use_case, limit, sink_config), sink_config)
+                    metrics = FetchMetrics()
+                    try:
+                        result = exec_fetch_func(connection, query, metrics, consumer)
+                        metrics.mark_fetched()
+                        consumer.finish()
+                    finally:
+                        # A failed fetch must not leave the sink writer thread blocked or its file without footer
+                        consumer.close()
+                    metrics.finish()
+                    iteration = metrics.to_result()
+                    iteration.memory = memory_tracker.stop(consumer.retained_bytes)
+                    if isinstance(consumer, SinkConsumer):
+                        iteration.write_duration = consumer.write_duration
+                        iteration.written_bytes = consumer.written_bytes
+                    record_conversion(iteration, [consumer])
+                    # Release fetched data before the next iteration
+                    del consumer
+                    self.report_fetch_finished(use_case, label, iteration.duration, result)
+                    if not warmup:
+                        durations.append(iteration.duration)
+                        iteration_metrics.append(iteration)
+        except Exception as e:
+            self.logger.error(f"Error running use case {use_case}: {e}")
+            error = str(e)
+        finally:
+            return PythonResult(
+                limit=limit,
+                location=location.name,
+                database=database.name,
+                connection_type=connection_type,
+                durations=durations,
+                avg_duration=self.average(durations),
+                error=error,
+                iterations=iteration_metrics,
+                consumer=consumer_mode,
+                stats=summarize(durations),
+                profile_file=str(profile_file) if profile_file else None,
+            )
+
+    async def execute_use_case_async(
+        self,
+        connection_type: str,
+        limit: int,
+        location: Location,
+        database: Database,
+        query: str,
+        driver: AsyncDriverPlugin,
+        in_flight: int,
+        schedule: IterationSchedule,
+        async_config: AsyncConfig,
+        consumer_mode: str,
+        profiling: Optional[ProfilingConfig] = None,
+        strings: str = STRINGS_PLAIN,
     ) -> PythonResult:
+        """
+        Asyncio variant of execute_use_case. Each iteration runs in_flight concurrent queries
+        on one event loop, each on its own connection, and measures event loop stalls.
+        """
         use_case = self.make_use_case(connection_type, location.name, database.name)
         self.logger.debug(f"Running use case {use_case}")
         durations = []
+        iteration_metrics = []
+        loop_stalls = []
+        max_loop_stall = 0.0
         error = None
+        connections = []
+        profile_file = None
+        profile_stack = ExitStack()
+        monitor = LoopStallMonitor(async_config.stall_interval_ms, async_config.stall_threshold_ms)
+        memory_tracker = MemoryTracker()
         try:
-            with connect_func(**connect_params) as connection:
-                for i in range(1, iterations + 1):
-                    start = time()
-                    self.info(use_case, "START", i)
-                    result = exec_fetch_func(connection, query)
-                    duration = self.get_duration(start)
-                    self.report_fetch_finished(use_case, i, duration, result)
-                    durations.append(duration)
+            opened = await asyncio.gather(*(driver.connect(database) for _ in range(in_flight)), return_exceptions=True)
+            # Connections that opened are closed in finally, also when others failed
+            connections = [c for c in opened if not isinstance(c, BaseException)]
+            failures = [c for c in opened if isinstance(c, BaseException)]
+            if failures:
+                raise failures[0]
+            for i, warmup in schedule.run(durations):
+                label = f"warmup {i}" if warmup else i
+                if profiling is not None and not warmup and profile_file is None:
+                    profile_file = self.make_profile_path(use_case, limit, profiling)
+                    profile_stack.enter_context(make_profiler(profiling, profile_file))
+                self.info(use_case, "START", label)
+                memory_tracker.start()
+                consumers = [make_consumer(consumer_mode, strings) for _ in connections]
+                query_metrics = [FetchMetrics() for _ in connections]
+                async with monitor:
+                    rows = await asyncio.gather(
+                        *(
+                            self.fetch_async(driver, connection, query, metrics, consumer)
+                            for connection, metrics, consumer in zip(connections, query_metrics, consumers)
+                        )
+                    )
+                iteration = FetchMetrics.merge(query_metrics).to_result()
+                iteration.memory = memory_tracker.stop(sum(c.retained_bytes for c in consumers))
+                record_conversion(iteration, consumers)
+                del consumers
+                self.report_fetch_finished(use_case, label, iteration.duration, sum(rows))
+                if not warmup:
+                    durations.append(iteration.duration)
+                    iteration_metrics.append(iteration)
+                    loop_stalls.append(monitor.stall_ms)
+                    max_loop_stall = max(max_loop_stall, monitor.max_stall_ms)
         except Exception as e:
             self.logger.error(f"Error running use case {use_case}: {e}")
             error = str(e)
         finally:
+            profile_stack.close()
+            for connection in connections:
+                await driver.close(connection)
             return PythonResult(
                 limit=limit,
                 location=location.name,
@@ -135,8 +346,32 @@ class PoCDbDriversExecutor:
                 durations=durations,
                 avg_duration=self.average(durations),
                 error=error,
+                loop_stalls=loop_stalls,
+                max_loop_stall=max_loop_stall,
+                iterations=iteration_metrics,
+                consumer=consumer_mode,
+                stats=summarize(durations),
+                profile_file=str(profile_file) if profile_file else None,
             )
 
+    @staticmethod
+    async def fetch_async(
+        driver: AsyncDriverPlugin, connection, query: str, metrics: FetchMetrics, consumer: BatchConsumer
+    ) -> int:
+        rows = await driver.fetch(connection, query, metrics, consumer)
+        metrics.mark_fetched()
+        consumer.finish()
+        metrics.finish()
+        return rows
+
+    @staticmethod
+    def make_sink_path(use_case: str, limit: int, sink_config: SinkConfig) -> Path:
+        return PATH_TO_RESULT_FILES / f"result_{use_case}_{limit}.{SINK_FILE_EXTENSIONS[sink_config.format]}"
+
+    @staticmethod
+    def make_profile_path(use_case: str, limit: int, profiling: ProfilingConfig) -> Path:
+        return PATH_TO_PROFILES / f"profile_{use_case}_{limit}.{profile_extension(profiling)}"
+
     @staticmethod
     def make_use_case(connection_type, location, db_name):
         return f"{connection_type}_{location}_{db_name}"
@@ -154,75 +389,180 @@ class PoCDbDriversExecutor:
         if not os.path.exists(PATH_TO_RESULT_FILES):
             os.makedirs(PATH_TO_RESULT_FILES)
 
+    @staticmethod
+    def average_or_none(values: list[Optional[float]]) -> Optional[str]:
+        values = [v for v in values if v is not None]
+        if not values:
+            return None
+        return f"{PoCDbDriversExecutor.average(values):.2f}"
+
+    @staticmethod
+    def format_stats(stats: Optional[DurationStats], write_to_csv: bool) -> list[Any]:
+        if stats is None:
+            return [None] * len(STATS_COLUMNS)
+        values = [get_value(stats) for _, get_value in STATS_COLUMNS]
+        if write_to_csv:
+            return values
+        return [f"{v:.2f}" if isinstance(v, float) else v for v in values]
+
+    @staticmethod
+    def format_jvm(jvm: Optional[JvmMetrics], write_to_csv: bool) -> list[Any]:
+        if jvm is None:
+            return [None] * len(JVM_COLUMNS)
+        values = [get_value(jvm) for _, get_value in JVM_COLUMNS]
+        if write_to_csv:
+            return values
+        return [f"{v:.2f}" if v is not None else None for v in values]
+
     @staticmethod
     def get_report_results_table_without_write(
         results: PythonResults, write_to_csv=False
     ):
         rows = []
-        header = ["Limit", "Location", "Database", "Connection type", "Duration"]
+        header = ["Query", "Limit", "Location", "Database", "Connection type", "Consumer", "Duration"]
+        header += [column for column, _ in STATS_COLUMNS] + ["Loop stall"]
+        header += [column for column, _ in ITERATION_COLUMNS]
+        header += [column for column, _ in JVM_COLUMNS]
         for result in results.results:
+            keys = [result.query, result.limit, result.location, result.database, result.connection_type, result.consumer]
             if not write_to_csv and result.error:
-                rows.append(
-                    [
-                        result.limit,
-                        result.location,
-                        result.database,
-                        result.connection_type,
-                        result.error,
-                    ]
-                )
+                rows.append(keys + [result.error] + [None] * (len(header) - len(keys) - 1))
             else:
+                stats = PoCDbDriversExecutor.format_stats(result.stats, write_to_csv)
+                jvm = PoCDbDriversExecutor.format_jvm(result.jvm, write_to_csv)
                 if write_to_csv:
-                    # Write all executions to CSV
-                    for duration in result.durations:
+                    # Write all executions to CSV, statistics of the result are repeated in each row
+                    for i, duration in enumerate(result.durations):
+                        iteration = result.iterations[i] if result.iterations else None
                         rows.append(
-                            [
-                                result.limit,
-                                result.location,
-                                result.database,
-                                result.connection_type,
-                                duration,
-                            ]
+                            keys
+                            + [duration]
+                            + stats
+                            + [result.loop_stalls[i] if result.loop_stalls else None]
+                            + [get_value(iteration) if iteration else None for _, get_value in ITERATION_COLUMNS]
+                            + jvm
                         )
                 else:
                     # Report only average duration to STDOUT, limit decimal points to 2
                     rows.append(
-                        [
-                            result.limit,
-                            result.location,
-                            result.database,
-                            result.connection_type,
-                            f"{result.avg_duration:.2f}",
+                        keys
+                        + [f"{result.avg_duration:.2f}"]
+                        + stats
+                        + [PoCDbDriversExecutor.average_or_none(result.loop_stalls)]
+                        + [
+                            PoCDbDriversExecutor.average_or_none([get_value(it) for it in result.iterations])
+                            for _, get_value in ITERATION_COLUMNS
                         ]
+                        + jvm
                     )
         return header, rows
 
-    def read_java_result(self, file, location, database) -> list[PythonResult]:
+    @staticmethod
+    def get_batch_results_table(results: PythonResults):
+        header = [
+            "Query", "Limit", "Location", "Database", "Connection type", "Iteration", "Batch", "Arrival ms", "Rows", "Bytes",
+        ]
+        rows = [
+            [
+                result.query, result.limit, result.location, result.database, result.connection_type,
+                i, j, batch.arrival, batch.rows, batch.nbytes,
+            ]
+            for result in results.results
+            for i, iteration in enumerate(result.iterations, start=1)
+            for j, batch in enumerate(iteration.batches, start=1)
+        ]
+        return header, rows
+
+    def write_batch_results_csv(self, results: PythonResults, result_file):
+        header, rows = self.get_batch_results_table(results)
+        self.write_csv(header, rows, result_file)
+
+    @staticmethod
+    def median_rows_per_sec(result: PythonResult) -> Optional[float]:
+        if result.stats is None or not result.stats.median:
+            return None
+        # The Java runner does not report row counts, queries return limit rows
+        rows = result.iterations[0].rows if result.iterations else result.limit
+        return rows / result.stats.median * 1000
+
+    @staticmethod
+    def get_query_throughput_table(results: PythonResults):
+        """
+        Median rows/s with one column per query, so decoding costs of data types can be compared per driver.
+        """
+        queries = list(dict.fromkeys(result.query for result in results.results))
+        header = ["Limit", "Location", "Database", "Connection type"] + [f"{query} rows/s" for query in queries]
+        cells: dict[tuple, dict[Optional[str], Optional[float]]] = {}
+        for result in results.results:
+            keys = (result.limit, result.location, result.database, result.connection_type)
+            cells.setdefault(keys, {})[result.query] = PoCDbDriversExecutor.median_rows_per_sec(result)
+        rows = [
+            list(keys) + [f"{value:.0f}" if (value := values.get(query)) is not None else None for query in queries]
+            for keys, values in cells.items()
+        ]
+        return header, rows
+
+    def report_query_throughput(self, results: PythonResults):
+        header, rows = self.get_query_throughput_table(results)
+        print(tabulate(rows, headers=header, tablefmt="psql"))
+
+    def write_query_throughput_csv(self, results: PythonResults, result_file):
+        header, rows = self.get_query_throughput_table(results)
+        self.write_csv(header, rows, result_file)
+
+    @staticmethod
+    def make_jvm_metrics(java_result: JavaResult, limit: int) -> JvmMetrics:
+        primary = java_result.primaryMetric
+        secondary = {name.lstrip("·"): metric.score for name, metric in java_result.secondaryMetrics.items()}
+        alloc_bytes_per_op = secondary.get("gc.alloc.rate.norm")
+        cpu_time_per_op = secondary.get("cpu.time.norm")
+        return JvmMetrics(
+            score=primary.score,
+            score_error=primary.scoreError if primary.scoreError is not None and not math.isnan(primary.scoreError) else None,
+            percentiles=primary.scorePercentiles,
+            alloc_mb_per_sec=secondary.get("gc.alloc.rate"),
+            alloc_bytes_per_op=alloc_bytes_per_op,
+            alloc_bytes_per_row=alloc_bytes_per_op / limit if alloc_bytes_per_op is not None and limit else None,
+            gc_count=secondary.get("gc.count"),
+            gc_time=secondary.get("gc.time"),
+            cpu_time_per_op=cpu_time_per_op,
+            cpu_time_per_row_us=cpu_time_per_op * 1000 / limit if cpu_time_per_op is not None and limit else None,
+        )
+
+    def read_java_result(self, file, location, database, query_names: dict[str, str]) -> list[PythonResult]:
         results = []
         with open(file) as jsonfile:
             java_results = [JavaResult.from_dict(jr) for jr in json.load(jsonfile)]
             for java_result in java_results:
-                durations = java_result.primaryMetric.rawData[0]
+                # Measurement iterations of all forks
+                durations = [duration for fork in java_result.primaryMetric.rawData for duration in fork]
                 avg_duration = self.average(durations)
+                sql_file = java_result.params.sqlFileNameIn
+                limit = int(java_result.params.limit)
                 results.append(
                     PythonResult(
-                        limit=int(java_result.params.limit),
+                        query=query_names.get(sql_file, sql_file),
+                        limit=limit,
                         location=location,
                         database=database,
                         connection_type=f"java_{java_result.params.connectionType.lower()}",
                         durations=durations,
                         avg_duration=avg_duration,
                         error=None,
+                        stats=summarize(durations),
+                        jvm=self.make_jvm_metrics(java_result, limit),
                     )
                 )
         return results
 
-    def read_java_results(self, results: PythonResults) -> None:
+    def read_java_results(self, results: PythonResults, queries: list[QueryConfig]) -> None:
+        # The Java runner reports SQL files, they are mapped back to query names
+        query_names = {query.file: query.name for query in queries}
         re_file = re.compile(r"java_results_([^_]+)_([^_]+).json")
         for file in glob.glob(str(PATH_TO_RESULTS / "java_results_*.json")):
             if (match := re_file.search(file)) is not None:
                 location, database = match.groups()
-                results.results.extend(self.read_java_result(file, location, database))
+                results.results.extend(self.read_java_result(file, location, database, query_names))
 
     def report_results(self, results: PythonResults):
         header, rows = self.get_report_results_table_without_write(results)
@@ -232,6 +572,10 @@ class PoCDbDriversExecutor:
         header, rows = self.get_report_results_table_without_write(
             results, write_to_csv=True
         )
+        self.write_csv(header, rows, result_file)
+
+    @staticmethod
+    def write_csv(header: list[str], rows: list[list[Any]], result_file):
         with open(PATH_TO_RESULTS / result_file, "w") as csvfile:
             csv_writer = csv.writer(
                 csvfile, delimiter=",", quotechar='"', quoting=csv.QUOTE_MINIMAL
@@ -239,15 +583,342 @@ class PoCDbDriversExecutor:
             csv_writer.writerow(header)
             csv_writer.writerows(rows)
 
+    @staticmethod
+    def get_load_results_table(results: list[LoadResult]):
+        header = [
+            "Limit", "Location", "Database", "Connection type", "Executor", "Concurrency",
+            "Queries", "Rows/s", "Queries/s", "p50 ms", "p95 ms", "p99 ms", "Failed clients", "Error",
+        ]
+        rows = [
+            [
+                result.limit,
+                result.location,
+                result.database,
+                result.connection_type,
+                result.executor,
+                result.concurrency,
+                result.queries,
+                f"{result.rows_per_sec:.2f}",
+                f"{result.queries_per_sec:.2f}",
+                f"{result.p50_latency:.2f}",
+                f"{result.p95_latency:.2f}",
+                f"{result.p99_latency:.2f}",
+                result.failed_clients,
+                result.error,
+            ]
+            for result in results
+        ]
+        return header, rows
+
+    def report_load_results(self, results: list[LoadResult]):
+        header, rows = self.get_load_results_table(results)
+        print(tabulate(rows, headers=header, tablefmt="psql"))
+
+    def write_load_results_csv(self, results: list[LoadResult], result_file):
+        header, rows = self.get_load_results_table(results)
+        self.write_csv(header, rows, result_file)
+
+    @staticmethod
+    def get_prepare_results_table(results: list[PrepareResult]):
+        header = [
+            "Location", "Database", "Scale factor", "Rows", "MB", "Duration s", "Generate s", "Rows/s", "MB/s", "Error",
+        ]
+        rows = [
+            [
+                result.location,
+                result.database,
+                result.scale_factor,
+                result.rows,
+                f"{bytes_to_mb(result.nbytes):.2f}",
+                f"{result.duration:.2f}",
+                f"{result.generate_duration:.2f}",
+                f"{result.rows_per_sec:.2f}",
+                f"{result.mb_per_sec:.2f}",
+                result.error,
+            ]
+            for result in results
+        ]
+        return header, rows
+
+    def report_prepare_results(self, results: list[PrepareResult]):
+        header, rows = self.get_prepare_results_table(results)
+        print(tabulate(rows, headers=header, tablefmt="psql"))
+
+    def write_prepare_results_csv(self, results: list[PrepareResult], result_file):
+        header, rows = self.get_prepare_results_table(results)
+        self.write_csv(header, rows, result_file)
+
+    @staticmethod
+    def get_tuning_results_table(results: list[TuningResult]):
+        header = [
+            "Limit", "Location", "Database", "Connection type", "Method", "Candidates", "Best options",
+            "Default ms", "Best ms", "Speed-up", "Error",
+        ]
+        rows = [
+            [
+                result.limit,
+                result.location,
+                result.database,
+                result.connection_type,
+                result.method,
+                result.candidates,
+                json.dumps(result.best_options) if result.best_options is not None else None,
+                f"{result.default_median:.2f}" if result.default_median is not None else None,
+                f"{result.best_median:.2f}" if result.best_median is not None else None,
+                f"{result.speedup:.2f}" if result.speedup is not None else None,
+                result.error,
+            ]
+            for result in results
+        ]
+        return header, rows
+
+    def report_tuning_results(self, results: list[TuningResult]):
+        header, rows = self.get_tuning_results_table(results)
+        print(tabulate(rows, headers=header, tablefmt="psql"))
+
+    def write_tuning_results_csv(self, results: list[TuningResult], result_file):
+        header, rows = self.get_tuning_results_table(results)
+        self.write_csv(header, rows, result_file)
+
+    @staticmethod
+    def get_pooling_results_table(results: list[PoolingResult]):
+        header = [
+            "Limit", "Location", "Database", "Connection type", "Strategy", "Arrival/s", "Queries/s", "Queries",
+            "p50 ms", "p95 ms", "p99 ms", "Max ms", "Overhead ms", "Overhead p95 ms", "Connections", "Failed", "Error",
+        ]
+        rows = [
+            [
+                result.limit,
+                result.location,
+                result.database,
+                result.connection_type,
+                result.strategy,
+                result.arrival_rate,
+                f"{result.queries_per_sec:.2f}",
+                result.queries,
+                f"{result.p50_latency:.2f}",
+                f"{result.p95_latency:.2f}",
+                f"{result.p99_latency:.2f}",
+                f"{result.max_latency:.2f}",
+                f"{result.avg_overhead:.2f}",
+                f"{result.p95_overhead:.2f}",
+                result.connections,
+                result.failed_queries,
+                result.error,
+            ]
+            for result in results
+        ]
+        return header, rows
+
+    def report_pooling_results(self, results: list[PoolingResult]):
+        header, rows = self.get_pooling_results_table(results)
+        print(tabulate(rows, headers=header, tablefmt="psql"))
+
+    def write_pooling_results_csv(self, results: list[PoolingResult], result_file):
+        header, rows = self.get_pooling_results_table(results)
+        self.write_csv(header, rows, result_file)
+
+    @staticmethod
+    def get_cold_start_results_table(results: list[ColdStartResult]):
+        header = [
+            "Limit", "Location", "Database", "Connection type", "Processes", "Process ms", "Import ms",
+            "Connect ms", "First execute ms", "First batch ms", "First query ms", "Steady query ms", "Error",
+        ]
+        rows = [
+            [
+                result.limit,
+                result.location,
+                result.database,
+                result.connection_type,
+                result.processes,
+            ]
+            + [
+                f"{value:.2f}" if value is not None else None
+                for value in (
+                    result.process_duration,
+                    result.import_duration,
+                    result.connect_duration,
+                    result.first_execute_duration,
+                    result.first_batch_duration,
+                    result.first_query_duration,
+                    result.steady_duration,
+                )
+            ]
+            + [result.error]
+            for result in results
+        ]
+        return header, rows
+
+    def report_cold_start_results(self, results: list[ColdStartResult]):
+        header, rows = self.get_cold_start_results_table(results)
+        print(tabulate(rows, headers=header, tablefmt="psql"))
+
+    def write_cold_start_results_csv(self, results: list[ColdStartResult], result_file):
+        header, rows = self.get_cold_start_results_table(results)
+        self.write_csv(header, rows, result_file)
+
+    @staticmethod
+    def get_attribution_results_table(results: list[AttributionResult]):
+        header = [
+            "Limit", "Location", "Database", "Connection type", "Iterations", "Rows", "Duration ms",
+            "Server ms", "Server %", "Client CPU ms", "Client CPU %", "Network/wait ms", "Network/wait %",
+            "Received MB", "Bottleneck", "Server timing", "Error",
+        ]
+        rows = []
+        for result in results:
+            components = []
+            for value in (result.server_duration, result.client_cpu, result.network_wait):
+                components.append(f"{value:.2f}" if value is not None else None)
+                # Client CPU of multi-threaded drivers can exceed the duration
+                components.append(f"{value / result.duration * 100:.1f}" if value is not None and result.duration else None)
+            rows.append(
+                [
+                    result.limit,
+                    result.location,
+                    result.database,
+                    result.connection_type,
+                    result.iterations,
+                    result.rows,
+                    f"{result.duration:.2f}" if result.duration is not None else None,
+                ]
+                + components
+                + [
+                    f"{bytes_to_mb(result.received_bytes):.2f}" if result.received_bytes is not None else None,
+                    result.bottleneck,
+                    result.server_timing,
+                    result.error,
+                ]
+            )
+        return header, rows
+
+    @staticmethod
+    def get_cost_model_results_table(models: list[CostModelResult], extrapolate: list[int]):
+        header = [
+            "Query", "Location", "Database", "Connection type", "Points", "Min rows", "Max rows",
+            "Fixed ms", "Per-row us", "Fit error %",
+        ]
+        header += [f"ms at {rows}" for rows in extrapolate]
+        header += ["Error"]
+        rows = [
+            [
+                model.query,
+                model.location,
+                model.database,
+                model.connection_type,
+                model.points,
+                model.min_rows,
+                model.max_rows,
+                f"{model.fixed_ms:.2f}" if model.fixed_ms is not None else None,
+                f"{model.per_row_us:.4f}" if model.per_row_us is not None else None,
+                f"{model.fit_error_pct:.1f}" if model.fit_error_pct is not None else None,
+            ]
+            + [f"{model.extrapolated[n]:.2f}" if n in model.extrapolated else None for n in extrapolate]
+            + [model.error]
+            for model in models
+        ]
+        return header, rows
+
+    def report_cost_model_results(self, models: list[CostModelResult], extrapolate: list[int]):
+        header, rows = self.get_cost_model_results_table(models, extrapolate)
+        print(tabulate(rows, headers=header, tablefmt="psql"))
+
+    def write_cost_model_results_csv(self, models: list[CostModelResult], extrapolate: list[int], result_file):
+        header, rows = self.get_cost_model_results_table(models, extrapolate)
+        self.write_csv(header, rows, result_file)
+
+    @staticmethod
+    def get_crossover_results_table(crossovers: list[CrossoverResult]):
+        header = ["Query", "Location", "Database", "Rows", "Faster below", "Faster above", "Duration ms", "Measured"]
+        rows = [
+            [
+                crossover.query,
+                crossover.location,
+                crossover.database,
+                crossover.rows,
+                crossover.faster_below,
+                crossover.faster_above,
+                f"{crossover.duration:.2f}",
+                crossover.measured,
+            ]
+            for crossover in crossovers
+        ]
+        return header, rows
+
+    def report_crossover_results(self, crossovers: list[CrossoverResult]):
+        header, rows = self.get_crossover_results_table(crossovers)
+        print(tabulate(rows, headers=header, tablefmt="psql"))
+
+    def write_crossover_results_csv(self, crossovers: list[CrossoverResult], result_file):
+        header, rows = self.get_crossover_results_table(crossovers)
+        self.write_csv(header, rows, result_file)
+
+    @staticmethod
+    def report_fastest_by_rows(models: list[CostModelResult], row_counts: list[int]):
+        """
+        Connection type to pick per result size, by fitted models.
+        """
+        fastest = {rows: fastest_by_rows(models, rows) for rows in row_counts}
+        keys = sorted({key for by_key in fastest.values() for key in by_key}, key=lambda k: tuple(map(str, k)))
+        header = ["Query", "Location", "Database"] + [f"Fastest at {rows}" for rows in row_counts]
+        rows = [list(key) + [fastest[n].get(key) for n in row_counts] for key in keys]
+        print(tabulate(rows, headers=header, tablefmt="psql"))
+
+    def report_attribution_results(self, results: list[AttributionResult]):
+        header, rows = self.get_attribution_results_table(results)
+        print(tabulate(rows, headers=header, tablefmt="psql"))
+
+    def write_attribution_results_csv(self, results: list[AttributionResult], result_file):
+        header, rows = self.get_attribution_results_table(results)
+        self.write_csv(header, rows, result_file)
+
+    @staticmethod
+    def report_comparison_results(results: list[ComparisonResult]):
+        header = [
+            "Query", "Location", "Database", "Connection type", "Limit", "Baseline version", "Version",
+            "Baseline median", "Median", "Change %", "p-value", "Regression", "Measured in",
+        ]
+        rows = [
+            [
+                result.query,
+                result.location,
+                result.database,
+                result.connection_type,
+                result.limit,
+                result.baseline_driver_version,
+                result.driver_version,
+                f"{result.baseline_median:.2f}",
+                f"{result.median:.2f}",
+                f"{result.change_pct:+.1f}",
+                f"{result.p_value:.4f}",
+                "REGRESSION" if result.regression else "",
+                # Cells reused from the result cache show the run that measured them
+                result.measured_run_id if result.cached else "",
+            ]
+            for result in results
+        ]
+        print(tabulate(rows, headers=header, tablefmt="psql"))
+
 
 class PoCDbDrivers:
     def __init__(self):
         load_dotenv()
         self.args = self.parse_arguments()
         self.config = read_config()
-        self.iterations = self.config.config.measurement_iterations
+        self.schedule = IterationSchedule(
+            self.config.config.measurement_iterations,
+            self.config.config.warmup_iterations,
+            self.config.config.adaptive,
+        )
+        self.consumer_mode = self.args.consumer or self.config.config.consumer
+        self.profiling = self.config.config.profiling if self.args.profile else None
         self.limits = [1_000, 10_000, 100_000, 1_000_000, 5_000_000]
         self.executor = PoCDbDriversExecutor(self.args)
+        self.cache = ResultCache(
+            self.config.config.cache,
+            self.args.cache_expiry if self.args.cache_expiry is not None else self.config.config.cache.expiry_hours,
+        )
+        # Results measured by this run carry its ID into the result cache and the history store
+        self.run_id = make_run_id()
         self.logger = self.get_logger()
 
     @staticmethod
@@ -275,125 +946,597 @@ class PoCDbDrivers:
             default="all_results.csv",
             help="Result CSV file name",
         )
-        return parser.parse_args()
-
-    def run_turbodbc(
-        self, limit: int, location: Location, database: Database, query: str
-    ) -> PythonResult:
-        driver = f"Driver={database.odbc_driver_path}"
-        server = f"Server={database.host}"
-        port = f"Port={database.port}"
-        db_name = f"Database={database.db_name}"
-        user = f"UID={database.user}"
-        password = f"PWD={database.password}"
-        static_props = ""
-        turbodbc_options = make_options()
-        if database.db_type == "POSTGRESQL":
-            static_props = (";Protocol=7.4;UseDeclareFetch=1;Fetch=10000;" +
-                            "UseServerSidePrepare=1;BoolsAsChar=0;USESSL=true;SSLmode=prefer")
-            # These options work only for PostgreSQL, segmentation fault when using it with Vertica
-            turbodbc_options = make_options(
-                read_buffer_size=Megabytes(1),
-                parameter_sets_to_buffer=1000,
-                use_async_io=True,
-                # note: this incurs about 20-30% performance overhead at least when talking with PostgreSQL
-                # prefer_unicode=True,
-                autocommit=False,
-            )
-        odbc_conn_str = (
-            f"{driver};{server};{port};{db_name};{user};{password}{static_props}"
+        parser.add_argument(
+            "-m",
+            "--mode",
+            default=MODE_BENCHMARK,
+            choices=[
+                MODE_BENCHMARK, MODE_LOAD, MODE_PREPARE, MODE_COMPARE, MODE_COLD_START, MODE_POOLING, MODE_TUNE,
+                MODE_ATTRIBUTION, MODE_SWEEP,
+            ],
+            help=f"{MODE_BENCHMARK}: serial iterations per driver, "
+            + f"{MODE_LOAD}: concurrent clients per driver (config.load), "
+            + f"{MODE_PREPARE}: generate and load TPC-H lineitem into all databases (config.prepare), "
+            + f"{MODE_COMPARE}: compare a run in the history store with a baseline, exit code 1 on regression, "
+            + f"{MODE_COLD_START}: import, connect and first query latency in fresh processes (config.cold_start), "
+            + f"{MODE_POOLING}: reconnect, reuse and pooled connections under a query arrival rate (config.pooling), "
+            + f"{MODE_TUNE}: search fetch options of drivers per database and limit (config.tuning), "
+            + f"{MODE_ATTRIBUTION}: split durations into server execution, client CPU and network/wait "
+            + "(config.attribution), "
+            + f"{MODE_SWEEP}: geometric row counts between bottom_limit and top_limit, fixed and per-row cost "
+            + "per driver, crossovers and extrapolation (config.sweep)",
         )
-        return self.executor.execute_use_case(
-            connection_type="python_turbodbc",
-            limit=limit,
-            location=location,
-            database=database,
-            query=query,
-            connect_func=connect,
-            connect_params={
-                "connection_string": odbc_conn_str,
-                "turbodbc_options": turbodbc_options,
-            },
-            iterations=self.iterations,
-            exec_fetch_func=self.executor.execute_and_fetch_arrow_turbodbc,
+        parser.add_argument(
+            "-c",
+            "--consumer",
+            choices=CONSUMER_MODES,
+            help="What happens to fetched batches, overrides config.consumer",
+        )
+        parser.add_argument(
+            "--batch-result-file",
+            default="batch_results.csv",
+            help="Result CSV file name with arrival time, rows and bytes of every fetched batch",
+        )
+        parser.add_argument(
+            "--throughput-result-file",
+            default="query_throughput.csv",
+            help="Result CSV file name with rows/s per query (config.queries) and driver",
+        )
+        parser.add_argument(
+            "--load-result-file",
+            default="load_results.csv",
+            help="Result CSV file name of the load mode",
+        )
+        parser.add_argument(
+            "--prepare-result-file",
+            default="prepare_results.csv",
+            help="Result CSV file name of the prepare mode",
+        )
+        parser.add_argument(
+            "--cold-start-result-file",
+            default="cold_start_results.csv",
+            help="Result CSV file name of the cold-start mode",
+        )
+        parser.add_argument(
+            "--pooling-result-file",
+            default="pooling_results.csv",
+            help="Result CSV file name of the pooling mode",
+        )
+        parser.add_argument(
+            "--tuning-result-file",
+            default="tuning_results.csv",
+            help="Result CSV file name of the tune mode",
+        )
+        parser.add_argument(
+            "--attribution-result-file",
+            default="attribution_results.csv",
+            help="Result CSV file name of the attribution mode",
+        )
+        parser.add_argument(
+            "--sweep-result-file",
+            default="sweep_results.csv",
+            help="Result CSV file name with all row counts of the sweep mode",
+        )
+        parser.add_argument(
+            "--cost-model-result-file",
+            default="cost_models.csv",
+            help="Result CSV file name with fitted cost models of the sweep mode",
+        )
+        parser.add_argument(
+            "--crossover-result-file",
+            default="crossovers.csv",
+            help="Result CSV file name with crossover row counts of the sweep mode",
+        )
+        parser.add_argument(
+            "--run",
+            help="Compare mode: run ID or git commit (prefix) to test, default the latest run",
+        )
+        parser.add_argument(
+            "--baseline",
+            help="Compare mode: run ID or git commit (prefix) of the baseline, "
+            + "default the previous run with the same config hash on the same host",
+        )
+        parser.add_argument(
+            "--profile",
+            action="store_true",
+            help="Profile measured iterations of every use case by a sampling profiler (config.profiling), "
+            + "profiles are written into results/profiles",
+        )
+        parser.add_argument(
+            "--only",
+            nargs="+",
+            help="Execute only matrix cells matching these patterns (connection type or "
+            + "location/database/connection_type/limit, wildcards allowed), other cells are reused from the cache",
+        )
+        parser.add_argument(
+            "--force",
+            action="store_true",
+            help="Execute selected cells even if they have valid cached results",
         )
+        parser.add_argument(
+            "--cache-expiry",
+            type=float,
+            help="Hours after which cached results are executed again, overrides config.cache.expiry_hours",
+        )
+        return parser.parse_args()
 
-    def run_python_adbc(
-        self, limit: int, location: Location, database: Database, query: str
-    ) -> PythonResult:
-        connection_type = "python_adbc"
-        if database.db_type == "VERTICA":
-            return PythonResult(
+    def run_driver(
+        self,
+        driver: DriverPlugin,
+        limit: int,
+        location: Location,
+        database: Database,
+        query: str,
+    ) -> list[PythonResult]:
+        results = self.run_driver_use_cases(driver, limit, location, database, query)
+        version = driver_version(driver)
+        for result in results:
+            result.driver_version = version
+        return results
+
+    def run_driver_use_cases(
+        self,
+        driver: DriverPlugin,
+        limit: int,
+        location: Location,
+        database: Database,
+        query: str,
+    ) -> list[PythonResult]:
+        if not driver.supports(database):
+            return [PythonResult(
                 limit=limit,
                 location=location.name,
                 database=database.name,
-                connection_type=connection_type,
+                connection_type=driver.connection_type,
                 durations=[],
                 avg_duration=-1,
                 error=UNSUPPORTED_MSG,
+            )]
+        if driver.is_async:
+            return self.run_async_driver(driver, limit, location, database, query)
+        return [
+            self.executor.execute_use_case(
+                connection_type=self.make_connection_type(driver.connection_type, strings),
+                limit=limit,
+                location=location,
+                database=database,
+                query=query,
+                connect_func=driver.connect,
+                connect_params={"database": database},
+                schedule=self.schedule,
+                exec_fetch_func=driver.fetch,
+                consumer_mode=self.consumer_mode,
+                # Sink writes Arrow batches, row drivers are measured without it
+                sink_config=self.config.config.sink if driver.produces_arrow else None,
+                profiling=self.profiling,
+                strings=strings,
             )
+            for strings in self.string_encodings(driver)
+        ]
 
-        conn_kwargs = {
-            "host": database.host,
-            "port": database.port,
-            "database": database.db_name,
-            "user": database.user,
-            "password": database.password,
+    def run_async_driver(
+        self,
+        driver: AsyncDriverPlugin,
+        limit: int,
+        location: Location,
+        database: Database,
+        query: str,
+    ) -> list[PythonResult]:
+        async_config = self.config.config.asyncio
+        results = []
+        for in_flight, strings in itertools.product(async_config.in_flight, self.string_encodings(driver)):
+            connection_type = driver.connection_type
+            if in_flight > 1:
+                connection_type += f"_inflight_{in_flight}"
+            results.append(
+                asyncio.run(
+                    self.executor.execute_use_case_async(
+                        connection_type=self.make_connection_type(connection_type, strings),
+                        limit=limit,
+                        location=location,
+                        database=database,
+                        query=query,
+                        driver=driver,
+                        in_flight=in_flight,
+                        schedule=self.schedule,
+                        async_config=async_config,
+                        consumer_mode=self.consumer_mode,
+                        profiling=self.profiling,
+                        strings=strings,
+                    )
+                )
+            )
+        return results
+
+    def string_encodings(self, driver: DriverPlugin) -> list[str]:
+        """
+        Encodings of string columns measured per driver, conversion consumers of Arrow drivers only.
+        """
+        if self.consumer_mode not in CONVERSION_MODES or not driver.produces_arrow:
+            return [STRINGS_PLAIN]
+        return self.config.config.conversion.strings
+
+    @staticmethod
+    def make_connection_type(connection_type: str, strings: str) -> str:
+        return connection_type if strings == STRINGS_PLAIN else f"{connection_type}_{strings}"
+
+    def cell_inputs(
+        self, driver: DriverPlugin, limit: int, location: Location, database: Database, query: str
+    ) -> dict[str, Any]:
+        """
+        Everything that influences results of one matrix cell, the key of the result cache.
+        """
+        config = self.config.config
+        database_dict = database.to_dict()
+        # Passwords are read from the environment, they must not be stored in the cache
+        database_dict["password"] = None
+        return {
+            "query": query,
+            "location": location.name,
+            # Emulated latency and bandwidth change every duration
+            "network": location.network.to_dict() if location.network else None,
+            "database": database_dict,
+            "limit": limit,
+            "connection_type": driver.connection_type,
+            "driver_version": driver_version(driver),
+            "measurement": {
+                "iterations": config.measurement_iterations,
+                "warmup_iterations": config.warmup_iterations,
+                "adaptive": config.adaptive.to_dict() if config.adaptive else None,
+                "consumer": self.consumer_mode,
+                "sink": config.sink.to_dict() if config.sink and driver.produces_arrow else None,
+                "asyncio": config.asyncio.to_dict() if driver.is_async else None,
+                "partitioning": config.partitioning.to_dict() if isinstance(driver, PartitionedDriver) else None,
+                "profiling": self.profiling.to_dict() if self.profiling else None,
+                "conversion": config.conversion.to_dict() if self.consumer_mode in CONVERSION_MODES else None,
+            },
         }
-        if database.db_type == "SNOWFLAKE":
-            connect_func = adbc_driver_snowflake.dbapi.connect
-            uri = f"{database.user}:{database.password}@{database.account}/{database.db_name}?warehouse={database.warehouse}"
-            conn_kwargs["warehouse"] = database.warehouse
-            conn_kwargs["account"] = database.account
-        else:
-            connect_func = adbc_driver_postgresql.dbapi.connect
-            uri = f"postgresql://{database.user}:{database.password}@{database.host}:{database.port}/{database.db_name}"
-        return self.executor.execute_use_case(
-            connection_type=connection_type,
-            limit=limit,
-            location=location,
-            database=database,
-            query=query,
-            connect_func=connect_func,
-            connect_params={"uri": uri},
-            iterations=self.iterations,
-            exec_fetch_func=self.executor.execute_and_fetch_arrow_adbc,
+
+    def run_cell(
+        self,
+        driver: DriverPlugin,
+        limit: int,
+        location: Location,
+        database: Database,
+        query: str,
+    ) -> list[PythonResult]:
+        """
+        Reuses cached results of the cell unless it is selected by --only and forced or the cache is not valid.
+        Cells not selected by --only without valid cached results are skipped.
+        """
+        if not driver.supports(database):
+            return self.run_driver(driver, limit, location, database, query)
+        inputs = self.cell_inputs(driver, limit, location, database, query)
+        selected = not self.args.only or matches_any(
+            self.args.only, location.name, database.name, driver.connection_type, limit
         )
+        cached = None if selected and self.args.force else self.cache.get(inputs)
+        if cached is not None:
+            self.logger.info(f"Reusing cached results of {driver.connection_type} {limit=}")
+            return cached
+        if not selected:
+            self.logger.info(f"Skipping {driver.connection_type} {limit=}, not selected by --only and not cached")
+            return []
+        results = self.run_driver(driver, limit, location, database, query)
+        for result in results:
+            result.measured_run_id = self.run_id
+        if not any(result.error for result in results):
+            self.cache.put(inputs, results)
+        return results
+
+    def limit_range(self, database: Database) -> tuple[int, int]:
+        return database.bottom_limit or self.limits[0], database.top_limit or self.limits[-1]
 
     def calculate_limits(self, database: Database) -> list[int]:
-        bottom_limit = database.bottom_limit or 1_000
-        top_limit = database.top_limit or 5_000_000
+        bottom_limit, top_limit = self.limit_range(database)
         return [x for x in self.limits if bottom_limit <= x <= top_limit]
 
-    def main(self):
-        start = time()
+    def read_query(self) -> str:
+        with open(self.config.config.query) as fp:
+            return fp.read()
+
+    def get_queries(self) -> list[QueryConfig]:
         query_file = self.config.config.query
-        with open(query_file) as fp:
-            query_raw = fp.read()
+        return self.config.config.queries or [QueryConfig(name=Path(query_file).stem, file=query_file)]
+
+    def run_benchmark(self):
+        queries = self.get_queries()
+        query_texts = []
         results = PythonResults(results=[])
-        self.executor.prepare_result_folders()
+        for query_config in queries:
+            query_raw = Path(query_config.file).read_text()
+            query_texts.append(query_raw)
+            for location in self.config.locations:
+                self.logger.info(f"Running query {query_config.name} with location {location.name}")
+                for database in location.databases:
+                    self.logger.info(f"Running with database {database.name}")
+                    limits = self.calculate_limits(database)
+                    drivers = select_drivers(database)
+                    drivers += make_partitioned_drivers(
+                        [d for d in drivers if d.supports(database)],
+                        self.config.config.partitioning,
+                    )
+                    for limit in limits:
+                        self.logger.info(f"Running with limit {limit}")
+                        query = query_raw + f" LIMIT {limit}"
+                        for driver in drivers:
+                            cell_results = self.run_cell(driver, limit, location, database, query)
+                            for result in cell_results:
+                                result.query = query_config.name
+                            results.results.extend(cell_results)
+
+        self.executor.read_java_results(results, queries)
+        self.executor.report_results(results)
+        self.executor.write_results_csv(results, self.args.result_file)
+        self.executor.write_batch_results_csv(results, self.args.batch_result_file)
+        if len(queries) > 1:
+            self.executor.report_query_throughput(results)
+            self.executor.write_query_throughput_csv(results, self.args.throughput_result_file)
+        run_info = make_run_info(self.config, "\n".join(query_texts), self.run_id)
+        history_file = append_run(self.config.config.history, run_info, results)
+        self.logger.info(f"Run {run_info.run_id} appended to the history store {history_file}")
+
+    def run_load(self, query_raw: str):
+        load_config = self.config.config.load
+        results = []
+        for location in self.config.locations:
+            self.logger.info(f"Running load with location {location.name}")
+            for database in location.databases:
+                self.logger.info(f"Running load with database {database.name}")
+                drivers = [
+                    d for d in select_drivers(database) if d.supports(database) and not d.is_async
+                ]
+                for limit in self.calculate_limits(database):
+                    query = query_raw + f" LIMIT {limit}"
+                    for driver in drivers:
+                        for concurrency in load_config.concurrency_levels:
+                            self.logger.info(
+                                f"Running load {driver.connection_type} {limit=} {concurrency=} "
+                                + f"for {load_config.duration} s"
+                            )
+                            results.append(
+                                run_load(
+                                    connection_type=driver.connection_type,
+                                    limit=limit,
+                                    location_name=location.name,
+                                    database=database,
+                                    query=query,
+                                    concurrency=concurrency,
+                                    load_config=load_config,
+                                )
+                            )
+        self.executor.report_load_results(results)
+        self.executor.write_load_results_csv(results, self.args.load_result_file)
+
+    def run_cold_start(self, query_raw: str):
+        cold_start_config = self.config.config.cold_start
+        results = []
         for location in self.config.locations:
-            self.logger.info(f"Running with location {location.name}")
             for database in location.databases:
-                self.logger.info(f"Running with database {database.name}")
-                limits = self.calculate_limits(database)
+                # Partitioned drivers are composed at runtime, worker processes know registered plugins only
+                drivers = [d for d in select_drivers(database) if d.supports(database)]
+                for limit in self.calculate_limits(database):
+                    query = query_raw + f" LIMIT {limit}"
+                    for driver in drivers:
+                        self.logger.info(
+                            f"Running cold start {driver.connection_type} {limit=} "
+                            + f"in {cold_start_config.processes} processes"
+                        )
+                        result = run_cold_start(
+                            connection_type=driver.connection_type,
+                            limit=limit,
+                            location_name=location.name,
+                            database=database,
+                            query=query,
+                            config=cold_start_config,
+                            consumer_mode=self.consumer_mode,
+                        )
+                        if result.error:
+                            self.logger.error(f"Cold start of {driver.connection_type} failed: {result.error}")
+                        results.append(result)
+        self.executor.report_cold_start_results(results)
+        self.executor.write_cold_start_results_csv(results, self.args.cold_start_result_file)
+
+    def run_pooling(self, query_raw: str):
+        pooling_config = self.config.config.pooling
+        for strategy in pooling_config.strategies:
+            check_strategy(strategy)
+        results = []
+        for location in self.config.locations:
+            for database in location.databases:
+                drivers = [
+                    d for d in select_drivers(database) if d.supports(database) and not d.is_async
+                ]
+                for limit in self.calculate_limits(database):
+                    query = query_raw + f" LIMIT {limit}"
+                    for driver in drivers:
+                        for strategy in pooling_config.strategies:
+                            for arrival_rate in pooling_config.arrival_rates:
+                                self.logger.info(
+                                    f"Running pooling {driver.connection_type} {limit=} {strategy=} "
+                                    + f"{arrival_rate=}/s for {pooling_config.duration} s"
+                                )
+                                results.append(
+                                    run_pooling(
+                                        connection_type=driver.connection_type,
+                                        limit=limit,
+                                        location_name=location.name,
+                                        database=database,
+                                        query=query,
+                                        strategy_name=strategy,
+                                        arrival_rate=arrival_rate,
+                                        config=pooling_config,
+                                    )
+                                )
+        self.executor.report_pooling_results(results)
+        self.executor.write_pooling_results_csv(results, self.args.pooling_result_file)
+
+    def run_attribution(self, query_raw: str):
+        attribution_config = self.config.config.attribution
+        results = []
+        for location in self.config.locations:
+            for database in location.databases:
+                drivers = [
+                    d for d in select_drivers(database) if d.supports(database) and not d.is_async
+                ]
+                for limit in self.calculate_limits(database):
+                    query = query_raw + f" LIMIT {limit}"
+                    for driver in drivers:
+                        self.logger.info(f"Running attribution {driver.connection_type} {limit=}")
+                        result = run_attribution(
+                            driver=driver,
+                            limit=limit,
+                            location_name=location.name,
+                            database=database,
+                            query=query,
+                            config=attribution_config,
+                            consumer_mode=self.consumer_mode,
+                        )
+                        if result.error:
+                            self.logger.error(f"Attribution of {driver.connection_type} failed: {result.error}")
+                        results.append(result)
+        self.executor.report_attribution_results(results)
+        self.executor.write_attribution_results_csv(results, self.args.attribution_result_file)
+
+    def run_sweep(self, query_raw: str):
+        """
+        Runs benchmark cells (cached ones are reused) at geometric row counts and fits a cost model per driver.
+        Java results of the same query (run_java.sh, row count ladder) are fitted too.
+        """
+        sweep_config = self.config.config.sweep
+        query_config = QueryConfig(name=Path(self.config.config.query).stem, file=self.config.config.query)
+        results = PythonResults(results=[])
+        swept = set()
+        for location in self.config.locations:
+            for database in location.databases:
+                limits = sweep_limits(*self.limit_range(database), sweep_config.points_per_decade)
+                swept.update(limits)
+                self.logger.info(f"Sweeping {location.name} {database.name} over {limits}")
+                drivers = select_drivers(database)
                 for limit in limits:
-                    self.logger.info(f"Running with limit {limit}")
                     query = query_raw + f" LIMIT {limit}"
-                    results.results.append(
-                        self.run_python_adbc(limit, location, database, query)
-                    )
-                    results.results.append(
-                        self.run_turbodbc(limit, location, database, query)
-                    )
+                    for driver in drivers:
+                        cell_results = self.run_cell(driver, limit, location, database, query)
+                        for result in cell_results:
+                            result.query = query_config.name
+                        results.results.extend(cell_results)
+        self.executor.read_java_results(results, [query_config])
+        results.results = [r for r in results.results if r.query == query_config.name]
+        self.executor.write_results_csv(results, self.args.sweep_result_file)
+        models = fit_cost_models(results.results, sweep_config)
+        crossovers = find_crossovers(models)
+        self.executor.report_cost_model_results(models, sweep_config.extrapolate)
+        self.executor.write_cost_model_results_csv(models, sweep_config.extrapolate, self.args.cost_model_result_file)
+        self.executor.report_crossover_results(crossovers)
+        self.executor.write_crossover_results_csv(crossovers, self.args.crossover_result_file)
+        # Result size classes: powers of 10 within swept row counts and extrapolated row counts
+        decades = range(math.ceil(math.log10(min(swept))), math.floor(math.log10(max(swept))) + 1) if swept else []
+        self.executor.report_fastest_by_rows(models, [10 ** k for k in decades] + sweep_config.extrapolate)
 
-        self.executor.read_java_results(results)
-        self.executor.report_results(results)
-        self.executor.write_results_csv(results, self.args.result_file)
+    def run_tune(self, query_raw: str):
+        tuning_config = self.config.config.tuning
+        results = []
+        for location in self.config.locations:
+            for database in location.databases:
+                drivers = [
+                    d for d in select_drivers(database) if d.supports(database) and not d.is_async
+                ]
+                for limit in self.calculate_limits(database):
+                    query = query_raw + f" LIMIT {limit}"
+
+                    def measure(driver: DriverPlugin, iterations: int) -> list[float]:
+                        self.logger.info(f"Tuning {driver.connection_type} {limit=} {driver.options}")
+                        result = self.executor.execute_use_case(
+                            connection_type=driver.connection_type,
+                            limit=limit,
+                            location=location,
+                            database=database,
+                            query=query,
+                            connect_func=driver.connect,
+                            connect_params={"database": database},
+                            schedule=IterationSchedule(iterations, self.config.config.warmup_iterations),
+                            exec_fetch_func=driver.fetch,
+                            consumer_mode=self.consumer_mode,
+                        )
+                        if result.error:
+                            raise RuntimeError(result.error)
+                        return result.durations
+
+                    for driver in drivers:
+                        result = tune_driver(driver, limit, location.name, database, tuning_config, measure)
+                        if result is None:
+                            self.logger.info(f"Nothing to tune for {driver.connection_type} in {database.name}")
+                            continue
+                        results.append(result)
+        self.executor.report_tuning_results(results)
+        self.executor.write_tuning_results_csv(results, self.args.tuning_result_file)
+
+    def run_prepare(self):
+        prepare_config = self.config.config.prepare
+        results = []
+        for location in self.config.locations:
+            for database in location.databases:
+                self.logger.info(
+                    f"Loading lineitem {prepare_config.scale_factor=} into {location.name} {database.name} "
+                    + f"{prepare_config.schema}"
+                )
+                result = load_lineitem(location.name, database, prepare_config)
+                if result.error:
+                    self.logger.error(f"Loading into {database.name} failed: {result.error}")
+                results.append(result)
+        self.executor.report_prepare_results(results)
+        self.executor.write_prepare_results_csv(results, self.args.prepare_result_file)
+
+    def run_compare(self) -> bool:
+        history_config = self.config.config.history
+        history = read_history(history_config)
+        current, baseline = select_runs(history, self.args.run, self.args.baseline)
+        self.logger.info(
+            f"Comparing run {current['run_id']} (commit {current['git_commit']}) "
+            + f"with baseline {baseline['run_id']} (commit {baseline['git_commit']})"
+        )
+        results = compare_runs(history, current["run_id"], baseline["run_id"], history_config)
+        if not results:
+            # A gate comparing nothing must not pass
+            self.logger.error(f"Runs {current['run_id']} and {baseline['run_id']} have no measured cell in common")
+            return True
+        self.executor.report_comparison_results(results)
+        regressions = [r for r in results if r.regression]
+        if regressions:
+            self.logger.error(f"{len(regressions)} regression(s) found")
+        return bool(regressions)
+
+    def main(self):
+        start = perf_counter()
+        self.executor.prepare_result_folders()
+        if self.args.mode == MODE_COMPARE:
+            if self.run_compare():
+                sys.exit(1)
+            return
+        if self.args.mode == MODE_PREPARE:
+            self.run_prepare()
+            self.executor.report_finished("Prepare", self.executor.get_duration(start))
+            return
+        # Databases of locations with network conditions are reached through the network emulator
+        with start_location_proxies(self.config.locations):
+            # Modes other than benchmark run config.query only
+            if self.args.mode == MODE_LOAD:
+                self.run_load(self.read_query())
+            elif self.args.mode == MODE_COLD_START:
+                self.run_cold_start(self.read_query())
+            elif self.args.mode == MODE_POOLING:
+                self.run_pooling(self.read_query())
+            elif self.args.mode == MODE_TUNE:
+                self.run_tune(self.read_query())
+            elif self.args.mode == MODE_ATTRIBUTION:
+                self.run_attribution(self.read_query())
+            elif self.args.mode == MODE_SWEEP:
+                self.run_sweep(self.read_query())
+            else:
+                self.run_benchmark()
         self.executor.report_finished(
             "All use cases", self.executor.get_duration(start)
         )
 
-
 if __name__ == "__main__":
     PoCDbDrivers().main()
@@ -0,0 +1,123 @@
+import asyncio
+from typing import Any, Optional
+
+from python_libs.config import Database
+from python_libs.consumers import BatchConsumer
+from python_libs.drivers import (
+    DB_TYPE_POSTGRESQL,
+    ROW_DRIVERS_FETCH_SIZE,
+    DriverPlugin,
+    postgresql_uri,
+    register_driver,
+)
+from python_libs.metrics import FetchMetrics
+
+
+class AsyncDriverPlugin(DriverPlugin):
+    """
+    Base class of asyncio-native driver plugins, executed by PoCDbDriversExecutor.execute_use_case_async.
+    connect, close and fetch are coroutines.
+    """
+
+    is_async = True
+    produces_arrow = False
+
+    async def connect(self, database: Database) -> Any:
+        raise NotImplementedError
+
+    async def close(self, connection: Any) -> None:
+        await connection.close()
+
+    async def fetch(self, connection: Any, query: str, metrics: FetchMetrics, consumer: BatchConsumer) -> int:
+        raise NotImplementedError
+
+
+@register_driver
+class AsyncpgDriver(AsyncDriverPlugin):
+    connection_type = "python_asyncpg"
+    db_types = (DB_TYPE_POSTGRESQL,)
+    packages = ("asyncpg",)
+    modules = ("asyncpg",)
+
+    async def connect(self, database: Database) -> Any:
+        import asyncpg
+
+        return await asyncpg.connect(postgresql_uri(database))
+
+    async def fetch(self, connection: Any, query: str, metrics: FetchMetrics, consumer: BatchConsumer) -> int:
+        # Records are decoded in the event loop thread, the whole result arrives as one batch
+        records = await connection.fetch(query)
+        metrics.mark_executed()
+        metrics.record_batch(len(records))
+        consumer.consume(records)
+        return metrics.rows
+
+
+@register_driver
+class Psycopg3AsyncDriver(AsyncDriverPlugin):
+    connection_type = "python_psycopg3_async"
+    db_types = (DB_TYPE_POSTGRESQL,)
+    packages = ("psycopg", "psycopg-binary")
+    modules = ("psycopg",)
+
+    async def connect(self, database: Database) -> Any:
+        import psycopg
+
+        return await psycopg.AsyncConnection.connect(postgresql_uri(database))
+
+    async def fetch(self, connection: Any, query: str, metrics: FetchMetrics, consumer: BatchConsumer) -> int:
+        async with connection.cursor() as cursor:
+            await cursor.execute(query)
+            metrics.mark_executed()
+            while rows := await cursor.fetchmany(ROW_DRIVERS_FETCH_SIZE):
+                metrics.record_batch(len(rows))
+                consumer.consume(rows)
+        return metrics.rows
+
+
+class LoopStallMonitor:
+    """
+    Measures how long the event loop is blocked (e.g. by row decoding in drivers).
+    A watchdog task sleeps for a short interval, any lateness above the threshold is counted as a stall.
+    """
+
+    def __init__(self, interval_ms: float, threshold_ms: float):
+        self.interval = interval_ms / 1000
+        self.threshold = threshold_ms / 1000
+        self.stall = 0.0
+        self.max_stall = 0.0
+        self.task: Optional[asyncio.Task] = None
+
+    async def watch(self) -> None:
+        loop = asyncio.get_running_loop()
+        while True:
+            expected = loop.time() + self.interval
+            await asyncio.sleep(self.interval)
+            lag = loop.time() - expected
+            if lag > self.threshold:
+                self.stall += lag
+                self.max_stall = max(self.max_stall, lag)
+
+    async def __aenter__(self) -> "LoopStallMonitor":
+        self.stall = 0.0
+        self.max_stall = 0.0
+        self.task = asyncio.create_task(self.watch())
+        # Let the watchdog start before the measured code runs
+        await asyncio.sleep(0)
+        return self
+
+    async def __aexit__(self, *_) -> None:
+        if self.task is not None:
+            self.task.cancel()
+            try:
+                await self.task
+            except asyncio.CancelledError:
+                pass
+
+    @property
+    def stall_ms(self) -> float:
+        return self.stall * 1000
+
+    @property
+    def max_stall_ms(self) -> float:
+        return self.max_stall * 1000
@@ -0,0 +1,269 @@
+import importlib.util
+import json
+import time
+from contextlib import ExitStack, closing
+from typing import Any, Optional
+
+from python_libs.config import AttributionConfig, Database
+from python_libs.consumers import make_consumer
+from python_libs.drivers import DB_TYPE_POSTGRESQL, DB_TYPE_SNOWFLAKE, DRIVER_PLUGINS, DriverPlugin
+from python_libs.metrics import FetchMetrics
+from python_libs.result import AttributionResult
+from python_libs.stats import percentile
+
+TIMING_AUTO = "auto"
+TIMING_EXPLAIN = "explain"
+TIMING_PG_STAT_STATEMENTS = "pg_stat_statements"
+TIMING_QUERY_HISTORY = "query_history"
+PROC_NET_DEV = "/proc/net/dev"
+
+
+class ServerTiming:
+    """
+    Server-side duration of the measured query from the database's own statistics. It is read by a separate
+    probe connection (select_probe), so the session of the measured driver runs only the measured query.
+    """
+
+    name: str
+    db_types: tuple[str, ...]
+    # Plugins whose DB-API cursor can run the timing statements, in order of preference
+    probe_connection_types: tuple[str, ...]
+
+    def start(self, cursor: Any, query: str) -> None:
+        """
+        Called before measured iterations.
+        """
+
+    def finish(self, cursor: Any, query: str, iterations: int) -> Optional[float]:
+        """
+        Called after measured iterations, returns milliseconds per execution of the query.
+        """
+        raise NotImplementedError
+
+
+class ExplainTiming(ServerTiming):
+    """
+    EXPLAIN ANALYZE executes the query on the server without sending rows, planning plus execution time is
+    the server cost without transfer. ADBC wraps queries in COPY, which does not accept EXPLAIN, so it is no probe.
+    """
+
+    name = TIMING_EXPLAIN
+    db_types = (DB_TYPE_POSTGRESQL,)
+    probe_connection_types = ("python_psycopg2", "python_psycopg3_copy", "python_turbodbc")
+
+    def finish(self, cursor: Any, query: str, iterations: int) -> Optional[float]:
+        durations = []
+        for _ in range(iterations):
+            # TIMING OFF skips clock reads per plan node, the total is still measured
+            cursor.execute(f"EXPLAIN (ANALYZE, TIMING OFF, FORMAT JSON) {query}")
+            plan = cursor.fetchone()[0]
+            if isinstance(plan, str):
+                plan = json.loads(plan)
+            durations.append(plan[0]["Planning Time"] + plan[0]["Execution Time"])
+        return percentile(durations, 50)
+
+
+class PgStatStatementsTiming(ServerTiming):
+    """
+    Difference of pg_stat_statements total_exec_time of the database over measured iterations, so it covers the
+    executions of the measured driver (incl. cursor FETCH statements of ODBC). Executor time includes sending
+    rows, a client slower than the network shows up as server time. Other sessions of the database must be idle.
+    """
+
+    name = TIMING_PG_STAT_STATEMENTS
+    db_types = (DB_TYPE_POSTGRESQL,)
+    probe_connection_types = ("python_psycopg2", "python_psycopg3_copy", "python_adbc", "python_turbodbc")
+    STATEMENTS_QUERY = (
+        "SELECT queryid, calls, total_exec_time FROM pg_stat_statements "
+        "WHERE dbid = (SELECT oid FROM pg_database WHERE datname = current_database()) "
+        "AND query NOT LIKE '%pg_stat_statements%'"
+    )
+
+    def __init__(self):
+        self.before: dict[int, tuple[int, float]] = {}
+
+    def snapshot(self, cursor: Any) -> dict[int, tuple[int, float]]:
+        cursor.execute(self.STATEMENTS_QUERY)
+        return {queryid: (calls, total_exec_time) for queryid, calls, total_exec_time in cursor.fetchall()}
+
+    def start(self, cursor: Any, query: str) -> None:
+        self.before = self.snapshot(cursor)
+
+    def finish(self, cursor: Any, query: str, iterations: int) -> Optional[float]:
+        total = 0.0
+        for queryid, (calls, total_exec_time) in self.snapshot(cursor).items():
+            calls_before, total_before = self.before.get(queryid, (0, 0.0))
+            if calls > calls_before:
+                total += total_exec_time - total_before
+        return total / iterations
+
+
+class QueryHistoryTiming(ServerTiming):
+    """
+    Snowflake query history of measured iterations: compilation, execution and queued time.
+    Downloading result chunks is not part of it.
+    """
+
+    name = TIMING_QUERY_HISTORY
+    db_types = (DB_TYPE_SNOWFLAKE,)
+    probe_connection_types = ("python_adbc", "python_turbodbc")
+
+    def __init__(self):
+        self.start_time = 0.0
+
+    def start(self, cursor: Any, query: str) -> None:
+        self.start_time = time.time()
+
+    def finish(self, cursor: Any, query: str, iterations: int) -> Optional[float]:
+        query_text = query.replace("'", "''")
+        cursor.execute(
+            "SELECT COUNT(*), "
+            "SUM(COMPILATION_TIME + EXECUTION_TIME + QUEUED_OVERLOAD_TIME + QUEUED_PROVISIONING_TIME) "
+            "FROM TABLE(INFORMATION_SCHEMA.QUERY_HISTORY_BY_USER("
+            f"END_TIME_RANGE_START => TO_TIMESTAMP_LTZ({int(self.start_time)}), RESULT_LIMIT => 10000)) "
+            f"WHERE QUERY_TEXT = '{query_text}' AND EXECUTION_STATUS = 'SUCCESS'"
+        )
+        count, total = cursor.fetchone()
+        return float(total) / count if count else None
+
+
+SERVER_TIMINGS: dict[str, type[ServerTiming]] = {
+    TIMING_EXPLAIN: ExplainTiming,
+    TIMING_PG_STAT_STATEMENTS: PgStatStatementsTiming,
+    TIMING_QUERY_HISTORY: QueryHistoryTiming,
+}
+
+AUTO_SERVER_TIMINGS = {
+    DB_TYPE_POSTGRESQL: TIMING_EXPLAIN,
+    DB_TYPE_SNOWFLAKE: TIMING_QUERY_HISTORY,
+}
+
+
+def select_server_timing(database: Database, config: AttributionConfig) -> Optional[ServerTiming]:
+    """
+    None if the database has no server timing (auto for e.g. Vertica) or the configured one does not support it.
+    """
+    name = config.server_timing
+    if name == TIMING_AUTO:
+        name = AUTO_SERVER_TIMINGS.get(database.db_type)
+        if name is None:
+            return None
+    if name not in SERVER_TIMINGS:
+        raise ValueError(f"Unknown server timing '{name}', use {TIMING_AUTO} or one of {list(SERVER_TIMINGS)}")
+    timing = SERVER_TIMINGS[name]()
+    return timing if database.db_type in timing.db_types else None
+
+
+def is_installed(plugin: DriverPlugin, database: Database) -> bool:
+    try:
+        return all(importlib.util.find_spec(module) is not None for module in plugin.import_names(database))
+    except ModuleNotFoundError:
+        # Parent package of a submodule is missing
+        return False
+
+
+def select_probe(timing: ServerTiming, driver: DriverPlugin, database: Database) -> DriverPlugin:
+    """
+    Plugin of the probe connection: the measured driver when it can run the timing statements,
+    otherwise the first installed plugin that can.
+    """
+    if driver.connection_type in timing.probe_connection_types:
+        return driver
+    for connection_type in timing.probe_connection_types:
+        plugin = DRIVER_PLUGINS[connection_type]
+        if is_installed(plugin, database):
+            return plugin
+    raise RuntimeError(f"Server timing {timing.name} needs one of {list(timing.probe_connection_types)} installed")
+
+
+def received_bytes() -> Optional[int]:
+    """
+    Bytes received by all network interfaces (incl. loopback) of the network namespace, Linux only.
+    Socket counters of the process would miss connections closed within an iteration (e.g. connectorx),
+    interface counters include other traffic of the host, which should be idle.
+    """
+    try:
+        with open(PROC_NET_DEV) as fp:
+            # Two header lines, then "interface: rx_bytes rx_packets ..."
+            return sum(int(line.split(":", 1)[1].split()[0]) for line in fp.readlines()[2:])
+    except OSError:
+        return None
+
+
+def median_or_none(values: list[float]) -> Optional[float]:
+    return percentile(values, 50) if values else None
+
+
+def run_attribution(
+    driver: DriverPlugin,
+    limit: int,
+    location_name: str,
+    database: Database,
+    query: str,
+    config: AttributionConfig,
+    consumer_mode: str,
+) -> AttributionResult:
+    """
+    Splits the duration of the query into server execution, client CPU and the rest (network transfer and waiting).
+    Medians of the components do not have to add up to the median duration exactly.
+    """
+    durations: list[float] = []
+    cpu_times: list[float] = []
+    received: list[int] = []
+    rows = 0
+    server_duration = None
+    timing = None
+    error = None
+    try:
+        timing = select_server_timing(database, config)
+        with ExitStack() as stack:
+            connection = stack.enter_context(driver.connect(database))
+            probe = None
+            if timing is not None:
+                probe_connection = stack.enter_context(select_probe(timing, driver, database).connect(database))
+                probe = stack.enter_context(closing(probe_connection.cursor()))
+            # Warm-up, connection and plan caches
+            driver.fetch(connection, query, FetchMetrics(), make_consumer(consumer_mode))
+            if timing is not None:
+                timing.start(probe, query)
+            for _ in range(config.iterations):
+                bytes_start = received_bytes()
+                metrics = FetchMetrics()
+                rows = driver.fetch(connection, query, metrics, make_consumer(consumer_mode))
+                metrics.finish()
+                bytes_end = received_bytes()
+                iteration = metrics.to_result()
+                durations.append(iteration.duration)
+                cpu_times.append(iteration.user_cpu + iteration.system_cpu)
+                if bytes_start is not None and bytes_end is not None:
+                    received.append(bytes_end - bytes_start)
+            if timing is not None:
+                server_duration = timing.finish(probe, query, config.iterations)
+    except Exception as e:
+        error = str(e)
+
+    duration = median_or_none(durations)
+    client_cpu = median_or_none(cpu_times)
+    network_wait = None
+    bottleneck = None
+    # Without server timing the rest includes server execution, when server timing failed the split is unknown
+    if duration is not None and client_cpu is not None and (timing is None or server_duration is not None):
+        network_wait = max(0.0, duration - (server_duration or 0) - client_cpu)
+        components = {"server": server_duration, "client_cpu": client_cpu, "network_wait": network_wait}
+        bottleneck = max((name for name, value in components.items() if value is not None), key=components.get)
+    return AttributionResult(
+        limit=limit,
+        location=location_name,
+        database=database.name,
+        connection_type=driver.connection_type,
+        iterations=len(durations),
+        rows=rows,
+        duration=duration,
+        server_duration=server_duration,
+        server_timing=timing.name if timing is not None else None,
+        client_cpu=client_cpu,
+        network_wait=network_wait,
+        received_bytes=int(median_or_none(received)) if received else None,
+        bottleneck=bottleneck,
+        error=error,
+    )
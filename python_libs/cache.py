@@ -0,0 +1,61 @@
+import hashlib
+import json
+from datetime import datetime, timedelta, timezone
+from fnmatch import fnmatch
+from pathlib import Path
+from typing import Any, Optional
+
+from python_libs.config import CacheConfig
+from python_libs.result import PythonResult
+
+
+def cell_id(location: str, database: str, connection_type: str, limit: int) -> str:
+    return f"{location}/{database}/{connection_type}/{limit}"
+
+
+def matches_any(patterns: list[str], location: str, database: str, connection_type: str, limit: int) -> bool:
+    """
+    Patterns (fnmatch) match the connection type or the cell ID location/database/connection_type/limit.
+    """
+    cell = cell_id(location, database, connection_type, limit)
+    return any(fnmatch(connection_type, pattern) or fnmatch(cell, pattern) for pattern in patterns)
+
+
+class ResultCache:
+    """
+    Results of benchmark matrix cells stored as JSON files named by the hash of cell inputs.
+    Any change of inputs (query, database config, driver version, measurement settings, ...) is a cache miss.
+    """
+
+    def __init__(self, config: CacheConfig, expiry_hours: Optional[float]):
+        self.path = Path(config.path)
+        self.expiry = timedelta(hours=expiry_hours) if expiry_hours is not None else None
+
+    @staticmethod
+    def make_key(inputs: dict[str, Any]) -> str:
+        return hashlib.sha256(json.dumps(inputs, sort_keys=True, default=str).encode()).hexdigest()
+
+    def get(self, inputs: dict[str, Any]) -> Optional[list[PythonResult]]:
+        file = self.path / f"{self.make_key(inputs)}.json"
+        if not file.exists():
+            return None
+        with open(file) as fp:
+            entry = json.load(fp)
+        created = datetime.fromisoformat(entry["created"])
+        if self.expiry is not None and datetime.now(timezone.utc) - created > self.expiry:
+            return None
+        results = [PythonResult.from_dict(result) for result in entry["results"]]
+        for result in results:
+            result.cached = True
+        return results
+
+    def put(self, inputs: dict[str, Any], results: list[PythonResult]) -> None:
+        self.path.mkdir(parents=True, exist_ok=True)
+        entry = {
+            "created": datetime.now(timezone.utc).isoformat(),
+            # Inputs are stored to see why a cell was cached, only the hash is used for lookups
+            "inputs": inputs,
+            "results": [result.to_dict() for result in results],
+        }
+        with open(self.path / f"{self.make_key(inputs)}.json", "w") as fp:
+            json.dump(entry, fp, default=str)
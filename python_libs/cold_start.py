@@ -0,0 +1,162 @@
+import asyncio
+import json
+import subprocess
+import sys
+from contextlib import ExitStack
+from pathlib import Path
+from time import perf_counter_ns
+from typing import Any, Optional
+
+from python_libs.async_drivers import AsyncDriverPlugin
+from python_libs.config import ColdStartConfig, Database
+from python_libs.consumers import make_consumer
+from python_libs.drivers import DriverPlugin, resolve_driver
+from python_libs.metrics import NS_IN_MS, FetchMetrics
+from python_libs.result import ColdStartResult, ColdStartSample
+from python_libs.stats import percentile
+
+# Worker processes run python_libs.cold_start_worker with the repository root as working directory
+ROOT = Path(__file__).resolve().parent.parent
+
+
+def ms_since(start_ns: int) -> float:
+    return (perf_counter_ns() - start_ns) / NS_IN_MS
+
+
+def record_first_query(sample: ColdStartSample, metrics: FetchMetrics) -> None:
+    first = metrics.to_result()
+    sample.first_execute_duration = first.execute_duration
+    sample.first_batch_duration = first.first_batch_duration
+    sample.first_query_duration = first.duration
+
+
+def measure_sync(
+    driver: DriverPlugin, database: Database, query: str, consumer_mode: str, steady_iterations: int,
+    sample: ColdStartSample,
+) -> None:
+    with ExitStack() as stack:
+        start = perf_counter_ns()
+        # Some connections (e.g. connection pools) connect in __enter__
+        connection = stack.enter_context(driver.connect(database))
+        sample.connect_duration = ms_since(start)
+        for i in range(steady_iterations + 1):
+            metrics = FetchMetrics()
+            driver.fetch(connection, query, metrics, make_consumer(consumer_mode))
+            metrics.finish()
+            if i == 0:
+                record_first_query(sample, metrics)
+            else:
+                sample.steady_durations.append(metrics.to_result().duration)
+
+
+async def measure_async(
+    driver: AsyncDriverPlugin, database: Database, query: str, consumer_mode: str, steady_iterations: int,
+    sample: ColdStartSample,
+) -> None:
+    start = perf_counter_ns()
+    connection = await driver.connect(database)
+    sample.connect_duration = ms_since(start)
+    try:
+        for i in range(steady_iterations + 1):
+            metrics = FetchMetrics()
+            await driver.fetch(connection, query, metrics, make_consumer(consumer_mode))
+            metrics.finish()
+            if i == 0:
+                record_first_query(sample, metrics)
+            else:
+                sample.steady_durations.append(metrics.to_result().duration)
+    finally:
+        await driver.close(connection)
+
+
+def measure_process(request: dict[str, Any], import_duration: float) -> ColdStartSample:
+    """
+    Runs in a fresh worker process after it imported driver modules: connects, runs the first query
+    and steady-state queries.
+    """
+    database = Database.from_dict(request["database"])
+    driver = resolve_driver(database, request["connection_type"])
+    args = (driver, database, request["query"], request["consumer"], request["steady_iterations"])
+    sample = ColdStartSample(import_duration=import_duration)
+    try:
+        if driver.is_async:
+            asyncio.run(measure_async(*args, sample))
+        else:
+            measure_sync(*args, sample)
+    except Exception as e:
+        sample.error = str(e)
+    return sample
+
+
+def run_process(request: dict[str, Any], config: ColdStartConfig) -> tuple[float, ColdStartSample]:
+    """
+    Returns wall-clock duration of the worker process in milliseconds and phases measured by the worker.
+    """
+    start = perf_counter_ns()
+    try:
+        # Request is passed by stdin, so passwords do not appear in the process list
+        completed = subprocess.run(
+            [sys.executable, "-m", "python_libs.cold_start_worker"],
+            input=json.dumps(request),
+            capture_output=True,
+            text=True,
+            timeout=config.timeout,
+            cwd=ROOT,
+        )
+    except subprocess.TimeoutExpired:
+        return ms_since(start), ColdStartSample(error=f"Timeout after {config.timeout} s")
+    process_duration = ms_since(start)
+    if completed.returncode != 0:
+        lines = completed.stderr.strip().splitlines()
+        return process_duration, ColdStartSample(error=lines[-1] if lines else f"Exit code {completed.returncode}")
+    # Drivers may print to stdout, the sample is the last line
+    return process_duration, ColdStartSample.from_dict(json.loads(completed.stdout.strip().splitlines()[-1]))
+
+
+def median_or_none(values: list[Optional[float]]) -> Optional[float]:
+    values = [v for v in values if v is not None]
+    return percentile(values, 50) if values else None
+
+
+def run_cold_start(
+    connection_type: str,
+    limit: int,
+    location_name: str,
+    database: Database,
+    query: str,
+    config: ColdStartConfig,
+    consumer_mode: str,
+) -> ColdStartResult:
+    """
+    Runs config.processes fresh worker processes one after another and reports medians of their phases.
+    Failed processes are excluded from medians, the first error is reported.
+    """
+    request = {
+        "connection_type": connection_type,
+        # Imported by the worker before any harness module
+        "modules": resolve_driver(database, connection_type).import_names(database),
+        "database": database.to_dict(),
+        "query": query,
+        "consumer": consumer_mode,
+        "steady_iterations": config.steady_iterations,
+    }
+    processes = [run_process(request, config) for _ in range(config.processes)]
+    succeeded = [(duration, sample) for duration, sample in processes if sample.error is None]
+    samples = [sample for _, sample in succeeded]
+    errors = [sample.error for _, sample in processes if sample.error is not None]
+    return ColdStartResult(
+        limit=limit,
+        location=location_name,
+        database=database.name,
+        connection_type=connection_type,
+        processes=len(succeeded),
+        process_duration=median_or_none([duration for duration, _ in succeeded]),
+        import_duration=median_or_none([s.import_duration for s in samples]),
+        connect_duration=median_or_none([s.connect_duration for s in samples]),
+        first_execute_duration=median_or_none([s.first_execute_duration for s in samples]),
+        first_batch_duration=median_or_none([s.first_batch_duration for s in samples]),
+        first_query_duration=median_or_none([s.first_query_duration for s in samples]),
+        steady_duration=median_or_none([d for s in samples for d in s.steady_durations]),
+        error=errors[0] if errors else None,
+    )
+
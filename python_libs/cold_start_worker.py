@@ -0,0 +1,28 @@
+"""
+Entry point of cold-start worker processes. Only the standard library is loaded before driver modules are imported,
+so the timed import includes everything the driver needs (pyarrow, numpy, ...). Harness modules are imported after it.
+"""
+import importlib
+import json
+import sys
+from time import perf_counter_ns
+
+
+def main() -> None:
+    request = json.load(sys.stdin)
+    start = perf_counter_ns()
+    try:
+        for module in request["modules"]:
+            importlib.import_module(module)
+    except Exception as e:
+        json.dump({"error": str(e)}, sys.stdout)
+        return
+    import_duration = (perf_counter_ns() - start) / 1_000_000
+
+    from python_libs.cold_start import measure_process
+
+    json.dump(measure_process(request, import_duration).to_dict(), sys.stdout)
+
+
+if __name__ == "__main__":
+    main()
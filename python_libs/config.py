@@ -24,10 +24,209 @@ class Base:
         return attrs.asdict(self)
 
 
+@attrs.define(auto_attribs=True, kw_only=True)
+class LoadConfig(Base):
+    # Number of concurrent clients, each with its own connection
+    concurrency_levels: list[int] = attrs.field(factory=lambda: [1, 2, 4, 8])
+    # Seconds each concurrency level runs
+    duration: int = 30
+    # thread or process
+    executor: str = "thread"
+    # What clients do with fetched batches: discard, retain or table
+    consumer: str = "discard"
+
+
+@attrs.define(auto_attribs=True, kw_only=True)
+class PoolingConfig(Base):
+    # reconnect (new connection per query), reuse (one shared connection) or pool (bounded pool)
+    strategies: list[str] = attrs.field(factory=lambda: ["reconnect", "reuse", "pool"])
+    # Queries arriving per second, each rate runs for duration seconds
+    arrival_rates: list[float] = attrs.field(factory=lambda: [5, 20])
+    duration: int = 30
+    # poisson (exponential gaps) or uniform (evenly spaced)
+    arrival: str = "poisson"
+    seed: int = 0
+    # Worker threads executing arrived queries
+    workers: int = 8
+    # Connections in the pool strategy
+    pool_size: int = 4
+    consumer: str = "discard"
+
+
+@attrs.define(auto_attribs=True, kw_only=True)
+class PartitionConfig(Base):
+    # Column (or expression) the query is partitioned on, it does not have to be selected
+    key: str
+    # Each partition count is reported as its own connection type, e.g. python_adbc_partitioned_4
+    partition_counts: list[int] = attrs.field(factory=lambda: [2, 4, 8])
+    # modulo or range
+    method: str = "modulo"
+    # Inclusive key bounds, required by range method
+    range_min: Optional[int] = None
+    range_max: Optional[int] = None
+    # Drivers to partition, default all selected Arrow drivers
+    connection_types: Optional[list[str]] = None
+
+
+@attrs.define(auto_attribs=True, kw_only=True)
+class AsyncConfig(Base):
+    # Queries in flight on one event loop, each on its own connection.
+    # Levels above 1 are reported as <connection_type>_inflight_<n>
+    in_flight: list[int] = attrs.field(factory=lambda: [1])
+    # Event loop stall monitor: watchdog sleep interval and lateness counted as a stall, in milliseconds
+    stall_interval_ms: float = 1
+    stall_threshold_ms: float = 1
+
+
+@attrs.define(auto_attribs=True, kw_only=True)
+class SinkConfig(Base):
+    # parquet, ipc (Arrow IPC stream) or feather (Arrow IPC file)
+    format: str = "parquet"
+    # e.g. snappy/zstd for Parquet, lz4/zstd for IPC and Feather, None means uncompressed
+    compression: Optional[str] = None
+    # Write batches in a background thread, overlapping with the fetch
+    overlap: bool = True
+    # Batches buffered for the writer thread, fetch blocks when the queue is full
+    queue_size: int = 16
+
+
+@attrs.define(auto_attribs=True, kw_only=True)
+class AdaptiveConfig(Base):
+    # Stop when the 95% confidence interval of the median is narrower than this percentage of the median
+    ci_width_pct: float = 5
+    # measurement_iterations is the minimum
+    max_iterations: int = 50
+    # Seconds of measured iterations per use case
+    time_budget: float = 60
+
+
+@attrs.define(auto_attribs=True, kw_only=True)
+class PrepareConfig(Base):
+    # TPC-H scale factor, 1 means about 6M lineitem rows
+    scale_factor: float = 1.0
+    # Schema of the lineitem table, the benchmark query reads tpch_1D0g."lineitem"
+    schema: str = "tpch_1D0g"
+    seed: int = 0
+    # Orders generated into one record batch, about 4 lineitem rows per order
+    orders_per_batch: int = 250_000
+
+
+@attrs.define(auto_attribs=True, kw_only=True)
+class HistoryConfig(Base):
+    # Directory of the history store, one Parquet file per benchmark run
+    path: str = "results/history"
+    # Significance level of the one-sided Mann-Whitney U test of a slowdown
+    alpha: float = 0.05
+    # Slowdowns of the median smaller than this percentage are not reported as regressions
+    min_slowdown_pct: float = 5
+
+
+@attrs.define(auto_attribs=True, kw_only=True)
+class ColdStartConfig(Base):
+    # Fresh processes per driver and limit, each imports the driver, connects and runs the query
+    processes: int = 5
+    # Queries run after the first one in each process, their median is the steady-state duration
+    steady_iterations: int = 3
+    # Seconds after which a process is killed
+    timeout: float = 300
+
+
+@attrs.define(auto_attribs=True, kw_only=True)
+class ProfilingConfig(Base):
+    # py-spy (separate process, native frames) or python (built-in sampler thread, Python frames only)
+    profiler: str = "py-spy"
+    # Samples per second
+    rate: int = 100
+    # py-spy only, include frames of native code (drivers, pyarrow, libpq, ODBC driver manager)
+    native: bool = True
+    # py-spy only, flamegraph (SVG) or raw (collapsed stacks), the python profiler writes collapsed stacks
+    format: str = "flamegraph"
+
+
+@attrs.define(auto_attribs=True, kw_only=True)
+class ConversionConfig(Base):
+    # Encodings of string columns before the conversion by pandas, pandas_arrow, polars and numpy consumers,
+    # one use case per encoding: plain (as fetched), dictionary or string_view (pyarrow >= 16)
+    strings: list[str] = attrs.field(factory=lambda: ["plain"])
+
+
+@attrs.define(auto_attribs=True, kw_only=True)
+class SweepConfig(Base):
+    # Geometric row counts per factor of 10 between bottom_limit and top_limit of each database
+    points_per_decade: int = 4
+    # Row counts the fitted cost models are extrapolated to
+    extrapolate: list[int] = attrs.field(factory=lambda: [10_000_000, 100_000_000])
+
+
+@attrs.define(auto_attribs=True, kw_only=True)
+class AttributionConfig(Base):
+    # Measured iterations per driver and limit, after one warm-up iteration
+    iterations: int = 5
+    # Source of server execution time: auto (explain for PostgreSQL, query_history for Snowflake),
+    # explain (EXPLAIN ANALYZE), pg_stat_statements (needs the extension) or query_history (Snowflake)
+    server_timing: str = "auto"
+
+
+@attrs.define(auto_attribs=True, kw_only=True)
+class TuningConfig(Base):
+    # grid (all candidates with the same iterations) or halving (successive halving)
+    method: str = "halving"
+    # Measured iterations per candidate, in halving mode of the first round
+    iterations: int = 2
+    # Halving keeps the fastest 1/eta candidates per round and multiplies iterations by eta
+    eta: int = 2
+    # Iterations of the final head-to-head run of the best and default options
+    final_iterations: int = 5
+
+
+@attrs.define(auto_attribs=True, kw_only=True)
+class CacheConfig(Base):
+    # Directory of cached results of benchmark matrix cells
+    path: str = "results/cache"
+    # Cached results older than this are executed again, None means they never expire
+    expiry_hours: Optional[float] = None
+
+
+@attrs.define(auto_attribs=True, kw_only=True)
+class QueryConfig(Base):
+    # Reported in the Query column
+    name: str
+    # SQL file without LIMIT, runners append it
+    file: str
+
+
 @attrs.define(auto_attribs=True, kw_only=True)
 class BaseConfig(Base):
     query: str
     measurement_iterations: int
+    # Named queries of the benchmark mode, default is query named by its file name
+    queries: Optional[list[QueryConfig]] = None
+    # Iterations run before measured iterations (connection and plan warm-up), not reported
+    warmup_iterations: int = 0
+    # JMH profilers of the Java runner, e.g. ["gc"] for allocation and GC metrics
+    java_profilers: list[str] = attrs.field(factory=list)
+    # Iterate until the median is stable instead of running measurement_iterations
+    adaptive: Optional[AdaptiveConfig] = None
+    # What happens to fetched batches: discard, retain (until the iteration ends), table (materialise pyarrow.Table)
+    # or conversion of the table into pandas, pandas_arrow, polars or numpy
+    consumer: str = "discard"
+    conversion: ConversionConfig = attrs.field(factory=ConversionConfig)
+    load: LoadConfig = attrs.field(factory=LoadConfig)
+    asyncio: AsyncConfig = attrs.field(factory=AsyncConfig)
+    prepare: PrepareConfig = attrs.field(factory=PrepareConfig)
+    history: HistoryConfig = attrs.field(factory=HistoryConfig)
+    cache: CacheConfig = attrs.field(factory=CacheConfig)
+    cold_start: ColdStartConfig = attrs.field(factory=ColdStartConfig)
+    pooling: PoolingConfig = attrs.field(factory=PoolingConfig)
+    tuning: TuningConfig = attrs.field(factory=TuningConfig)
+    attribution: AttributionConfig = attrs.field(factory=AttributionConfig)
+    sweep: SweepConfig = attrs.field(factory=SweepConfig)
+    # Sampling profiler of measured iterations, enabled by --profile
+    profiling: ProfilingConfig = attrs.field(factory=ProfilingConfig)
+    # Arrow drivers stream fetched batches into files in results/result_files when configured
+    sink: Optional[SinkConfig] = None
+    # Partitioned parallel fetch runs only when configured
+    partitioning: Optional[PartitionConfig] = None
 
 
 @attrs.define(auto_attribs=True, kw_only=True)
@@ -44,12 +243,32 @@ class Database(Base):
     warehouse: Optional[str] = None  # Snowflake only
     bottom_limit: Optional[int] = None
     top_limit: Optional[int] = None
+    # Shared with the Java runner, each runner picks the connection types it knows
+    connection_types: Optional[list[str]] = None
+    # Options of Python drivers by connection type, e.g. best options found by the tuning mode
+    driver_options: Optional[dict[str, dict[str, Any]]] = None
+
+
+@attrs.define(auto_attribs=True, kw_only=True)
+class NetworkConfig(Base):
+    # Databases of the location are reached through proxies on 127.0.0.1, port, port + 1, ... in their order
+    port: int
+    # Round-trip time added to every exchange and the TCP handshake, milliseconds
+    rtt_ms: float = 0
+    # Standard deviation of the one-way delay, milliseconds
+    jitter_ms: float = 0
+    # Bandwidth cap per direction and connection, None is unlimited
+    bandwidth_mbit: Optional[float] = None
+    # Bytes are delayed and paced in packets of this size
+    packet_bytes: int = 16384
 
 
 @attrs.define(auto_attribs=True, kw_only=True)
 class Location(Base):
     name: str
     databases: list[Database]
+    # Emulated network between the runner and databases, e.g. a local database with WAN latency and bandwidth
+    network: Optional[NetworkConfig] = None
 
 
 @attrs.define(auto_attribs=True, kw_only=True)
@@ -58,8 +277,8 @@ class Config(Base):
     locations: list[Location]
 
 
-def read_config() -> Config:
-    with open("config.yaml") as fp:
+def read_config(path: str = "config.yaml") -> Config:
+    with open(path) as fp:
         config_dict = yaml.safe_load(fp)
         config = Config.from_dict(config_dict)
 
@@ -0,0 +1,106 @@
+from typing import Any
+
+import numpy as np
+import pyarrow as pa
+
+CONSUMER_DISCARD = "discard"
+CONSUMER_RETAIN = "retain"
+CONSUMER_TABLE = "table"
+# Conversion of the table into a dataframe, python_libs.conversion
+CONSUMER_PANDAS = "pandas"
+CONSUMER_PANDAS_ARROW = "pandas_arrow"
+CONSUMER_POLARS = "polars"
+CONSUMER_NUMPY = "numpy"
+CONVERSION_MODES = [CONSUMER_PANDAS, CONSUMER_PANDAS_ARROW, CONSUMER_POLARS, CONSUMER_NUMPY]
+CONSUMER_MODES = [CONSUMER_DISCARD, CONSUMER_RETAIN, CONSUMER_TABLE] + CONVERSION_MODES
+
+
+class BatchConsumer:
+    """
+    Decides what happens to fetched batches, so all drivers are measured under the same memory regime.
+    Base consumer discards batches as they arrive.
+    """
+
+    mode = CONSUMER_DISCARD
+
+    def consume(self, batch: Any) -> None:
+        pass
+
+    def finish(self) -> None:
+        pass
+
+    def close(self) -> None:
+        """
+        Releases resources at the end of an iteration, after finish() or a failed fetch.
+        """
+
+    @property
+    def retained_bytes(self) -> int:
+        return 0
+
+
+class RetainConsumer(BatchConsumer):
+    """
+    Keeps references to all batches until the iteration ends.
+    Row drivers produce lists of tuples, which are retained too.
+    """
+
+    mode = CONSUMER_RETAIN
+
+    def __init__(self):
+        self.batches: list[Any] = []
+
+    def consume(self, batch: Any) -> None:
+        self.batches.append(batch)
+
+    @property
+    def retained_bytes(self) -> int:
+        # Size of Python row objects is not known
+        return sum(getattr(batch, "nbytes", 0) for batch in self.batches)
+
+
+class TableConsumer(RetainConsumer):
+    """
+    Retains batches and materialises them into one pyarrow.Table (rows into one list for row drivers,
+    NumPy columns into one masked array per column).
+    """
+
+    mode = CONSUMER_TABLE
+
+    def __init__(self):
+        super().__init__()
+        self.table: Any = None
+
+    def finish(self) -> None:
+        if self.batches and isinstance(self.batches[0], pa.RecordBatch):
+            self.table = pa.Table.from_batches(self.batches)
+        elif self.batches and isinstance(self.batches[0], dict):
+            self.table = {name: np.ma.concatenate([batch[name] for batch in self.batches]) for name in self.batches[0]}
+        else:
+            self.table = [row for batch in self.batches for row in batch]
+
+    @property
+    def retained_bytes(self) -> int:
+        if isinstance(self.table, pa.Table):
+            return self.table.nbytes
+        if isinstance(self.table, dict):
+            return sum(column.nbytes for column in self.table.values())
+        return super().retained_bytes
+
+
+def make_consumer(mode: str, strings: str = "plain") -> BatchConsumer:
+    """
+    strings: encoding of string columns before a conversion (python_libs.conversion.STRINGS_ENCODINGS)
+    """
+    if mode == CONSUMER_DISCARD:
+        return BatchConsumer()
+    if mode == CONSUMER_RETAIN:
+        return RetainConsumer()
+    if mode == CONSUMER_TABLE:
+        return TableConsumer()
+    if mode in CONVERSION_MODES:
+        # pandas and Polars are imported only by conversion modes
+        from python_libs.conversion import DataframeConsumer
+
+        return DataframeConsumer(mode, strings)
+    raise ValueError(f"Unknown consumer mode '{mode}', use one of {CONSUMER_MODES}")
@@ -0,0 +1,225 @@
+import bisect
+import sys
+from time import perf_counter_ns
+from typing import Any, Iterator, Optional
+
+import numpy as np
+import pyarrow as pa
+
+from python_libs.consumers import (
+    CONSUMER_NUMPY,
+    CONSUMER_PANDAS,
+    CONSUMER_PANDAS_ARROW,
+    CONSUMER_POLARS,
+    TableConsumer,
+)
+from python_libs.metrics import NS_IN_MS
+from python_libs.result import IterationMetrics
+
+STRINGS_PLAIN = "plain"
+STRINGS_DICTIONARY = "dictionary"
+STRINGS_VIEW = "string_view"
+STRINGS_ENCODINGS = [STRINGS_PLAIN, STRINGS_DICTIONARY, STRINGS_VIEW]
+
+# (address, size) of a memory region
+Region = tuple[int, int]
+
+
+def encode_strings(table: pa.Table, strings: str) -> pa.Table:
+    """
+    Re-encodes string columns of fetched data before the conversion, plain keeps them as they were fetched.
+    """
+    if strings == STRINGS_PLAIN:
+        return table
+    if strings == STRINGS_VIEW and not hasattr(pa, "string_view"):
+        raise RuntimeError("string_view needs pyarrow >= 16")
+    columns = []
+    for column in table.columns:
+        if pa.types.is_string(column.type) or pa.types.is_large_string(column.type):
+            column = column.dictionary_encode() if strings == STRINGS_DICTIONARY else column.cast(pa.string_view())
+        columns.append(column)
+    return pa.Table.from_arrays(columns, names=table.column_names)
+
+
+def convert_table(table: pa.Table, target: str) -> Any:
+    """
+    pandas and NumPy targets are the same as ADBC fetch_df() and turbodbc fetchallnumpy() after fetch_arrow_table().
+    """
+    if target == CONSUMER_PANDAS:
+        return table.to_pandas()
+    if target == CONSUMER_PANDAS_ARROW:
+        import pandas as pd
+
+        return table.to_pandas(types_mapper=pd.ArrowDtype)
+    if target == CONSUMER_POLARS:
+        import polars as pl
+
+        return pl.from_arrow(table)
+    # NumPy needs contiguous columns, chunked columns are concatenated, strings and nulls become objects
+    return {name: column.to_numpy() for name, column in zip(table.column_names, table.columns)}
+
+
+def polars_series(name: str, array: np.ndarray) -> Any:
+    import polars as pl
+
+    series = pl.Series(name, np.ma.getdata(array))
+    mask = np.ma.getmaskarray(array)
+    return series.scatter(np.flatnonzero(mask), None) if mask.any() else series
+
+
+def convert_columns(columns: dict[str, np.ndarray], target: str) -> Any:
+    """
+    Converts NumPy columns (turbodbc fetchallnumpy), masked arrays mark nulls.
+    """
+    if target in (CONSUMER_PANDAS, CONSUMER_PANDAS_ARROW):
+        import pandas as pd
+
+        frame = pd.DataFrame(columns)
+        return frame.convert_dtypes(dtype_backend="pyarrow") if target == CONSUMER_PANDAS_ARROW else frame
+    if target == CONSUMER_POLARS:
+        import polars as pl
+
+        return pl.DataFrame([polars_series(name, array) for name, array in columns.items()])
+    return columns
+
+
+def convert_rows(rows: list[tuple], target: str) -> Any:
+    if target in (CONSUMER_PANDAS, CONSUMER_PANDAS_ARROW):
+        import pandas as pd
+
+        frame = pd.DataFrame.from_records(rows)
+        return frame.convert_dtypes(dtype_backend="pyarrow") if target == CONSUMER_PANDAS_ARROW else frame
+    if target == CONSUMER_POLARS:
+        import polars as pl
+
+        return pl.DataFrame(rows, orient="row")
+    return {str(i): np.array(values, dtype=object) for i, values in enumerate(zip(*rows))}
+
+
+def arrow_regions(array: Any) -> Iterator[Region]:
+    """
+    Buffers of an Arrow array or chunked array, children and dictionaries included.
+    """
+    chunks = array.chunks if isinstance(array, pa.ChunkedArray) else [array]
+    for chunk in chunks:
+        for buffer in chunk.buffers():
+            if buffer is not None:
+                yield buffer.address, buffer.size
+        if pa.types.is_dictionary(chunk.type):
+            yield from arrow_regions(chunk.dictionary)
+
+
+def numpy_regions(array: np.ndarray) -> Iterator[Region]:
+    yield array.ctypes.data, array.nbytes
+    if isinstance(array, np.ma.MaskedArray) and array.mask is not np.ma.nomask:
+        yield array.mask.ctypes.data, array.mask.nbytes
+    if array.dtype == object:
+        # Python objects are always created by the conversion, address 0 is never shared
+        yield 0, sum(sys.getsizeof(value) for value in {id(v): v for v in array.ravel()}.values())
+
+
+def pandas_regions(array: Any) -> Iterator[Region]:
+    import pandas as pd
+
+    if isinstance(array, pd.arrays.ArrowExtensionArray):
+        yield from arrow_regions(array.__arrow_array__())
+    elif isinstance(array, pd.Categorical):
+        yield from numpy_regions(array.codes)
+        yield from pandas_regions(array.categories.array)
+    elif isinstance(array, pd.arrays.NumpyExtensionArray):
+        yield from numpy_regions(array.to_numpy())
+    elif isinstance(array, (pd.arrays.DatetimeArray, pd.arrays.TimedeltaArray)):
+        # View of the backing int64 ndarray, np.asarray() of time zone aware values would create objects
+        yield from numpy_regions(array.asi8)
+    else:
+        yield 0, array.nbytes
+
+
+def result_regions(result: Any) -> Iterator[Region]:
+    if isinstance(result, dict):
+        for array in result.values():
+            yield from numpy_regions(array)
+    elif type(result).__module__.startswith("polars"):
+        import polars as pl
+
+        # Export of Polars memory without casts to older Arrow types
+        for column in result.to_arrow(compat_level=pl.CompatLevel.newest()).columns:
+            yield from arrow_regions(column)
+    else:
+        for _, series in result.items():
+            yield from pandas_regions(series.array)
+
+
+def count_copied_bytes(sources: list[Region], result: Any) -> tuple[int, int]:
+    """
+    Returns size of the result and bytes of it, which are not within fetched Arrow buffers (sources).
+    """
+    sources = sorted(region for region in sources if region[1])
+    starts = [address for address, _ in sources]
+    total = copied = 0
+    for address, size in result_regions(result):
+        total += size
+        i = bisect.bisect_right(starts, address) - 1
+        if i < 0 or address + size > sources[i][0] + sources[i][1]:
+            copied += size
+    return total, copied
+
+
+class DataframeConsumer(TableConsumer):
+    """
+    Materialises the table like TableConsumer and converts it into a dataframe (pandas, Polars) or NumPy columns.
+    The conversion is timed separately. String columns are re-encoded before it (dictionary, string_view),
+    which is part of the conversion. Copied bytes are counted later, outside of measured time.
+    """
+
+    def __init__(self, target: str, strings: str = STRINGS_PLAIN):
+        if strings not in STRINGS_ENCODINGS:
+            raise ValueError(f"Unknown string encoding '{strings}', use one of {STRINGS_ENCODINGS}")
+        super().__init__()
+        self.mode = target
+        self.strings = strings
+        self.result: Any = None
+        self.conversion_duration: Optional[float] = None
+        self.accounting: Optional[tuple[int, int]] = None
+
+    def finish(self) -> None:
+        super().finish()
+        start = perf_counter_ns()
+        if isinstance(self.table, pa.Table):
+            self.result = convert_table(encode_strings(self.table, self.strings), self.mode)
+        elif isinstance(self.table, dict):
+            self.result = convert_columns(self.table, self.mode)
+        else:
+            self.result = convert_rows(self.table, self.mode)
+        self.conversion_duration = (perf_counter_ns() - start) / NS_IN_MS
+
+    def account(self) -> tuple[int, int]:
+        if self.accounting is None:
+            sources = [
+                region
+                for batch in self.batches
+                if isinstance(batch, pa.RecordBatch)
+                for column in batch.columns
+                for region in arrow_regions(column)
+            ]
+            self.accounting = count_copied_bytes(sources, self.result) if self.result is not None else (0, 0)
+        return self.accounting
+
+    @property
+    def retained_bytes(self) -> int:
+        return self.account()[0]
+
+
+def record_conversion(iteration: IterationMetrics, consumers: list[Any]) -> None:
+    """
+    Sums conversion metrics of dataframe consumers of one iteration into iteration metrics.
+    """
+    # Sink consumers pass batches to their inner consumer
+    consumers = [getattr(c, "inner", c) for c in consumers]
+    consumers = [c for c in consumers if isinstance(c, DataframeConsumer) and c.conversion_duration is not None]
+    if not consumers:
+        return
+    iteration.conversion_duration = sum(c.conversion_duration for c in consumers)
+    iteration.dataframe_bytes = sum(c.account()[0] for c in consumers)
+    iteration.copied_bytes = sum(c.account()[1] for c in consumers)
+    iteration.zero_copy = iteration.copied_bytes == 0
@@ -0,0 +1,464 @@
+import copy
+import importlib
+from contextlib import closing, nullcontext
+from importlib.metadata import PackageNotFoundError, version
+from typing import Any, Iterator
+
+import pyarrow as pa
+
+from python_libs.config import Database
+from python_libs.consumers import BatchConsumer
+from python_libs.metrics import FetchMetrics
+
+DB_TYPE_POSTGRESQL = "POSTGRESQL"
+DB_TYPE_SNOWFLAKE = "SNOWFLAKE"
+DB_TYPE_VERTICA = "VERTICA"
+# Any Arrow Flight SQL server, e.g. python -m python_libs.flightsql_server
+DB_TYPE_FLIGHTSQL = "FLIGHTSQL"
+# Number of rows fetched per batch by drivers, which do not batch natively
+ROW_DRIVERS_FETCH_SIZE = 10_000
+
+
+class DriverPlugin:
+    """
+    Base class of Python driver plugins. Subclasses register themselves by @register_driver decorator.
+    """
+
+    connection_type: str
+    db_types: tuple[str, ...]
+    # Default plugins run when a database does not list any Python connection type in connection_types
+    default: bool = False
+    # Plugins producing Arrow record batches implement fetch_batches()
+    produces_arrow: bool = True
+    # Async plugins (python_libs.async_drivers) have coroutine connect/close/fetch
+    is_async: bool = False
+    # Python distributions implementing the driver, their versions identify results in the history store
+    packages: tuple[str, ...] = ()
+    # Modules the driver imports lazily in connect/fetch, imported separately by the cold-start mode
+    modules: tuple[str, ...] = ()
+    # Fetch parameters with their defaults, set per database by driver_options and searched by the tuning mode
+    options: dict[str, Any] = {}
+
+    def supports(self, database: Database) -> bool:
+        return database.db_type in self.db_types
+
+    def import_names(self, database: Database) -> list[str]:
+        """
+        Modules the driver imports for the database, imported and timed by cold-start worker processes.
+        """
+        return list(self.modules)
+
+    def tuning_space(self, database: Database) -> dict[str, list[Any]]:
+        """
+        Values of options searched by the tuning mode for the database.
+        """
+        return {}
+
+    def with_options(self, options: dict[str, Any]) -> "DriverPlugin":
+        """
+        Copy of the plugin with options overriding the defaults.
+        """
+        unknown = options.keys() - self.options.keys()
+        if unknown:
+            raise ValueError(f"Unknown options {sorted(unknown)} of {self.connection_type}, use {list(self.options)}")
+        driver = copy.copy(self)
+        driver.options = {**self.options, **options}
+        return driver
+
+    def connect(self, database: Database) -> Any:
+        """
+        Opens a connection usable as a context manager.
+        """
+        raise NotImplementedError
+
+    def fetch_batches(self, connection: Any, query: str, metrics: FetchMetrics) -> Iterator[pa.RecordBatch]:
+        """
+        Executes the query and yields results as Arrow record batches.
+        Calls metrics.mark_executed() once the query is executed.
+        """
+        raise NotImplementedError
+
+    def fetch(self, connection: Any, query: str, metrics: FetchMetrics, consumer: BatchConsumer) -> int:
+        """
+        Executes the query, fetches all results and returns number of fetched rows.
+        Every batch is recorded into metrics and passed to the consumer.
+        """
+        for batch in self.fetch_batches(connection, query, metrics):
+            metrics.record_batch(batch.num_rows, batch.nbytes)
+            consumer.consume(batch)
+        return metrics.rows
+
+
+def driver_version(driver: DriverPlugin) -> str:
+    """
+    Installed versions of packages of the driver, e.g. "turbodbc==4.5.10". Packages not installed are skipped.
+    """
+    versions = []
+    for package in driver.packages:
+        try:
+            versions.append(f"{package}=={version(package)}")
+        except PackageNotFoundError:
+            pass
+    return ";".join(versions)
+
+
+DRIVER_PLUGINS: dict[str, DriverPlugin] = {}
+
+
+def register_driver(cls: type[DriverPlugin]) -> type[DriverPlugin]:
+    DRIVER_PLUGINS[cls.connection_type] = cls()
+    return cls
+
+
+def select_drivers(database: Database) -> list[DriverPlugin]:
+    """
+    Selects plugins listed in database.connection_types.
+    Names not registered here (e.g. JDBC connection types used by the Java runner) are ignored.
+    If no Python plugin is listed, default plugins are selected.
+    Options in database.driver_options are applied to the selected plugins.
+    """
+    selected = [
+        DRIVER_PLUGINS[connection_type]
+        for connection_type in database.connection_types or []
+        if connection_type in DRIVER_PLUGINS
+    ]
+    if not selected:
+        selected = [plugin for plugin in DRIVER_PLUGINS.values() if plugin.default]
+    return [resolve_driver(database, plugin.connection_type) for plugin in selected]
+
+
+def resolve_driver(database: Database, connection_type: str) -> DriverPlugin:
+    """
+    Registered plugin of connection_type with options of database.driver_options applied.
+    Workers resolving drivers by connection type measure the same configuration as the benchmark.
+    """
+    plugin = DRIVER_PLUGINS[connection_type]
+    options = (database.driver_options or {}).get(connection_type)
+    return plugin.with_options(options) if options else plugin
+
+
+def postgresql_uri(database: Database) -> str:
+    return f"postgresql://{database.user}:{database.password}@{database.host}:{database.port}/{database.db_name}"
+
+
+# ADBC statement options, each driver accepts only its own
+ADBC_STATEMENT_OPTIONS = {
+    "batch_size_hint_bytes": "adbc.postgresql.batch_size_hint_bytes",
+    "prefetch_concurrency": "adbc.snowflake.rpc.prefetch_concurrency",
+    "result_queue_size": "adbc.rpc.result_queue_size",
+}
+
+
+@register_driver
+class AdbcDriver(DriverPlugin):
+    connection_type = "python_adbc"
+    db_types = (DB_TYPE_POSTGRESQL, DB_TYPE_SNOWFLAKE)
+    packages = ("adbc_driver_manager", "adbc_driver_postgresql", "adbc_driver_snowflake")
+    default = True
+    # None keeps the driver default (16 MB batches in PostgreSQL, prefetch 10 and queue 200 in Snowflake)
+    options = {"batch_size_hint_bytes": None, "prefetch_concurrency": None, "result_queue_size": None}
+
+    @staticmethod
+    def dbapi_module(database: Database) -> str:
+        if database.db_type == DB_TYPE_SNOWFLAKE:
+            return "adbc_driver_snowflake.dbapi"
+        return "adbc_driver_postgresql.dbapi"
+
+    def import_names(self, database: Database) -> list[str]:
+        # Only the driver of the database type is loaded
+        return [self.dbapi_module(database)]
+
+    def tuning_space(self, database: Database) -> dict[str, list[Any]]:
+        if database.db_type == DB_TYPE_SNOWFLAKE:
+            return {"prefetch_concurrency": [None, 4, 16, 32], "result_queue_size": [None, 50, 1000]}
+        return {"batch_size_hint_bytes": [None, 1 << 20, 4 << 20, 64 << 20]}
+
+    def connect(self, database: Database) -> Any:
+        dbapi = importlib.import_module(self.dbapi_module(database))
+        if database.db_type == DB_TYPE_SNOWFLAKE:
+            uri = f"{database.user}:{database.password}@{database.account}/{database.db_name}?warehouse={database.warehouse}"
+            return dbapi.connect(uri=uri)
+        return dbapi.connect(uri=postgresql_uri(database))
+
+    def fetch_batches(self, connection: Any, query: str, metrics: FetchMetrics) -> Iterator[pa.RecordBatch]:
+        with connection.cursor() as cursor:
+            statement_options = {
+                ADBC_STATEMENT_OPTIONS[name]: str(value) for name, value in self.options.items() if value is not None
+            }
+            if statement_options:
+                cursor.adbc_statement.set_options(**statement_options)
+            cursor.execute(query)
+            metrics.mark_executed()
+            yield from cursor.fetch_record_batch()
+
+
+@register_driver
+class AdbcFlightSqlDriver(AdbcDriver):
+    """
+    Results arrive as Arrow IPC streams, one DoGet per endpoint, fetched in parallel by the driver.
+    """
+
+    connection_type = "python_adbc_flightsql"
+    db_types = (DB_TYPE_FLIGHTSQL,)
+    packages = ("adbc_driver_manager", "adbc_driver_flightsql")
+    default = False
+    options = {}
+
+    @staticmethod
+    def dbapi_module(database: Database) -> str:
+        return "adbc_driver_flightsql.dbapi"
+
+    def tuning_space(self, database: Database) -> dict[str, list[Any]]:
+        return {}
+
+    def connect(self, database: Database) -> Any:
+        dbapi = importlib.import_module(self.dbapi_module(database))
+        db_kwargs = {}
+        # Servers without authentication (like the local stand-in server) do not accept the handshake
+        if database.user:
+            db_kwargs = {"username": database.user, "password": database.password}
+        # Flight SQL servers do not have to support transactions
+        return dbapi.connect(f"grpc://{database.host}:{database.port}", db_kwargs=db_kwargs, autocommit=True)
+
+
+@register_driver
+class TurbodbcDriver(DriverPlugin):
+    connection_type = "python_turbodbc"
+    db_types = (DB_TYPE_POSTGRESQL, DB_TYPE_SNOWFLAKE, DB_TYPE_VERTICA)
+    packages = ("turbodbc",)
+    modules = ("turbodbc",)
+    default = True
+    # Buffer and psqlODBC fetch settings apply to PostgreSQL only, see connect()
+    options = {"read_buffer_size_mb": 1, "use_async_io": True, "fetch": 10_000, "use_declare_fetch": True}
+
+    def tuning_space(self, database: Database) -> dict[str, list[Any]]:
+        if database.db_type != DB_TYPE_POSTGRESQL:
+            return {}
+        return {
+            "read_buffer_size_mb": [1, 4, 16, 64],
+            "use_async_io": [True, False],
+            "fetch": [1_000, 10_000, 100_000],
+            "use_declare_fetch": [True, False],
+        }
+
+    def connect(self, database: Database) -> Any:
+        from turbodbc import Megabytes, connect, make_options
+
+        driver = f"Driver={database.odbc_driver_path}"
+        server = f"Server={database.host}"
+        port = f"Port={database.port}"
+        db_name = f"Database={database.db_name}"
+        user = f"UID={database.user}"
+        password = f"PWD={database.password}"
+        static_props = ""
+        turbodbc_options = make_options()
+        if database.db_type == DB_TYPE_POSTGRESQL:
+            # Without UseDeclareFetch psqlODBC reads the whole result into memory and Fetch is ignored
+            static_props = (f";Protocol=7.4;UseDeclareFetch={int(self.options['use_declare_fetch'])};" +
+                            f"Fetch={self.options['fetch']};" +
+                            "UseServerSidePrepare=1;BoolsAsChar=0;USESSL=true;SSLmode=prefer")
+            # These options work only for PostgreSQL, segmentation fault when using it with Vertica
+            turbodbc_options = make_options(
+                read_buffer_size=Megabytes(self.options["read_buffer_size_mb"]),
+                parameter_sets_to_buffer=1000,
+                use_async_io=self.options["use_async_io"],
+                # note: this incurs about 20-30% performance overhead at least when talking with PostgreSQL
+                # prefer_unicode=True,
+                autocommit=False,
+            )
+        odbc_conn_str = (
+            f"{driver};{server};{port};{db_name};{user};{password}{static_props}"
+        )
+        return connect(connection_string=odbc_conn_str, turbodbc_options=turbodbc_options)
+
+    def fetch_batches(self, connection: Any, query: str, metrics: FetchMetrics) -> Iterator[pa.RecordBatch]:
+        with connection.cursor() as cursor:
+            cursor.execute(query)
+            metrics.mark_executed()
+            # turbodbc yields each batch as a pyarrow.Table
+            for table in cursor.fetcharrowbatches():
+                yield from table.to_batches()
+
+
+@register_driver
+class TurbodbcNumpyDriver(TurbodbcDriver):
+    """
+    turbodbc NumPy result sets (fetchallnumpy in batches): batches are dictionaries of masked arrays by column name,
+    strings are object arrays. Measures the NumPy path against Arrow plus conversion by numpy or pandas consumers.
+    """
+
+    connection_type = "python_turbodbc_numpy"
+    default = False
+    produces_arrow = False
+
+    def fetch(self, connection: Any, query: str, metrics: FetchMetrics, consumer: BatchConsumer) -> int:
+        with connection.cursor() as cursor:
+            cursor.execute(query)
+            metrics.mark_executed()
+            for batch in cursor.fetchnumpybatches():
+                columns = list(batch.values())
+                metrics.record_batch(len(columns[0]) if columns else 0, sum(column.nbytes for column in columns))
+                consumer.consume(batch)
+            return metrics.rows
+
+
+class RowDriver(DriverPlugin):
+    """
+    DB-API 2.0 drivers returning Python tuples, fetched in chunks by fetchmany().
+    """
+
+    produces_arrow = False
+
+    def fetch(self, connection: Any, query: str, metrics: FetchMetrics, consumer: BatchConsumer) -> int:
+        with closing(connection.cursor()) as cursor:
+            cursor.execute(query)
+            metrics.mark_executed()
+            while rows := cursor.fetchmany(ROW_DRIVERS_FETCH_SIZE):
+                metrics.record_batch(len(rows))
+                consumer.consume(rows)
+            return metrics.rows
+
+
+@register_driver
+class Psycopg2Driver(RowDriver):
+    connection_type = "python_psycopg2"
+    db_types = (DB_TYPE_POSTGRESQL,)
+    packages = ("psycopg2", "psycopg2-binary")
+    modules = ("psycopg2",)
+
+    def connect(self, database: Database) -> Any:
+        # Drivers are imported lazily, so they do not have to be installed when not used
+        # and a process pays the import cost of used drivers only
+        import psycopg2
+
+        # Connection context manager of psycopg2 does not close the connection
+        return closing(
+            psycopg2.connect(
+                host=database.host,
+                port=database.port,
+                dbname=database.db_name,
+                user=database.user,
+                password=database.password,
+            )
+        )
+
+
+@register_driver
+class VerticaPythonDriver(RowDriver):
+    connection_type = "python_vertica"
+    db_types = (DB_TYPE_VERTICA,)
+    packages = ("vertica_python",)
+    modules = ("vertica_python",)
+
+    def connect(self, database: Database) -> Any:
+        import vertica_python
+
+        return vertica_python.connect(
+            host=database.host,
+            port=int(database.port),
+            database=database.db_name,
+            user=database.user,
+            password=database.password,
+        )
+
+
+@register_driver
+class Psycopg3CopyDriver(DriverPlugin):
+    """
+    Streams results by COPY ... TO STDOUT (FORMAT BINARY). psycopg decodes the binary rows into Python objects,
+    which are collected into Arrow record batches, so this is binary COPY transfer with row-wise decoding
+    like a row driver, not a columnar COPY to Arrow path.
+    """
+
+    connection_type = "python_psycopg3_copy"
+    db_types = (DB_TYPE_POSTGRESQL,)
+    packages = ("psycopg", "psycopg-binary")
+    modules = ("psycopg",)
+
+    def connect(self, database: Database) -> Any:
+        import psycopg
+
+        return psycopg.connect(postgresql_uri(database))
+
+    @staticmethod
+    def make_batch(columns: list[list[Any]], names: list[str], num_rows: int) -> pa.RecordBatch:
+        if not names:
+            # Results without columns (SELECT FROM ...) keep their row count
+            return pa.RecordBatch.from_struct_array(pa.array([{}] * num_rows, pa.struct([])))
+        return pa.record_batch(columns, names=names)
+
+    def fetch_batches(self, connection: Any, query: str, metrics: FetchMetrics) -> Iterator[pa.RecordBatch]:
+        with connection.cursor() as cursor:
+            # Only result types are needed to decode binary COPY rows
+            cursor.execute(f"SELECT * FROM ({query}) AS q LIMIT 0")
+            names = [column.name for column in cursor.description]
+            type_oids = [column.type_code for column in cursor.description]
+            with cursor.copy(f"COPY ({query}) TO STDOUT (FORMAT BINARY)") as copy:
+                metrics.mark_executed()
+                copy.set_types(type_oids)
+                columns: list[list[Any]] = [[] for _ in names]
+                num_rows = 0
+                for row in copy.rows():
+                    for column, value in zip(columns, row):
+                        column.append(value)
+                    num_rows += 1
+                    if num_rows == ROW_DRIVERS_FETCH_SIZE:
+                        yield self.make_batch(columns, names, num_rows)
+                        columns = [[] for _ in names]
+                        num_rows = 0
+                if num_rows:
+                    yield self.make_batch(columns, names, num_rows)
+
+
+@register_driver
+class ConnectorxDriver(DriverPlugin):
+    """
+    ConnectorX has no connection object, each query connects by URI and returns the whole Arrow table.
+    """
+
+    connection_type = "python_connectorx"
+    db_types = (DB_TYPE_POSTGRESQL,)
+    packages = ("connectorx",)
+    modules = ("connectorx",)
+
+    def connect(self, database: Database) -> Any:
+        return nullcontext(postgresql_uri(database))
+
+    def fetch_batches(self, connection: Any, query: str, metrics: FetchMetrics) -> Iterator[pa.RecordBatch]:
+        import connectorx
+
+        table = connectorx.read_sql(connection, query, return_type="arrow")
+        metrics.mark_executed()
+        yield from table.to_batches()
+
+
+@register_driver
+class DuckdbPostgresScannerDriver(DriverPlugin):
+    """
+    Runs the query in PostgreSQL through the DuckDB postgres extension (binary COPY into DuckDB vectors).
+    """
+
+    connection_type = "python_duckdb_postgres"
+    db_types = (DB_TYPE_POSTGRESQL,)
+    packages = ("duckdb",)
+    modules = ("duckdb",)
+    attached_name = "pg"
+
+    def connect(self, database: Database) -> Any:
+        import duckdb
+
+        connection = duckdb.connect()
+        connection.execute("INSTALL postgres; LOAD postgres;")
+        dsn = (
+            f"host={database.host} port={database.port} dbname={database.db_name} "
+            f"user={database.user} password={database.password}"
+        )
+        connection.execute(f"ATTACH '{dsn}' AS {self.attached_name} (TYPE POSTGRES, READ_ONLY)")
+        return connection
+
+    def fetch_batches(self, connection: Any, query: str, metrics: FetchMetrics) -> Iterator[pa.RecordBatch]:
+        escaped_query = query.replace("'", "''")
+        relation = connection.sql(f"SELECT * FROM postgres_query('{self.attached_name}', '{escaped_query}')")
+        reader = relation.fetch_record_batch(ROW_DRIVERS_FETCH_SIZE)
+        metrics.mark_executed()
+        yield from reader
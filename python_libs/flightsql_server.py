@@ -0,0 +1,194 @@
+import argparse
+import logging
+import threading
+import uuid
+from pathlib import Path
+
+import duckdb
+import pyarrow as pa
+import pyarrow.flight as flight
+import pyarrow.parquet as pq
+
+from python_libs.config import PrepareConfig
+from python_libs.tpch import LINEITEM_SCHEMA, LINEITEM_TABLE, generate_lineitem
+
+LOGGER = logging.getLogger("FlightSqlServer")
+
+# Flight SQL messages are protobuf messages packed in google.protobuf.Any
+TYPE_URL_PREFIX = "type.googleapis.com/arrow.flight.protocol.sql."
+COMMAND_STATEMENT_QUERY = "CommandStatementQuery"
+TICKET_STATEMENT_QUERY = "TicketStatementQuery"
+PROTOBUF_WIRE_VARINT = 0
+PROTOBUF_WIRE_64BIT = 1
+PROTOBUF_WIRE_LENGTH_DELIMITED = 2
+PROTOBUF_WIRE_32BIT = 5
+DEFAULT_BATCH_ROWS = 65_536
+
+
+def encode_varint(value: int) -> bytes:
+    encoded = bytearray()
+    while True:
+        byte = value & 0x7F
+        value >>= 7
+        if value:
+            encoded.append(byte | 0x80)
+        else:
+            encoded.append(byte)
+            return bytes(encoded)
+
+
+def decode_varint(data: bytes, pos: int) -> tuple[int, int]:
+    value = 0
+    shift = 0
+    while True:
+        byte = data[pos]
+        pos += 1
+        value |= (byte & 0x7F) << shift
+        if not byte & 0x80:
+            return value, pos
+        shift += 7
+
+
+def encode_bytes_field(number: int, value: bytes) -> bytes:
+    return encode_varint(number << 3 | PROTOBUF_WIRE_LENGTH_DELIMITED) + encode_varint(len(value)) + value
+
+
+def decode_fields(data: bytes) -> dict[int, bytes]:
+    """
+    Length-delimited fields of a protobuf message by field number, other wire types are skipped.
+    Flight SQL commands used here have only string and bytes fields.
+    """
+    fields = {}
+    pos = 0
+    while pos < len(data):
+        key, pos = decode_varint(data, pos)
+        number, wire_type = key >> 3, key & 0x07
+        if wire_type == PROTOBUF_WIRE_LENGTH_DELIMITED:
+            length, pos = decode_varint(data, pos)
+            fields[number] = data[pos:pos + length]
+            pos += length
+        elif wire_type == PROTOBUF_WIRE_VARINT:
+            _, pos = decode_varint(data, pos)
+        elif wire_type == PROTOBUF_WIRE_64BIT:
+            pos += 8
+        elif wire_type == PROTOBUF_WIRE_32BIT:
+            pos += 4
+        else:
+            raise ValueError(f"Unsupported protobuf wire type {wire_type}")
+    return fields
+
+
+def pack_any(message_type: str, message: bytes) -> bytes:
+    return encode_bytes_field(1, (TYPE_URL_PREFIX + message_type).encode()) + encode_bytes_field(2, message)
+
+
+def unpack_any(data: bytes) -> tuple[str, dict[int, bytes]]:
+    fields = decode_fields(data)
+    type_url = fields.get(1, b"").decode()
+    if not type_url.startswith(TYPE_URL_PREFIX):
+        raise flight.FlightServerError(f"Unknown command type '{type_url}'")
+    return type_url[len(TYPE_URL_PREFIX):], decode_fields(fields.get(2, b""))
+
+
+class FlightSqlServer(flight.FlightServerBase):
+    """
+    Minimal Arrow Flight SQL server answering statement queries over Parquet files by DuckDB.
+    Each Parquet file in data_dir is a table, files in sub-directories are tables in the schema of the directory name.
+    The result is split by rows into endpoints, which clients fetch by parallel DoGet calls.
+    Other Flight SQL commands (catalog metadata, prepared statements, transactions) are not supported.
+    """
+
+    def __init__(self, location: str, data_dir: Path, endpoints: int, batch_rows: int):
+        super().__init__(location)
+        self.endpoints = endpoints
+        self.batch_rows = batch_rows
+        self.database = duckdb.connect()
+        self.results: dict[str, tuple[pa.Table, int]] = {}
+        self.lock = threading.Lock()
+        for file in sorted(data_dir.rglob("*.parquet")):
+            schema = file.parent.name if file.parent != data_dir else "main"
+            self.database.execute(f'CREATE SCHEMA IF NOT EXISTS "{schema}"')
+            self.database.execute(f'CREATE VIEW "{schema}"."{file.stem}" AS SELECT * FROM read_parquet(\'{file}\')')
+            LOGGER.info(f"Serving {file} as {schema}.{file.stem}")
+
+    def get_flight_info(self, context, descriptor: flight.FlightDescriptor) -> flight.FlightInfo:
+        message_type, fields = unpack_any(descriptor.command)
+        if message_type != COMMAND_STATEMENT_QUERY:
+            raise flight.FlightServerError(f"{message_type} is not supported")
+        query = fields.get(1, b"").decode()
+        # Results are materialised at execution, DoGet measures the transfer only
+        table = self.database.cursor().execute(query).fetch_arrow_table()
+        handle = uuid.uuid4().hex
+        endpoint_count = max(1, min(self.endpoints, table.num_rows))
+        with self.lock:
+            self.results[handle] = (table, endpoint_count)
+        endpoints = [
+            flight.FlightEndpoint(pack_any(TICKET_STATEMENT_QUERY, encode_bytes_field(1, f"{handle}:{i}".encode())), [])
+            for i in range(endpoint_count)
+        ]
+        return flight.FlightInfo(table.schema, descriptor, endpoints, table.num_rows, table.nbytes)
+
+    def do_get(self, context, ticket: flight.Ticket) -> flight.RecordBatchStream:
+        message_type, fields = unpack_any(ticket.ticket)
+        if message_type != TICKET_STATEMENT_QUERY:
+            raise flight.FlightServerError(f"{message_type} is not supported")
+        handle, index = fields.get(1, b"").decode().split(":")
+        with self.lock:
+            if handle not in self.results:
+                raise flight.FlightServerError(f"Unknown statement handle {handle}")
+            table, remaining = self.results[handle]
+            # The result is released once every endpoint was fetched
+            if remaining == 1:
+                del self.results[handle]
+            else:
+                self.results[handle] = (table, remaining - 1)
+        endpoint_count = max(1, min(self.endpoints, table.num_rows))
+        step = -(-table.num_rows // endpoint_count)
+        part = table.slice(int(index) * step, step)
+        return flight.RecordBatchStream(pa.Table.from_batches(part.to_batches(self.batch_rows), part.schema))
+
+
+def generate_lineitem_parquet(data_dir: Path, config: PrepareConfig) -> None:
+    path = data_dir / config.schema.lower() / f"{LINEITEM_TABLE}.parquet"
+    if path.exists():
+        return
+    LOGGER.info(f"Generating {path} {config.scale_factor=}")
+    path.parent.mkdir(parents=True, exist_ok=True)
+    with pq.ParquetWriter(path, LINEITEM_SCHEMA) as writer:
+        for batch in generate_lineitem(config):
+            writer.write_batch(batch)
+
+
+def parse_arguments() -> argparse.Namespace:
+    # noinspection PyTypeChecker
+    parser = argparse.ArgumentParser(
+        description="Arrow Flight SQL server answering queries over Parquet files.",
+        formatter_class=argparse.ArgumentDefaultsHelpFormatter,
+    )
+    parser.add_argument("--host", default="127.0.0.1", help="Listen address")
+    parser.add_argument("-p", "--port", type=int, default=32010, help="Listen port")
+    parser.add_argument("--data-dir", default="results/flightsql", help="Directory with Parquet files")
+    parser.add_argument("--endpoints", type=int, default=1, help="Endpoints per result, fetched by parallel DoGet")
+    parser.add_argument("--batch-rows", type=int, default=DEFAULT_BATCH_ROWS, help="Rows per record batch")
+    parser.add_argument(
+        "--scale-factor",
+        type=float,
+        help="Generate TPC-H lineitem of this scale factor into the data directory, unless it exists",
+    )
+    return parser.parse_args()
+
+
+def main() -> None:
+    logging.basicConfig(level=logging.INFO, format="%(levelname)s - %(name)s - %(message)s")
+    args = parse_arguments()
+    data_dir = Path(args.data_dir)
+    if args.scale_factor is not None:
+        generate_lineitem_parquet(data_dir, PrepareConfig(scale_factor=args.scale_factor))
+    location = f"grpc://{args.host}:{args.port}"
+    server = FlightSqlServer(location, data_dir, args.endpoints, args.batch_rows)
+    LOGGER.info(f"Listening on {location}")
+    server.serve()
+
+
+if __name__ == "__main__":
+    main()
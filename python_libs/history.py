@@ -0,0 +1,214 @@
+import hashlib
+import json
+import socket
+import subprocess
+import uuid
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Any, Optional
+
+import attrs
+import pyarrow as pa
+import pyarrow.parquet as pq
+
+from python_libs.config import Config, HistoryConfig
+from python_libs.result import ComparisonResult, PythonResults, RunInfo
+from python_libs.stats import mann_whitney_greater, percentile
+
+# One row per measured iteration, failed results have one row without duration.
+# Results reused from the result cache are stored again with cached and the ID of the run that measured them.
+HISTORY_SCHEMA = pa.schema(
+    [
+        ("run_id", pa.string()),
+        ("timestamp", pa.string()),
+        ("host", pa.string()),
+        ("git_commit", pa.string()),
+        ("config_hash", pa.string()),
+        ("query", pa.string()),
+        ("location", pa.string()),
+        ("database", pa.string()),
+        ("connection_type", pa.string()),
+        ("limit", pa.int64()),
+        ("consumer", pa.string()),
+        ("driver_version", pa.string()),
+        ("iteration", pa.int32()),
+        ("duration", pa.float64()),
+        ("error", pa.string()),
+        ("cached", pa.bool_()),
+        ("measured_run_id", pa.string()),
+    ]
+)
+RESULT_KEY_COLUMNS = ["query", "location", "database", "connection_type", "limit"]
+
+
+def config_hash(config: Config, queries: str) -> str:
+    config_dict = config.to_dict()
+    for location in config_dict["locations"]:
+        for database in location["databases"]:
+            # Passwords are read from the environment, they must not be part of the hash
+            database["password"] = None
+    content = json.dumps(config_dict, sort_keys=True) + queries
+    return hashlib.sha256(content.encode()).hexdigest()[:16]
+
+
+def git_commit() -> Optional[str]:
+    """
+    Commit of the working tree, with "-dirty" suffix when tracked files are modified.
+    """
+    try:
+        commit = subprocess.run(["git", "rev-parse", "HEAD"], capture_output=True, text=True, check=True).stdout.strip()
+        dirty = subprocess.run(["git", "diff", "--quiet", "HEAD"], capture_output=True).returncode != 0
+    except (OSError, subprocess.CalledProcessError):
+        return None
+    return f"{commit}-dirty" if dirty else commit
+
+
+def make_run_id() -> str:
+    # Sortable by time
+    return f"{datetime.now(timezone.utc):%Y%m%dT%H%M%S}-{uuid.uuid4().hex[:8]}"
+
+
+def make_run_info(config: Config, queries: str, run_id: str) -> RunInfo:
+    return RunInfo(
+        run_id=run_id,
+        timestamp=datetime.now(timezone.utc).isoformat(),
+        host=socket.gethostname(),
+        git_commit=git_commit(),
+        config_hash=config_hash(config, queries),
+    )
+
+
+def append_run(config: HistoryConfig, run_info: RunInfo, results: PythonResults) -> Path:
+    run = run_info.to_dict()
+    rows = []
+    for result in results.results:
+        keys = dict(
+            run,
+            query=result.query,
+            location=result.location,
+            database=result.database,
+            connection_type=result.connection_type,
+            limit=result.limit,
+            consumer=result.consumer,
+            driver_version=result.driver_version,
+            cached=result.cached,
+            measured_run_id=result.measured_run_id if result.cached else run_info.run_id,
+        )
+        if result.error:
+            rows.append(dict(keys, iteration=None, duration=None, error=result.error))
+        for i, duration in enumerate(result.durations, start=1):
+            rows.append(dict(keys, iteration=i, duration=duration, error=None))
+    path = Path(config.path)
+    path.mkdir(parents=True, exist_ok=True)
+    file = path / f"run_{run_info.run_id}.parquet"
+    pq.write_table(pa.Table.from_pylist(rows, schema=HISTORY_SCHEMA), file)
+    return file
+
+
+def read_history(config: HistoryConfig) -> list[dict[str, Any]]:
+    files = sorted(Path(config.path).glob("run_*.parquet"))
+    if not files:
+        return []
+    return pa.concat_tables([read_run(file) for file in files]).to_pylist()
+
+
+def read_run(file: Path) -> pa.Table:
+    """
+    Columns added to HISTORY_SCHEMA later are null in older runs.
+    """
+    table = pq.read_table(file)
+    for field in HISTORY_SCHEMA:
+        if field.name not in table.column_names:
+            table = table.append_column(field, pa.nulls(table.num_rows, field.type))
+    return table.select(HISTORY_SCHEMA.names).cast(HISTORY_SCHEMA)
+
+
+def find_runs(history: list[dict[str, Any]]) -> list[dict[str, Any]]:
+    """
+    Run metadata ordered by time, oldest first.
+    """
+    names = [field.name for field in attrs.fields(RunInfo)]
+    runs = {row["run_id"]: {name: row[name] for name in names} for row in history}
+    return sorted(runs.values(), key=lambda run: run["run_id"])
+
+
+def select_runs(
+    history: list[dict[str, Any]], run: Optional[str], baseline: Optional[str]
+) -> tuple[dict[str, Any], dict[str, Any]]:
+    """
+    Selects the run to test (latest by default) and the baseline: a run ID (prefix) or git commit (prefix),
+    by default the previous run with the same config hash on the same host.
+    """
+    runs = find_runs(history)
+    if not runs:
+        raise ValueError("History is empty, run the benchmark first")
+
+    def match(reference: str, candidates: list[dict[str, Any]]) -> dict[str, Any]:
+        matching = [
+            r for r in candidates if r["run_id"].startswith(reference) or (r["git_commit"] or "").startswith(reference)
+        ]
+        if not matching:
+            raise ValueError(f"No run matches '{reference}'")
+        return matching[-1]
+
+    current = match(run, runs) if run else runs[-1]
+    earlier = [r for r in runs if r["run_id"] < current["run_id"]]
+    if baseline:
+        return current, match(baseline, earlier)
+    same_setup = [r for r in earlier if r["config_hash"] == current["config_hash"] and r["host"] == current["host"]]
+    if not same_setup:
+        raise ValueError(f"No earlier run with config hash {current['config_hash']} on {current['host']}")
+    return current, same_setup[-1]
+
+
+def group_durations(history: list[dict[str, Any]], run_id: str) -> dict[tuple, tuple[list[float], dict[str, Any]]]:
+    """
+    Durations and the first row (driver version, cached) per result key of a run.
+    """
+    grouped: dict[tuple, tuple[list[float], dict[str, Any]]] = {}
+    for row in history:
+        if row["run_id"] != run_id or row["duration"] is None:
+            continue
+        key = tuple(row[column] for column in RESULT_KEY_COLUMNS)
+        grouped.setdefault(key, ([], row))[0].append(row["duration"])
+    return grouped
+
+
+def compare_runs(
+    history: list[dict[str, Any]], run_id: str, baseline_run_id: str, config: HistoryConfig
+) -> list[ComparisonResult]:
+    """
+    Compares durations per query, location, database, connection type and limit present in both runs.
+    Cells reused from the result cache are compared with the durations of the run that measured them.
+    A regression is a statistically significant slowdown (Mann-Whitney U) of at least min_slowdown_pct of the median.
+    """
+    current = group_durations(history, run_id)
+    baseline = group_durations(history, baseline_run_id)
+    results = []
+    for key in sorted(current.keys() & baseline.keys()):
+        durations, row = current[key]
+        baseline_durations, baseline_row = baseline[key]
+        median = percentile(durations, 50)
+        baseline_median = percentile(baseline_durations, 50)
+        change_pct = (median - baseline_median) / baseline_median * 100 if baseline_median else 0
+        p_value = mann_whitney_greater(durations, baseline_durations)
+        query, location, database, connection_type, limit = key
+        results.append(
+            ComparisonResult(
+                query=query,
+                location=location,
+                database=database,
+                connection_type=connection_type,
+                limit=limit,
+                baseline_driver_version=baseline_row["driver_version"],
+                driver_version=row["driver_version"],
+                cached=bool(row["cached"]),
+                measured_run_id=row["measured_run_id"],
+                baseline_median=baseline_median,
+                median=median,
+                change_pct=change_pct,
+                p_value=p_value,
+                regression=p_value < config.alpha and change_pct >= config.min_slowdown_pct,
+            )
+        )
+    return results
@@ -0,0 +1,102 @@
+from concurrent.futures import Executor, ProcessPoolExecutor, ThreadPoolExecutor
+from time import perf_counter, time
+from typing import Optional
+
+import attrs
+
+from python_libs.config import Database, LoadConfig
+from python_libs.consumers import make_consumer
+from python_libs.drivers import resolve_driver
+from python_libs.metrics import FetchMetrics
+from python_libs.result import LoadResult
+from python_libs.stats import percentile
+
+EXECUTOR_THREAD = "thread"
+EXECUTOR_PROCESS = "process"
+
+
+@attrs.define(auto_attribs=True, kw_only=True)
+class ClientResult:
+    # Wall-clock boundaries, comparable across processes
+    start: float = 0
+    end: float = 0
+    latencies: list[float] = attrs.field(factory=list)
+    rows: int = 0
+    error: Optional[str] = None
+
+
+def run_client(
+    connection_type: str, database: Database, query: str, load_config: LoadConfig
+) -> ClientResult:
+    """
+    One load client with its own connection, executing the query in a loop for load_config.duration seconds.
+    The connection is opened before the measured window starts.
+    Driver is passed by its connection type, so the function can run in a worker process too.
+    """
+    driver = resolve_driver(database, connection_type)
+    result = ClientResult()
+    try:
+        with driver.connect(database) as connection:
+            result.start = time()
+            deadline = result.start + load_config.duration
+            while time() < deadline:
+                start = perf_counter()
+                result.rows += driver.fetch(connection, query, FetchMetrics(), make_consumer(load_config.consumer))
+                result.latencies.append((perf_counter() - start) * 1000)
+            result.end = time()
+    except Exception as e:
+        result.error = str(e)
+        result.end = time()
+    return result
+
+
+def make_pool(executor: str, concurrency: int) -> Executor:
+    if executor == EXECUTOR_PROCESS:
+        return ProcessPoolExecutor(max_workers=concurrency)
+    if executor == EXECUTOR_THREAD:
+        return ThreadPoolExecutor(max_workers=concurrency)
+    raise ValueError(f"Unknown load executor '{executor}', use '{EXECUTOR_THREAD}' or '{EXECUTOR_PROCESS}'")
+
+
+def run_load(
+    connection_type: str,
+    limit: int,
+    location_name: str,
+    database: Database,
+    query: str,
+    concurrency: int,
+    load_config: LoadConfig,
+) -> LoadResult:
+    with make_pool(load_config.executor, concurrency) as pool:
+        futures = [
+            pool.submit(run_client, connection_type, database, query, load_config)
+            for _ in range(concurrency)
+        ]
+        clients = [future.result() for future in futures]
+
+    latencies = [latency for client in clients for latency in client.latencies]
+    errors = [client.error for client in clients if client.error]
+    measured = [client for client in clients if client.start]
+    if measured:
+        elapsed = max(c.end for c in measured) - min(c.start for c in measured)
+    else:
+        elapsed = 0
+    rows = sum(client.rows for client in clients)
+    return LoadResult(
+        limit=limit,
+        location=location_name,
+        database=database.name,
+        connection_type=connection_type,
+        executor=load_config.executor,
+        concurrency=concurrency,
+        elapsed=elapsed,
+        queries=len(latencies),
+        rows=rows,
+        rows_per_sec=rows / elapsed if elapsed else 0,
+        queries_per_sec=len(latencies) / elapsed if elapsed else 0,
+        p50_latency=percentile(latencies, 50),
+        p95_latency=percentile(latencies, 95),
+        p99_latency=percentile(latencies, 99),
+        failed_clients=len(errors),
+        error=errors[0] if errors else None,
+    )
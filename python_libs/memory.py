@@ -0,0 +1,117 @@
+import ctypes
+import ctypes.util
+import resource
+import sys
+from pathlib import Path
+from typing import Optional
+
+import pyarrow as pa
+
+from python_libs.result import MemoryMetrics
+
+PROC_STATUS = Path("/proc/self/status")
+PROC_CLEAR_REFS = Path("/proc/self/clear_refs")
+# Writing 5 to clear_refs resets the peak RSS (VmHWM) of the process, Linux >= 4.0
+RESET_PEAK_RSS = "5"
+
+
+class Mallinfo2(ctypes.Structure):
+    _fields_ = [
+        (name, ctypes.c_size_t)
+        for name in ("arena", "ordblks", "smblks", "hblks", "hblkhd", "usmblks", "fsmblks", "uordblks", "fordblks", "keepcost")
+    ]
+
+
+def load_mallinfo2():
+    libc_name = ctypes.util.find_library("c")
+    if libc_name is None:
+        return None
+    try:
+        mallinfo2 = ctypes.CDLL(libc_name).mallinfo2
+    except (OSError, AttributeError):
+        # Not glibc or glibc < 2.33
+        return None
+    mallinfo2.restype = Mallinfo2
+    return mallinfo2
+
+
+MALLINFO2 = load_mallinfo2()
+
+
+def read_proc_status_kb(field: str) -> Optional[int]:
+    try:
+        with open(PROC_STATUS) as fp:
+            for line in fp:
+                if line.startswith(field + ":"):
+                    return int(line.split()[1])
+    except OSError:
+        pass
+    return None
+
+
+def current_rss() -> Optional[int]:
+    kb = read_proc_status_kb("VmRSS")
+    return kb * 1024 if kb is not None else None
+
+
+def peak_rss() -> int:
+    kb = read_proc_status_kb("VmHWM")
+    if kb is None:
+        # ru_maxrss is in kilobytes on Linux, but in bytes on macOS
+        max_rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+        return max_rss if sys.platform == "darwin" else max_rss * 1024
+    return kb * 1024
+
+
+def reset_peak_rss() -> bool:
+    try:
+        PROC_CLEAR_REFS.write_text(RESET_PEAK_RSS)
+        return True
+    except OSError:
+        return False
+
+
+def native_heap_in_use() -> Optional[int]:
+    """
+    Bytes allocated by malloc (glibc only), covers native drivers (libpq, ODBC driver manager, ...)
+    """
+    if MALLINFO2 is None:
+        return None
+    return MALLINFO2().uordblks
+
+
+class MemoryTracker:
+    """
+    Measures memory of one iteration: peak RSS, Arrow default memory pool and native (malloc) heap.
+    Call start() before the fetch and stop() before fetched data are released.
+    """
+
+    def __init__(self):
+        self.pool = pa.default_memory_pool()
+        self.rss_start: Optional[int] = None
+        self.peak_reset = False
+        self.arrow_start = 0
+        self.arrow_max_start = 0
+        self.native_start: Optional[int] = None
+
+    def start(self) -> None:
+        self.peak_reset = reset_peak_rss()
+        self.rss_start = current_rss() or peak_rss()
+        self.arrow_start = self.pool.bytes_allocated()
+        self.arrow_max_start = self.pool.max_memory() or 0
+        self.native_start = native_heap_in_use()
+
+    def stop(self, retained_bytes: int) -> MemoryMetrics:
+        native_end = native_heap_in_use()
+        arrow_max = self.pool.max_memory() or 0
+        return MemoryMetrics(
+            # Without peak reset, peak RSS is the process lifetime peak, the delta is then only a lower bound
+            peak_rss_delta=max(0, peak_rss() - self.rss_start),
+            peak_rss_reset=self.peak_reset,
+            # Arrow pool peak cannot be reset, a new peak is detected only when it exceeds the previous one
+            arrow_peak=max(0, arrow_max - self.arrow_start) if arrow_max > self.arrow_max_start else None,
+            arrow_allocated=self.pool.bytes_allocated() - self.arrow_start,
+            arrow_backend=self.pool.backend_name,
+            native_heap_delta=native_end - self.native_start if native_end is not None and self.native_start is not None else None,
+            retained_bytes=retained_bytes,
+        )
@@ -0,0 +1,110 @@
+import resource
+from time import perf_counter_ns
+from typing import Optional
+
+from python_libs.result import BatchMetrics, IterationMetrics
+
+NS_IN_MS = 1_000_000
+
+
+def cpu_times() -> tuple[float, float]:
+    """
+    User and system CPU time of the process (all threads) in milliseconds.
+    """
+    usage = resource.getrusage(resource.RUSAGE_SELF)
+    return usage.ru_utime * 1000, usage.ru_stime * 1000
+
+
+class FetchMetrics:
+    """
+    Collects timings of one query execution on the monotonic high-resolution clock.
+    Drivers call mark_executed() once the query is executed and record_batch() for every fetched batch.
+    """
+
+    def __init__(self):
+        self.start_cpu = cpu_times()
+        self.end_cpu: Optional[tuple[float, float]] = None
+        self.start_ns = perf_counter_ns()
+        self.executed_ns: Optional[int] = None
+        self.fetched_ns: Optional[int] = None
+        self.end_ns: Optional[int] = None
+        self.batch_arrivals_ns: list[int] = []
+        self.batch_rows: list[int] = []
+        self.batch_bytes: list[int] = []
+
+    def mark_executed(self, executed_ns: Optional[int] = None) -> None:
+        self.executed_ns = executed_ns or perf_counter_ns()
+
+    def record_batch(self, num_rows: int, nbytes: int = 0) -> None:
+        self.batch_arrivals_ns.append(perf_counter_ns())
+        self.batch_rows.append(num_rows)
+        self.batch_bytes.append(nbytes)
+
+    def mark_fetched(self) -> None:
+        self.fetched_ns = perf_counter_ns()
+
+    def finish(self) -> None:
+        self.end_ns = perf_counter_ns()
+        self.end_cpu = cpu_times()
+
+    @classmethod
+    def merge(cls, metrics: list["FetchMetrics"]) -> "FetchMetrics":
+        """
+        Merges metrics of queries running concurrently into metrics of one iteration.
+        """
+        merged = cls()
+        merged.start_ns = min(m.start_ns for m in metrics)
+        executed = [m.executed_ns for m in metrics if m.executed_ns is not None]
+        merged.executed_ns = min(executed) if executed else None
+        fetched = [m.fetched_ns for m in metrics if m.fetched_ns is not None]
+        merged.fetched_ns = max(fetched) if fetched else None
+        merged.end_ns = max(m.end_ns or perf_counter_ns() for m in metrics)
+        # CPU time of the process covers all queries, from the first start to the last end
+        merged.start_cpu = min(m.start_cpu for m in metrics)
+        merged.end_cpu = max((m.end_cpu for m in metrics if m.end_cpu is not None), default=cpu_times())
+        batches = sorted(
+            (arrival, rows, nbytes)
+            for m in metrics
+            for arrival, rows, nbytes in zip(m.batch_arrivals_ns, m.batch_rows, m.batch_bytes)
+        )
+        for arrival, rows, nbytes in batches:
+            merged.batch_arrivals_ns.append(arrival)
+            merged.batch_rows.append(rows)
+            merged.batch_bytes.append(nbytes)
+        return merged
+
+    @property
+    def rows(self) -> int:
+        return sum(self.batch_rows)
+
+    @property
+    def nbytes(self) -> int:
+        return sum(self.batch_bytes)
+
+    def ms_since_start(self, ns: Optional[int]) -> Optional[float]:
+        if ns is None:
+            return None
+        return (ns - self.start_ns) / NS_IN_MS
+
+    def to_result(self) -> IterationMetrics:
+        if self.end_ns is None:
+            self.finish()
+        duration = self.ms_since_start(self.end_ns)
+        seconds = duration / 1000
+        return IterationMetrics(
+            duration=duration,
+            execute_duration=self.ms_since_start(self.executed_ns),
+            first_batch_duration=self.ms_since_start(self.batch_arrivals_ns[0]) if self.batch_arrivals_ns else None,
+            rows=self.rows,
+            nbytes=self.nbytes,
+            rows_per_sec=self.rows / seconds if seconds else 0,
+            # Row drivers do not report bytes
+            mb_per_sec=self.nbytes / 1024 / 1024 / seconds if seconds and self.nbytes else None,
+            fetch_duration=self.ms_since_start(self.fetched_ns),
+            user_cpu=self.end_cpu[0] - self.start_cpu[0],
+            system_cpu=self.end_cpu[1] - self.start_cpu[1],
+            batches=[
+                BatchMetrics(arrival=self.ms_since_start(arrival), rows=rows, nbytes=nbytes)
+                for arrival, rows, nbytes in zip(self.batch_arrivals_ns, self.batch_rows, self.batch_bytes)
+            ],
+        )
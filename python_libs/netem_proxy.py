@@ -0,0 +1,240 @@
+import argparse
+import asyncio
+import logging
+import os
+import random
+import socket
+import subprocess
+import sys
+from contextlib import ExitStack, contextmanager
+from pathlib import Path
+from time import monotonic, sleep
+from typing import Iterator, Optional
+
+from python_libs.config import Location, NetworkConfig, read_config
+from python_libs.drivers import DB_TYPE_SNOWFLAKE
+
+LOGGER = logging.getLogger("NetemProxy")
+
+PROXY_HOST = "127.0.0.1"
+READ_BYTES = 256 * 1024
+# Bytes delayed by one direction of a connection, reading from the sender stops when it is full
+QUEUE_BYTES = 64 * 1024 * 1024
+STARTUP_TIMEOUT = 30
+# Proxy processes run this module with the repository root as working directory
+ROOT = Path(__file__).resolve().parent.parent
+
+
+class Link:
+    """
+    One direction of a proxied connection. Packets leave one after another at the bandwidth
+    and arrive after the one-way delay. Arrivals keep the order of packets, like TCP delivers the stream.
+    """
+
+    def __init__(self, network: NetworkConfig, rng: random.Random):
+        self.network = network
+        self.rng = rng
+        self.free_at = 0.0
+        self.last_arrival = 0.0
+
+    def one_way_delay(self) -> float:
+        delay = self.network.rtt_ms / 2
+        if self.network.jitter_ms:
+            delay += self.rng.gauss(0, self.network.jitter_ms)
+        return max(0.0, delay) / 1000
+
+    def schedule(self, size: int, now: float) -> float:
+        """
+        Arrival time (event loop clock) of a packet of size bytes sent now.
+        """
+        departure = max(now, self.free_at)
+        if self.network.bandwidth_mbit:
+            departure += size * 8 / (self.network.bandwidth_mbit * 1_000_000)
+        self.free_at = departure
+        self.last_arrival = max(departure + self.one_way_delay(), self.last_arrival)
+        return self.last_arrival
+
+
+async def pump(reader: asyncio.StreamReader, writer: asyncio.StreamWriter, link: Link) -> None:
+    loop = asyncio.get_running_loop()
+    packets: asyncio.Queue = asyncio.Queue(maxsize=max(1, QUEUE_BYTES // link.network.packet_bytes))
+
+    async def receive() -> None:
+        try:
+            while data := await reader.read(READ_BYTES):
+                for offset in range(0, len(data), link.network.packet_bytes):
+                    packet = data[offset:offset + link.network.packet_bytes]
+                    await packets.put((link.schedule(len(packet), loop.time()), packet))
+        except ConnectionError:
+            pass
+        await packets.put(None)
+
+    async def send() -> None:
+        try:
+            while (item := await packets.get()) is not None:
+                arrival, packet = item
+                if (delay := arrival - loop.time()) > 0:
+                    await asyncio.sleep(delay)
+                writer.write(packet)
+                if packets.empty():
+                    await writer.drain()
+            if writer.can_write_eof():
+                writer.write_eof()
+        except ConnectionError:
+            pass
+
+    await asyncio.gather(receive(), send())
+
+
+class NetemProxy:
+    """
+    TCP proxy to target_host:target_port emulating the network: round-trip time, jitter and a bandwidth cap
+    per direction with packet pacing. Every connection gets its own links, so connections do not share bandwidth.
+    """
+
+    def __init__(self, port: int, target_host: str, target_port: int, network: NetworkConfig, seed: int = 0):
+        self.port = port
+        self.target_host = target_host
+        self.target_port = target_port
+        self.network = network
+        self.rng = random.Random(seed)
+
+    async def handle(self, client_reader: asyncio.StreamReader, client_writer: asyncio.StreamWriter) -> None:
+        try:
+            # TCP handshake over the emulated network
+            await asyncio.sleep(self.network.rtt_ms / 1000)
+            server_reader, server_writer = await asyncio.open_connection(self.target_host, self.target_port)
+        except OSError as e:
+            LOGGER.error(f"Connection to {self.target_host}:{self.target_port} failed: {e}")
+            client_writer.close()
+            return
+        for writer in (client_writer, server_writer):
+            writer.get_extra_info("socket").setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+        try:
+            await asyncio.gather(
+                pump(client_reader, server_writer, Link(self.network, self.rng)),
+                pump(server_reader, client_writer, Link(self.network, self.rng)),
+            )
+        finally:
+            client_writer.close()
+            server_writer.close()
+
+    async def start(self) -> asyncio.Server:
+        LOGGER.info(
+            f"Proxy {PROXY_HOST}:{self.port} -> {self.target_host}:{self.target_port} rtt={self.network.rtt_ms} ms "
+            + f"jitter={self.network.jitter_ms} ms bandwidth={self.network.bandwidth_mbit or 'unlimited'} Mbit/s"
+        )
+        return await asyncio.start_server(self.handle, PROXY_HOST, self.port)
+
+
+def location_proxies(location: Location) -> list[NetemProxy]:
+    """
+    Proxies of databases of a location with network conditions, on consecutive ports from network.port.
+    Snowflake is reached by HTTPS with the account host name and cannot be routed through the proxy.
+    """
+    proxies = []
+    for i, database in enumerate(location.databases):
+        if database.db_type == DB_TYPE_SNOWFLAKE:
+            LOGGER.warning(f"{location.name}/{database.name}: Snowflake is not routed through the network emulator")
+            continue
+        proxies.append(NetemProxy(location.network.port + i, database.host, int(database.port), location.network))
+    return proxies
+
+
+async def serve(proxies: list[NetemProxy]) -> None:
+    servers = [await proxy.start() for proxy in proxies]
+    await asyncio.gather(*(server.serve_forever() for server in servers))
+
+
+def is_listening(port: int) -> bool:
+    with socket.socket(socket.AF_INET, socket.SOCK_STREAM) as sock:
+        return sock.connect_ex((PROXY_HOST, port)) == 0
+
+
+def stop_process(process: subprocess.Popen) -> None:
+    process.terminate()
+    try:
+        process.wait(timeout=10)
+    except subprocess.TimeoutExpired:
+        process.kill()
+
+
+@contextmanager
+def start_location_proxies(locations: list[Location], config_path: str = "config.yaml") -> Iterator[None]:
+    """
+    Routes databases of locations with network conditions through proxy processes, one per location.
+    Host and port of routed databases are replaced by the proxy. A location whose proxy ports are already
+    listening (e.g. a proxy started for the Java runner) reuses them.
+    Proxies run in their own processes, so their work does not compete with Python drivers for the GIL.
+    """
+    with ExitStack() as stack:
+        for location in locations:
+            if location.network is None:
+                continue
+            ports = [proxy.port for proxy in location_proxies(location)]
+            if not all(is_listening(port) for port in ports):
+                process = subprocess.Popen(
+                    [sys.executable, "-m", "python_libs.netem_proxy", "--location", location.name,
+                     "--config", os.path.abspath(config_path)],
+                    cwd=ROOT,
+                )
+                stack.callback(stop_process, process)
+                deadline = monotonic() + STARTUP_TIMEOUT
+                while not all(is_listening(port) for port in ports):
+                    if process.poll() is not None or monotonic() > deadline:
+                        raise RuntimeError(f"Network emulator of location {location.name} did not start")
+                    sleep(0.1)
+            for port, database in zip(ports, [d for d in location.databases if d.db_type != DB_TYPE_SNOWFLAKE]):
+                database.host = PROXY_HOST
+                database.port = str(port)
+        yield
+
+
+def parse_arguments() -> argparse.Namespace:
+    # noinspection PyTypeChecker
+    parser = argparse.ArgumentParser(
+        description="TCP proxy emulating round-trip time, jitter and bandwidth of a network.",
+        formatter_class=argparse.ArgumentDefaultsHelpFormatter,
+    )
+    parser.add_argument("--location", help="Proxy all databases of this location of the config (location.network)")
+    parser.add_argument("--config", default="config.yaml", help="Config file of --location")
+    parser.add_argument("-p", "--port", type=int, help="Listen port, without --location")
+    parser.add_argument("--target", help="host:port to proxy to, without --location")
+    parser.add_argument("--rtt-ms", type=float, default=0, help="Round-trip time, without --location")
+    parser.add_argument("--jitter-ms", type=float, default=0, help="Standard deviation of one-way delay")
+    parser.add_argument("--bandwidth-mbit", type=float, help="Bandwidth cap per direction and connection")
+    parser.add_argument("--packet-bytes", type=int, default=16384, help="Size of paced packets")
+    return parser.parse_args()
+
+
+def make_proxies(args: argparse.Namespace) -> list[NetemProxy]:
+    if args.location is not None:
+        locations = {location.name: location for location in read_config(args.config).locations}
+        location: Optional[Location] = locations.get(args.location)
+        if location is None or location.network is None:
+            raise ValueError(f"Location '{args.location}' with network conditions not found in {args.config}")
+        return location_proxies(location)
+    if args.port is None or args.target is None:
+        raise ValueError("Use --location or --port with --target")
+    host, port = args.target.rsplit(":", 1)
+    network = NetworkConfig(
+        port=args.port,
+        rtt_ms=args.rtt_ms,
+        jitter_ms=args.jitter_ms,
+        bandwidth_mbit=args.bandwidth_mbit,
+        packet_bytes=args.packet_bytes,
+    )
+    return [NetemProxy(args.port, host, int(port), network)]
+
+
+def main() -> None:
+    logging.basicConfig(level=logging.INFO, format="%(levelname)s - %(name)s - %(message)s")
+    args = parse_arguments()
+    try:
+        asyncio.run(serve(make_proxies(args)))
+    except KeyboardInterrupt:
+        pass
+
+
+if __name__ == "__main__":
+    main()
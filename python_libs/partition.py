@@ -0,0 +1,123 @@
+import re
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import ExitStack, contextmanager
+from typing import Any, Iterator, Optional
+
+import attrs
+import pyarrow as pa
+
+from python_libs.config import Database, PartitionConfig
+from python_libs.drivers import DriverPlugin
+from python_libs.metrics import FetchMetrics
+
+PARTITION_METHOD_MODULO = "modulo"
+PARTITION_METHOD_RANGE = "range"
+RE_LIMIT = re.compile(r"\s+LIMIT\s+(\d+)\s*$", re.IGNORECASE)
+RE_WHERE = re.compile(r"\bWHERE\b", re.IGNORECASE)
+
+
+def split_limit(query: str) -> tuple[str, Optional[int]]:
+    if (match := RE_LIMIT.search(query)) is None:
+        return query, None
+    return query[: match.start()], int(match.group(1))
+
+
+def partition_predicates(config: PartitionConfig, partition_count: int) -> list[str]:
+    if config.method == PARTITION_METHOD_MODULO:
+        return [f"MOD({config.key}, {partition_count}) = {i}" for i in range(partition_count)]
+    if config.method == PARTITION_METHOD_RANGE:
+        if config.range_min is None or config.range_max is None:
+            raise ValueError("Range partitioning requires range_min and range_max")
+        step = (config.range_max - config.range_min + 1) / partition_count
+        bounds = [config.range_min + round(i * step) for i in range(partition_count)]
+        bounds.append(config.range_max + 1)
+        return [
+            f"{config.key} >= {bounds[i]} AND {config.key} < {bounds[i + 1]}"
+            for i in range(partition_count)
+        ]
+    raise ValueError(
+        f"Unknown partition method '{config.method}', use '{PARTITION_METHOD_MODULO}' or '{PARTITION_METHOD_RANGE}'"
+    )
+
+
+def partition_queries(query: str, config: PartitionConfig, partition_count: int) -> list[str]:
+    """
+    Rewrites a plain "SELECT ... FROM ... [WHERE ...] [LIMIT n]" query into partition_count disjoint sub-queries.
+    The partition key does not have to be selected, the predicate is injected into the query itself.
+    The LIMIT is split between sub-queries, so they return the same number of rows as the original query
+    (as long as each partition holds enough rows).
+    """
+    base_query, limit = split_limit(query.strip().rstrip(";"))
+    keyword = "AND" if RE_WHERE.search(base_query) else "WHERE"
+    queries = []
+    for i, predicate in enumerate(partition_predicates(config, partition_count)):
+        partition_query = f"{base_query} {keyword} ({predicate})"
+        if limit is not None:
+            partition_limit = limit // partition_count + (1 if i < limit % partition_count else 0)
+            partition_query += f" LIMIT {partition_limit}"
+        queries.append(partition_query)
+    return queries
+
+
+@attrs.define(auto_attribs=True, kw_only=True)
+class ConnectionPool:
+    connections: list[Any]
+    pool: ThreadPoolExecutor
+
+
+class PartitionedDriver(DriverPlugin):
+    """
+    Runs partitioned sub-queries concurrently over a pool of connections of the wrapped driver
+    and stitches record batches into one pyarrow.Table. Table.from_batches does not copy the data.
+    """
+
+    def __init__(self, driver: DriverPlugin, partition_count: int, config: PartitionConfig):
+        self.driver = driver
+        self.partition_count = partition_count
+        self.config = config
+        self.connection_type = f"{driver.connection_type}_partitioned_{partition_count}"
+        self.db_types = driver.db_types
+        self.packages = driver.packages
+
+    def import_names(self, database: Database) -> list[str]:
+        return self.driver.import_names(database)
+
+    @contextmanager
+    def connect(self, database: Database) -> Iterator[ConnectionPool]:
+        with ExitStack() as stack:
+            connections = [
+                stack.enter_context(self.driver.connect(database)) for _ in range(self.partition_count)
+            ]
+            pool = stack.enter_context(ThreadPoolExecutor(max_workers=self.partition_count))
+            yield ConnectionPool(connections=connections, pool=pool)
+
+    def fetch_partition(self, connection: Any, query: str, metrics: FetchMetrics) -> list[pa.RecordBatch]:
+        return list(self.driver.fetch_batches(connection, query, metrics))
+
+    def fetch_table(self, connection: ConnectionPool, query: str, metrics: FetchMetrics) -> pa.Table:
+        queries = partition_queries(query, self.config, self.partition_count)
+        partition_metrics = [FetchMetrics() for _ in queries]
+        futures = [
+            connection.pool.submit(self.fetch_partition, partition_connection, partition_query, pm)
+            for partition_connection, partition_query, pm in zip(connection.connections, queries, partition_metrics)
+        ]
+        batches = [batch for future in futures for batch in future.result()]
+        # The first executed sub-query counts as executed, batches arrive once stitched
+        metrics.mark_executed(min((pm.executed_ns for pm in partition_metrics if pm.executed_ns), default=None))
+        if not batches:
+            return pa.table({})
+        return pa.Table.from_batches(batches)
+
+    def fetch_batches(self, connection: ConnectionPool, query: str, metrics: FetchMetrics) -> Iterator[pa.RecordBatch]:
+        yield from self.fetch_table(connection, query, metrics).to_batches()
+
+
+def make_partitioned_drivers(drivers: list[DriverPlugin], config: Optional[PartitionConfig]) -> list[DriverPlugin]:
+    if config is None:
+        return []
+    return [
+        PartitionedDriver(driver, partition_count, config)
+        for driver in drivers
+        if driver.produces_arrow and (config.connection_types is None or driver.connection_type in config.connection_types)
+        for partition_count in config.partition_counts
+    ]
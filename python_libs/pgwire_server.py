@@ -0,0 +1,1067 @@
+import argparse
+import functools
+import logging
+import re
+import socketserver
+import struct
+from datetime import date, datetime, timedelta
+from decimal import Decimal
+from typing import Any, Callable, Iterator, Optional
+
+import attrs
+
+LOGGER = logging.getLogger("PgWireServer")
+
+PROTOCOL_VERSION_3 = 196608
+SSL_REQUEST_CODE = 80877103
+GSSENC_REQUEST_CODE = 80877104
+CANCEL_REQUEST_CODE = 80877102
+FORMAT_TEXT = 0
+FORMAT_BINARY = 1
+# Rows with distinct values, longer results repeat them
+DEFAULT_CYCLE_ROWS = 4096
+# lineitem cardinality at TPC-H scale factor 1
+DEFAULT_TABLE_ROWS = 6_001_215
+# Flush the send buffer when it exceeds this size
+SEND_BUFFER_SIZE = 256 * 1024
+PG_EPOCH = date(2000, 1, 1)
+PG_EPOCH_TIMESTAMP = datetime(2000, 1, 1)
+COPY_BINARY_HEADER = b"PGCOPY\n\xff\r\n\x00" + struct.pack("!ii", 0, 0)
+COPY_BINARY_TRAILER = struct.pack("!h", -1)
+SERVER_PARAMETERS = {
+    "server_version": "14.0",
+    "server_encoding": "UTF8",
+    "client_encoding": "UTF8",
+    "DateStyle": "ISO, MDY",
+    "IntervalStyle": "postgres",
+    "TimeZone": "UTC",
+    "integer_datetimes": "on",
+    "standard_conforming_strings": "on",
+    "is_superuser": "off",
+}
+SHOW_VALUES = {
+    "transaction_isolation": "read committed",
+    "max_identifier_length": "63",
+    "server_version_num": "140000",
+}
+# SELECT expressions without FROM clause, which drivers send after connect
+FUNCTION_VALUES = {
+    "version()": "PostgreSQL 14.0 (synthetic pgwire server)",
+    "current_schema()": "public",
+    "pg_client_encoding()": "UTF8",
+    "current_setting('server_version_num')": "140000",
+}
+
+
+@attrs.define(frozen=True, auto_attribs=True, kw_only=True)
+class PgType:
+    oid: int
+    name: str
+    receive: str
+    array_oid: int
+    length: int
+
+
+PG_TYPES = [
+    PgType(oid=16, name="bool", receive="boolrecv", array_oid=1000, length=1),
+    PgType(oid=17, name="bytea", receive="bytearecv", array_oid=1001, length=-1),
+    PgType(oid=18, name="char", receive="charrecv", array_oid=1002, length=1),
+    PgType(oid=19, name="name", receive="namerecv", array_oid=1003, length=64),
+    PgType(oid=20, name="int8", receive="int8recv", array_oid=1016, length=8),
+    PgType(oid=21, name="int2", receive="int2recv", array_oid=1005, length=2),
+    PgType(oid=23, name="int4", receive="int4recv", array_oid=1007, length=4),
+    PgType(oid=25, name="text", receive="textrecv", array_oid=1009, length=-1),
+    PgType(oid=26, name="oid", receive="oidrecv", array_oid=1028, length=4),
+    PgType(oid=700, name="float4", receive="float4recv", array_oid=1021, length=4),
+    PgType(oid=701, name="float8", receive="float8recv", array_oid=1022, length=8),
+    PgType(oid=1042, name="bpchar", receive="bpcharrecv", array_oid=1014, length=-1),
+    PgType(oid=1043, name="varchar", receive="varcharrecv", array_oid=1015, length=-1),
+    PgType(oid=1082, name="date", receive="date_recv", array_oid=1182, length=4),
+    PgType(oid=1114, name="timestamp", receive="timestamp_recv", array_oid=1115, length=8),
+    PgType(oid=1184, name="timestamptz", receive="timestamptz_recv", array_oid=1185, length=8),
+    PgType(oid=1700, name="numeric", receive="numeric_recv", array_oid=1231, length=-1),
+]
+PG_TYPES_BY_OID = {t.oid: t for t in PG_TYPES}
+OID_INT4, OID_INT8, OID_TEXT, OID_VARCHAR, OID_DATE, OID_NUMERIC = 23, 20, 25, 1043, 1082, 1700
+OID_TIMESTAMP = 1114
+# numeric(15, 2) as in TPC-H, typmod = (precision << 16 | scale) + 4
+NUMERIC_15_2_TYPMOD = (15 << 16 | 2) + 4
+
+
+class PgError(Exception):
+    def __init__(self, code: str, message: str):
+        super().__init__(message)
+        self.code = code
+
+
+#####################################
+# Value encoding
+#####################################
+
+
+def encode_numeric_binary(value: Decimal) -> bytes:
+    sign, digits, exponent = value.as_tuple()
+    dscale = max(0, -exponent)
+    # Fractions below 0.1 have fewer digits than the scale, e.g. 0.03 is (3,) with exponent -2
+    text = "".join(map(str, digits)).zfill(max(0, -exponent))
+    integer_part = text[: len(text) + exponent] if exponent < 0 else text + "0" * exponent
+    fraction_part = text[len(text) + exponent:] if exponent < 0 else ""
+    integer_part = integer_part.lstrip("0")
+    # Base 10000 digits aligned to the decimal point
+    integer_part = "0" * (-len(integer_part) % 4) + integer_part
+    fraction_part = fraction_part + "0" * (-len(fraction_part) % 4)
+    groups = [int(integer_part[i:i + 4]) for i in range(0, len(integer_part), 4)]
+    weight = len(groups) - 1
+    groups += [int(fraction_part[i:i + 4]) for i in range(0, len(fraction_part), 4)]
+    while groups and groups[0] == 0:
+        groups.pop(0)
+        weight -= 1
+    while groups and groups[-1] == 0:
+        groups.pop()
+    if not groups:
+        weight = 0
+    header = struct.pack("!hhHh", len(groups), weight, 0x4000 if sign else 0, dscale)
+    return header + struct.pack(f"!{len(groups)}h", *groups)
+
+
+BINARY_ENCODERS: dict[int, Callable[[Any], bytes]] = {
+    OID_INT4: lambda v: struct.pack("!i", v),
+    OID_INT8: lambda v: struct.pack("!q", v),
+    OID_TEXT: lambda v: v.encode(),
+    OID_VARCHAR: lambda v: v.encode(),
+    OID_DATE: lambda v: struct.pack("!i", (v - PG_EPOCH).days),
+    OID_TIMESTAMP: lambda v: struct.pack("!q", (v - PG_EPOCH_TIMESTAMP) // timedelta(microseconds=1)),
+    OID_NUMERIC: encode_numeric_binary,
+}
+
+
+def encode_value(value: Any, type_oid: int, format_code: int) -> Optional[bytes]:
+    if value is None:
+        return None
+    if format_code == FORMAT_BINARY:
+        return BINARY_ENCODERS[type_oid](value)
+    if isinstance(value, bool):
+        return b"t" if value else b"f"
+    return str(value).encode()
+
+
+def encode_field(value: Optional[bytes]) -> bytes:
+    if value is None:
+        return struct.pack("!i", -1)
+    return struct.pack("!i", len(value)) + value
+
+
+def message(type_code: bytes, payload: bytes = b"") -> bytes:
+    return type_code + struct.pack("!i", len(payload) + 4) + payload
+
+
+def cstr(value: str) -> bytes:
+    return value.encode() + b"\x00"
+
+
+def data_row(fields: list[Optional[bytes]]) -> bytes:
+    return message(b"D", struct.pack("!h", len(fields)) + b"".join(encode_field(f) for f in fields))
+
+
+def copy_binary_tuple(fields: list[Optional[bytes]]) -> bytes:
+    return struct.pack("!h", len(fields)) + b"".join(encode_field(f) for f in fields)
+
+
+def copy_text_line(values: list[Any]) -> bytes:
+    return ("\t".join("\\N" if v is None else str(v) for v in values) + "\n").encode()
+
+
+#####################################
+# Synthetic lineitem table
+#####################################
+
+RETURN_FLAGS = ["R", "A", "N"]
+LINE_STATUSES = ["O", "F"]
+SHIP_MODES = ["REG AIR", "AIR", "RAIL", "SHIP", "TRUCK", "MAIL", "FOB"]
+SHIP_INSTRUCTS = ["DELIVER IN PERSON", "COLLECT COD", "NONE", "TAKE BACK RETURN"]
+COMMENT_WORDS = ["carefully", "final", "deposits", "slyly", "regular", "pending", "ironic", "accounts", "quickly", "express"]
+SHIP_DATE_START = date(1992, 1, 2)
+SHIP_DATE_DAYS = 2526
+
+
+@attrs.define(frozen=True, auto_attribs=True, kw_only=True)
+class PgColumn:
+    name: str
+    type_oid: int
+    typmod: int = -1
+    # Key columns are unique per row, they cannot be pre-encoded for a cycle of rows
+    is_key: bool = False
+
+    @property
+    def type_length(self) -> int:
+        return PG_TYPES_BY_OID[self.type_oid].length
+
+
+def cents(value: int) -> Decimal:
+    return Decimal(value).scaleb(-2)
+
+
+def ship_date(n: int) -> date:
+    return SHIP_DATE_START + timedelta(days=(n * 13) % SHIP_DATE_DAYS)
+
+
+LINEITEM_COLUMNS: list[tuple[PgColumn, Callable[[int], Any]]] = [
+    (PgColumn(name="l_orderkey", type_oid=OID_INT8, is_key=True), lambda n: n // 4 + 1),
+    (PgColumn(name="l_partkey", type_oid=OID_INT8), lambda n: (n * 7919) % 200_000 + 1),
+    (PgColumn(name="l_suppkey", type_oid=OID_INT8), lambda n: (n * 104_729) % 10_000 + 1),
+    (PgColumn(name="l_linenumber", type_oid=OID_INT4, is_key=True), lambda n: n % 4 + 1),
+    (PgColumn(name="l_quantity", type_oid=OID_NUMERIC, typmod=NUMERIC_15_2_TYPMOD), lambda n: cents((n % 50 + 1) * 100)),
+    (
+        PgColumn(name="l_extendedprice", type_oid=OID_NUMERIC, typmod=NUMERIC_15_2_TYPMOD),
+        lambda n: cents((n % 50 + 1) * (90_000 + n % 10_000)),
+    ),
+    (PgColumn(name="l_discount", type_oid=OID_NUMERIC, typmod=NUMERIC_15_2_TYPMOD), lambda n: cents(n % 11)),
+    (PgColumn(name="l_tax", type_oid=OID_NUMERIC, typmod=NUMERIC_15_2_TYPMOD), lambda n: cents(n % 9)),
+    (PgColumn(name="l_returnflag", type_oid=OID_VARCHAR), lambda n: RETURN_FLAGS[n % 3]),
+    (PgColumn(name="l_linestatus", type_oid=OID_VARCHAR), lambda n: LINE_STATUSES[n % 2]),
+    (PgColumn(name="l_shipdate", type_oid=OID_DATE), ship_date),
+    (PgColumn(name="l_commitdate", type_oid=OID_DATE), lambda n: ship_date(n) + timedelta(days=30 - n % 60)),
+    (PgColumn(name="l_receiptdate", type_oid=OID_DATE), lambda n: ship_date(n) + timedelta(days=1 + n % 30)),
+    (PgColumn(name="l_shipinstruct", type_oid=OID_VARCHAR), lambda n: SHIP_INSTRUCTS[n % 4]),
+    (PgColumn(name="l_shipmode", type_oid=OID_VARCHAR), lambda n: SHIP_MODES[n % 7]),
+    (
+        PgColumn(name="l_comment", type_oid=OID_VARCHAR),
+        lambda n: " ".join(COMMENT_WORDS[(n + i * 3) % len(COMMENT_WORDS)] for i in range(n % 5 + 2)),
+    ),
+]
+LINEITEM_COLUMNS_BY_NAME = {column.name: (column, value) for column, value in LINEITEM_COLUMNS}
+
+
+class RowSource:
+    """
+    Deterministic lineitem rows of selected columns. Values repeat with period cycle_rows.
+    Messages of one cycle are encoded once per format and then streamed as slices of a pre-encoded block.
+    Results selecting key columns are encoded row by row.
+    """
+
+    # Pre-encoded cycles, shared by all connections
+    cache: dict[tuple, Any] = {}
+
+    def __init__(self, columns: list[PgColumn], values: list[Callable[[int], Any]], row_count: int, cycle_rows: int):
+        self.columns = columns
+        self.values = values
+        self.row_count = row_count
+        self.cycle_rows = cycle_rows
+        self.has_keys = any(column.is_key for column in columns)
+
+    def encode_fields(self, n: int, formats: list[int], kind: str, keys_only: bool = False) -> list[Any]:
+        """
+        Encoded fields of row n: framed bytes for data_row and copy_binary, strings for copy_text.
+        With keys_only, fields of non-key columns are None.
+        """
+        fields = []
+        for value, column, format_code in zip(self.values, self.columns, formats):
+            if keys_only and not column.is_key:
+                fields.append(None)
+            elif kind == "copy_text":
+                fields.append(str(value(n)))
+            else:
+                fields.append(encode_field(encode_value(value(n), column.type_oid, format_code)))
+        return fields
+
+    def frame(self, fields: list[Any], kind: str) -> bytes:
+        if kind == "copy_text":
+            return message(b"d", ("\t".join(fields) + "\n").encode())
+        payload = struct.pack("!h", len(fields)) + b"".join(fields)
+        return message(b"d" if kind == "copy_binary" else b"D", payload)
+
+    def encode_row(self, n: int, formats: list[int], kind: str) -> bytes:
+        return self.frame(self.encode_fields(n, formats, kind), kind)
+
+    def cached(self, formats: list[int], kind: str, what: str, build: Callable[[], Any]) -> Any:
+        key = (tuple(self.columns), tuple(self.values), tuple(formats), kind, self.cycle_rows, what)
+        if key not in self.cache:
+            self.cache[key] = build()
+        return self.cache[key]
+
+    def cycle_block(self, formats: list[int], kind: str) -> tuple[bytes, list[int]]:
+        def build() -> tuple[bytes, list[int]]:
+            rows = [self.encode_row(n, formats, kind) for n in range(self.cycle_rows)]
+            offsets = [0]
+            for row in rows:
+                offsets.append(offsets[-1] + len(row))
+            return b"".join(rows), offsets
+
+        return self.cached(formats, kind, "block", build)
+
+    def cycle_fields(self, formats: list[int], kind: str) -> list[list[Any]]:
+        def build() -> list[list[Any]]:
+            return [
+                [None if column.is_key else field for column, field in zip(self.columns, self.encode_fields(n, formats, kind))]
+                for n in range(self.cycle_rows)
+            ]
+
+        return self.cached(formats, kind, "fields", build)
+
+    def encoded(self, start: int, count: int, formats: list[int], kind: str = "data_row") -> Iterator[bytes]:
+        """
+        Yields encoded messages of rows start..start+count in chunks.
+        kind is data_row, copy_binary or copy_text.
+        """
+        end = min(start + count, self.row_count)
+        if self.has_keys:
+            cycle = self.cycle_fields(formats, kind)
+            position = start
+            while position < end:
+                chunk_end = min(position + self.cycle_rows, end)
+                rows = []
+                for n in range(position, chunk_end):
+                    keys = self.encode_fields(n, formats, kind, keys_only=True)
+                    rows.append(self.frame([k if k is not None else f for k, f in zip(keys, cycle[n % self.cycle_rows])], kind))
+                yield b"".join(rows)
+                position = chunk_end
+            return
+        block, offsets = self.cycle_block(formats, kind)
+        position = start
+        while position < end:
+            cycle_start = position % self.cycle_rows
+            chunk = min(self.cycle_rows - cycle_start, end - position)
+            yield block[offsets[cycle_start]:offsets[cycle_start + chunk]]
+            position += chunk
+
+
+#####################################
+# SQL handling
+#####################################
+
+RE_COPY = re.compile(r"^COPY\s*\((.*)\)\s*TO\s+STDOUT\b(.*)$", re.IGNORECASE | re.DOTALL)
+RE_DECLARE = re.compile(r"^DECLARE\s+(\"[^\"]+\"|\S+)\s+(.*?)CURSOR\b.*?\bFOR\s+(.*)$", re.IGNORECASE | re.DOTALL)
+RE_FETCH = re.compile(r"^FETCH\s+(?:FORWARD\s+)?(ALL|\d+)?\s*(?:IN|FROM)?\s*(\"[^\"]+\"|\S+)$", re.IGNORECASE)
+RE_CLOSE = re.compile(r"^CLOSE\s+(\"[^\"]+\"|\S+)$", re.IGNORECASE)
+RE_SELECT_DERIVED = re.compile(r"^SELECT\s+\*\s+FROM\s*\((.*)\)\s*(?:AS\s+)?\w*(.*)$", re.IGNORECASE | re.DOTALL)
+RE_SELECT = re.compile(r"^SELECT\s+(.*?)(?:\s+FROM\s+(\S+)(.*))?$", re.IGNORECASE | re.DOTALL)
+RE_LIMIT = re.compile(r"\bLIMIT\s+(\d+)", re.IGNORECASE)
+RE_MOD = re.compile(r"MOD\(\s*[\w\"]+\s*,\s*(\d+)\s*\)\s*=\s*(\d+)", re.IGNORECASE)
+RE_RANGE = re.compile(r"[\w\"]+\s*>=\s*(\d+)\s+AND\s+[\w\"]+\s*<\s*(\d+)", re.IGNORECASE)
+RE_TYPNAME_FILTER = re.compile(r"typname\s*=\s*'([^']*)'", re.IGNORECASE)
+RE_OID_FILTER = re.compile(r"\boid\s*=\s*(\d+)", re.IGNORECASE)
+COMMAND_TAGS = {
+    "SET": "SET", "RESET": "RESET", "BEGIN": "BEGIN", "START": "START TRANSACTION", "COMMIT": "COMMIT",
+    "END": "COMMIT", "ROLLBACK": "ROLLBACK", "ABORT": "ROLLBACK", "DISCARD": "DISCARD ALL",
+    "DEALLOCATE": "DEALLOCATE", "SAVEPOINT": "SAVEPOINT", "RELEASE": "RELEASE",
+}
+CATALOG_TABLES = {"pg_type", "pg_attribute", "pg_namespace", "pg_class", "pg_proc", "pg_database", "pg_settings"}
+
+
+def strip_comments(sql: str) -> str:
+    """
+    Removes -- line comments and /* */ block comments outside of quoted strings and identifiers.
+    """
+    result, quoted, i = [], None, 0
+    while i < len(sql):
+        char = sql[i]
+        if quoted:
+            quoted = None if char == quoted else quoted
+        elif char in "'\"":
+            quoted = char
+        elif sql.startswith("--", i):
+            end = sql.find("\n", i)
+            i = len(sql) if end < 0 else end
+            continue
+        elif sql.startswith("/*", i):
+            end = sql.find("*/", i + 2)
+            i = len(sql) if end < 0 else end + 2
+            # A comment separates tokens like whitespace
+            result.append(" ")
+            continue
+        result.append(char)
+        i += 1
+    return "".join(result)
+
+
+def split_statements(sql: str) -> list[str]:
+    sql = strip_comments(sql)
+    statements, current, quoted = [], [], None
+    for char in sql:
+        if quoted:
+            quoted = None if char == quoted else quoted
+        elif char in "'\"":
+            quoted = char
+        elif char == ";":
+            statements.append("".join(current).strip())
+            current = []
+            continue
+        current.append(char)
+    statements.append("".join(current).strip())
+    return [s for s in statements if s]
+
+
+def split_select_list(select_list: str) -> list[str]:
+    items, current, depth, quoted = [], [], 0, None
+    for char in select_list:
+        if quoted:
+            quoted = None if char == quoted else quoted
+        elif char in "'\"":
+            quoted = char
+        elif char == "(":
+            depth += 1
+        elif char == ")":
+            depth -= 1
+        elif char == "," and depth == 0:
+            items.append("".join(current).strip())
+            current = []
+            continue
+        current.append(char)
+    items.append("".join(current).strip())
+    return items
+
+
+def unquote(identifier: str) -> str:
+    return identifier.split(".")[-1].strip().strip('"').lower()
+
+
+def parse_select_item(item: str) -> tuple[str, str]:
+    """
+    Returns expression and output name of a select list item.
+    """
+    match = re.match(r"^(.*?)\s+(?:AS\s+)?(\"[^\"]+\"|\w+)$", item, re.IGNORECASE | re.DOTALL)
+    if match and not match.group(1).strip().upper().endswith(("::", "CAST(")):
+        return match.group(1).strip(), match.group(2).strip('"')
+    expression = item.strip()
+    name = re.sub(r"\(.*$", "", unquote(expression)) if "(" in expression else unquote(expression)
+    return expression, name
+
+
+RE_TOKEN = re.compile(r"""\s*(?:("[^"]+")|('(?:[^']|'')*')|(\d+(?:\.\d+)?)|(\w+)|(\|\||::|[-+*(),]))""")
+INTEGER_OIDS = (OID_INT4, OID_INT8)
+# Target types of CAST and ::, type modifiers (e.g. VARCHAR(20)) are accepted and ignored
+CAST_TYPES = {
+    "int": OID_INT4, "integer": OID_INT4, "int4": OID_INT4, "bigint": OID_INT8, "int8": OID_INT8,
+    "numeric": OID_NUMERIC, "decimal": OID_NUMERIC, "text": OID_TEXT, "varchar": OID_VARCHAR,
+    "char": OID_VARCHAR, "date": OID_DATE, "timestamp": OID_TIMESTAMP,
+}
+CAST_FUNCTIONS: dict[int, Callable[[Any], Any]] = {
+    OID_INT4: int,
+    OID_INT8: int,
+    OID_NUMERIC: lambda v: Decimal(v) if not isinstance(v, Decimal) else v,
+    OID_TEXT: str,
+    OID_VARCHAR: str,
+    OID_DATE: lambda v: v.date() if isinstance(v, datetime) else date.fromisoformat(str(v)),
+    OID_TIMESTAMP: lambda v: datetime(v.year, v.month, v.day) if not isinstance(v, datetime) else v,
+}
+
+
+@attrs.define(frozen=True, auto_attribs=True)
+class Expression:
+    """
+    Compiled select list expression: result type and value of row n.
+    """
+
+    type_oid: int
+    value: Callable[[int], Any]
+    # Depends on a key column, so its values are unique per row
+    is_key: bool = False
+    typmod: int = -1
+
+
+def unsupported_expression(expression: str) -> PgError:
+    return PgError("0A000", f"Expression not supported by the synthetic server: {expression[:100]}")
+
+
+class ExpressionParser:
+    """
+    Recursive descent parser of select list expressions over lineitem columns: literals, + - * and parentheses
+    over integers, NUMERIC and dates (date + integer), || concatenation, CAST(x AS type) and x::type.
+    Anything else raises an "expression not supported" error.
+    """
+
+    def __init__(self, expression: str):
+        self.expression = expression
+        self.tokens: list[tuple[str, str]] = []
+        position = 0
+        kinds = ("identifier", "string", "number", "word", "operator")
+        while position < len(expression.rstrip()):
+            match = RE_TOKEN.match(expression, position)
+            if match is None:
+                raise unsupported_expression(expression)
+            kind = kinds[match.lastindex - 1]
+            self.tokens.append((kind, match.group(match.lastindex)))
+            position = match.end()
+        self.position = 0
+
+    def peek(self) -> Optional[str]:
+        return self.tokens[self.position][1] if self.position < len(self.tokens) else None
+
+    def take(self, expected: Optional[str] = None) -> tuple[str, str]:
+        if self.position >= len(self.tokens):
+            raise unsupported_expression(self.expression)
+        kind, token = self.tokens[self.position]
+        if expected is not None and token.upper() != expected:
+            raise unsupported_expression(self.expression)
+        self.position += 1
+        return kind, token
+
+    def parse(self) -> Expression:
+        result = self.concatenation()
+        if self.position != len(self.tokens):
+            raise unsupported_expression(self.expression)
+        return result
+
+    def concatenation(self) -> Expression:
+        parts = [self.additive()]
+        while self.peek() == "||":
+            self.take()
+            parts.append(self.additive())
+        if len(parts) == 1:
+            return parts[0]
+        values = [part.value for part in parts]
+        return Expression(
+            OID_TEXT, lambda n: "".join(str(value(n)) for value in values), any(part.is_key for part in parts)
+        )
+
+    def additive(self) -> Expression:
+        result = self.multiplicative()
+        while self.peek() in ("+", "-"):
+            _, operator = self.take()
+            result = self.arithmetic(operator, result, self.multiplicative())
+        return result
+
+    def multiplicative(self) -> Expression:
+        result = self.postfix()
+        while self.peek() == "*":
+            _, operator = self.take()
+            result = self.arithmetic(operator, result, self.postfix())
+        return result
+
+    def postfix(self) -> Expression:
+        result = self.primary()
+        while self.peek() == "::":
+            self.take()
+            result = self.cast(result)
+        return result
+
+    def primary(self) -> Expression:
+        kind, token = self.take()
+        if token == "(":
+            result = self.concatenation()
+            self.take(")")
+            return result
+        if token == "-":
+            operand = self.postfix()
+            if operand.type_oid not in INTEGER_OIDS + (OID_NUMERIC,):
+                raise unsupported_expression(self.expression)
+            return Expression(operand.type_oid, lambda n: -operand.value(n), operand.is_key)
+        if kind == "number":
+            value = Decimal(token) if "." in token else int(token)
+            return Expression(OID_NUMERIC if "." in token else OID_INT4, lambda n: value)
+        if kind == "string":
+            text = token[1:-1].replace("''", "'")
+            return Expression(OID_TEXT, lambda n: text)
+        if kind == "word" and token.upper() == "CAST":
+            self.take("(")
+            operand = self.concatenation()
+            self.take("AS")
+            result = self.cast(operand)
+            self.take(")")
+            return result
+        if kind == "word" and self.peek() == "(":
+            # Function calls other than CAST
+            raise unsupported_expression(self.expression)
+        if kind in ("identifier", "word"):
+            column_name = unquote(token)
+            if column_name not in LINEITEM_COLUMNS_BY_NAME:
+                raise PgError("42703", f'column "{column_name}" does not exist')
+            column, value = LINEITEM_COLUMNS_BY_NAME[column_name]
+            return Expression(column.type_oid, value, column.is_key, column.typmod)
+        raise unsupported_expression(self.expression)
+
+    def cast(self, operand: Expression) -> Expression:
+        _, type_name = self.take()
+        type_oid = CAST_TYPES.get(type_name.lower())
+        if type_oid is None:
+            raise unsupported_expression(self.expression)
+        if self.peek() == "(":
+            # Type modifiers, e.g. VARCHAR(20) or NUMERIC(15, 2)
+            while self.take()[1] != ")":
+                pass
+        convert = CAST_FUNCTIONS[type_oid]
+        return Expression(type_oid, lambda n: convert(operand.value(n)), operand.is_key)
+
+    def arithmetic(self, operator: str, left: Expression, right: Expression) -> Expression:
+        is_key = left.is_key or right.is_key
+        types = (left.type_oid, right.type_oid)
+        if operator in "+-" and left.type_oid == OID_DATE and right.type_oid in INTEGER_OIDS:
+            sign = 1 if operator == "+" else -1
+            return Expression(OID_DATE, lambda n: left.value(n) + timedelta(days=sign * right.value(n)), is_key)
+        if all(t in INTEGER_OIDS + (OID_NUMERIC,) for t in types):
+            function = {"+": lambda a, b: a + b, "-": lambda a, b: a - b, "*": lambda a, b: a * b}[operator]
+            if OID_NUMERIC in types:
+                type_oid = OID_NUMERIC
+            else:
+                type_oid = OID_INT8 if OID_INT8 in types else OID_INT4
+            return Expression(type_oid, lambda n: function(left.value(n), right.value(n)), is_key)
+        raise unsupported_expression(self.expression)
+
+
+@functools.lru_cache(maxsize=1024)
+def compile_expression(expression: str) -> Expression:
+    """
+    The same expression text gets the same value function, so pre-encoded cycles of RowSource are reused.
+    """
+    return ExpressionParser(expression).parse()
+
+
+@attrs.define(auto_attribs=True, kw_only=True)
+class QueryPlan:
+    """
+    What a statement returns: command tag only, rows of a RowSource, or literal rows (catalog queries).
+    """
+
+    tag: str
+    columns: Optional[list[PgColumn]] = None
+    source: Optional[RowSource] = None
+    literal_rows: Optional[list[list[Any]]] = None
+    copy_format: Optional[str] = None
+    cursor: Optional[str] = None
+    fetch_count: Optional[int] = None
+    declare: Optional[tuple[str, "QueryPlan", int]] = None
+
+
+class Planner:
+    def __init__(self, table_rows: int, cycle_rows: int):
+        self.table_rows = table_rows
+        self.cycle_rows = cycle_rows
+
+    def plan(self, sql: str) -> QueryPlan:
+        sql = strip_comments(sql).strip().rstrip(";").strip()
+        keyword = sql.split(None, 1)[0].upper() if sql else ""
+        if keyword in COMMAND_TAGS:
+            return QueryPlan(tag=COMMAND_TAGS[keyword])
+        if keyword == "SHOW":
+            name = unquote(sql.split(None, 1)[1])
+            value = SERVER_PARAMETERS.get(name, SHOW_VALUES.get(name, ""))
+            return QueryPlan(tag="SHOW", columns=[PgColumn(name=name, type_oid=OID_TEXT)], literal_rows=[[value]])
+        if (match := RE_COPY.match(sql)) is not None:
+            inner = self.plan(match.group(1))
+            options = match.group(2).lower()
+            copy_format = "binary" if "binary" in options else "text"
+            return attrs.evolve(inner, tag="COPY", copy_format=copy_format)
+        if (match := RE_DECLARE.match(sql)) is not None:
+            binary = "binary" in match.group(2).lower()
+            inner = self.plan(match.group(3))
+            return QueryPlan(tag="DECLARE CURSOR", declare=(unquote(match.group(1)), inner, FORMAT_BINARY if binary else FORMAT_TEXT))
+        if (match := RE_FETCH.match(sql)) is not None:
+            count = None if match.group(1) is None or match.group(1).upper() == "ALL" else int(match.group(1))
+            return QueryPlan(tag="FETCH", cursor=unquote(match.group(2)), fetch_count=count)
+        if (match := RE_CLOSE.match(sql)) is not None:
+            return QueryPlan(tag="CLOSE CURSOR", cursor=unquote(match.group(1)))
+        if (match := RE_SELECT_DERIVED.match(sql)) is not None:
+            # Drivers wrap queries to describe result types (SELECT * FROM (query) AS q LIMIT 0)
+            inner = self.plan(match.group(1))
+            if inner.source is not None and (limit := RE_LIMIT.search(match.group(2))) is not None:
+                inner.source.row_count = min(inner.source.row_count, int(limit.group(1)))
+            return inner
+        if (match := RE_SELECT.match(sql)) is not None:
+            return self.plan_select(match.group(1), match.group(2), match.group(3) or "", sql)
+        raise PgError("0A000", f"Statement not supported by the synthetic server: {sql[:100]}")
+
+    def plan_select(self, select_list: str, table: Optional[str], rest: str, sql: str) -> QueryPlan:
+        items = [parse_select_item(item) for item in split_select_list(select_list)]
+        if table is None:
+            columns = [PgColumn(name=name, type_oid=OID_TEXT) for _, name in items]
+            values = [FUNCTION_VALUES.get(expression.lower(), expression.strip("'")) for expression, _ in items]
+            return QueryPlan(tag="SELECT", columns=columns, literal_rows=[values])
+        table_name = unquote(table)
+        if table_name in CATALOG_TABLES:
+            return self.plan_catalog(table_name, items, sql)
+        if table_name != "lineitem":
+            raise PgError("42P01", f'relation "{table_name}" does not exist')
+        columns, values = [], []
+        for expression, name in items:
+            if expression == "*":
+                columns += [column for column, _ in LINEITEM_COLUMNS]
+                values += [value for _, value in LINEITEM_COLUMNS]
+                continue
+            compiled = compile_expression(expression)
+            columns.append(
+                PgColumn(name=name, type_oid=compiled.type_oid, typmod=compiled.typmod, is_key=compiled.is_key)
+            )
+            values.append(compiled.value)
+        source = RowSource(columns, values, self.row_count(rest), self.cycle_rows)
+        return QueryPlan(tag="SELECT", columns=columns, source=source)
+
+    def row_count(self, rest: str) -> int:
+        """
+        WHERE predicates only reduce the number of returned rows. Supported are the partition predicates
+        generated by python_libs.partition: MOD(key, k) = i and key >= a AND key < b.
+        """
+        rows = self.table_rows
+        if (match := RE_MOD.search(rest)) is not None:
+            modulo, remainder = int(match.group(1)), int(match.group(2))
+            rows = len(range(remainder, self.table_rows, modulo))
+        elif (match := RE_RANGE.search(rest)) is not None:
+            rows = max(0, min(int(match.group(2)), self.table_rows + 1) - max(int(match.group(1)), 1))
+        if (match := RE_LIMIT.search(rest)) is not None:
+            rows = min(rows, int(match.group(1)))
+        return rows
+
+    @staticmethod
+    def plan_catalog(table_name: str, items: list[tuple[str, str]], sql: str) -> QueryPlan:
+        """
+        Answers type lookups of drivers from PG_TYPES, other catalog tables are empty.
+        """
+        columns = [PgColumn(name=name, type_oid=OID_TEXT) for _, name in items]
+        rows = []
+        if table_name == "pg_type":
+            types = []
+            arrays = "'array_recv'" in sql and "!= 'array_recv'" not in sql.replace("<>", "!=")
+            for pg_type in PG_TYPES:
+                base = {
+                    "oid": pg_type.oid, "typname": pg_type.name, "typreceive": pg_type.receive,
+                    "typbasetype": 0, "typarray": pg_type.array_oid, "typrelid": 0, "typelem": 0,
+                    "typtype": "b", "typnamespace": 11, "typlen": pg_type.length, "typinput": f"{pg_type.name}in",
+                }
+                if arrays:
+                    base = dict(
+                        base, oid=pg_type.array_oid, typname=f"_{pg_type.name}", typreceive="array_recv",
+                        typarray=0, typelem=pg_type.oid, typlen=-1, typinput="array_in",
+                    )
+                types.append(base)
+            if (match := RE_TYPNAME_FILTER.search(sql)) is not None:
+                types = [t for t in types if t["typname"] == match.group(1)]
+            if (match := RE_OID_FILTER.search(sql)) is not None:
+                types = [t for t in types if t["oid"] == int(match.group(1))]
+            rows = [[t.get(unquote(expression)) for expression, _ in items] for t in types]
+        return QueryPlan(tag="SELECT", columns=columns, literal_rows=rows)
+
+
+#####################################
+# Protocol
+#####################################
+
+
+@attrs.define(auto_attribs=True, kw_only=True)
+class Portal:
+    plan: QueryPlan
+    formats: list[int]
+    position: int = 0
+
+
+class PgWireHandler(socketserver.BaseRequestHandler):
+    """
+    One client connection. Implements startup (trust authentication, SSL/GSS encryption refused),
+    simple and extended query protocol, COPY TO STDOUT (text and binary) and DECLARE/FETCH cursors.
+    """
+
+    server: "PgWireServer"
+
+    def setup(self) -> None:
+        self.input = self.request.makefile("rb")
+        self.output = bytearray()
+        self.statements: dict[str, QueryPlan] = {}
+        self.portals: dict[str, Portal] = {}
+        self.cursors: dict[str, Portal] = {}
+        self.transaction_status = b"I"
+        self.skip_until_sync = False
+
+    def read_exact(self, size: int) -> bytes:
+        data = self.input.read(size)
+        if len(data) < size:
+            raise EOFError
+        return data
+
+    def send(self, data: bytes) -> None:
+        self.output += data
+        if len(self.output) >= SEND_BUFFER_SIZE:
+            self.flush()
+
+    def flush(self) -> None:
+        if self.output:
+            self.request.sendall(self.output)
+            self.output = bytearray()
+
+    def handle(self) -> None:
+        try:
+            if not self.startup():
+                return
+            while True:
+                type_code = self.read_exact(1)
+                length = struct.unpack("!i", self.read_exact(4))[0]
+                payload = self.read_exact(length - 4)
+                if type_code == b"X":
+                    return
+                self.dispatch(type_code, payload)
+        except (EOFError, ConnectionError):
+            pass
+        finally:
+            try:
+                self.flush()
+            except OSError:
+                pass
+
+    def startup(self) -> bool:
+        while True:
+            length = struct.unpack("!i", self.read_exact(4))[0]
+            payload = self.read_exact(length - 4)
+            code = struct.unpack("!i", payload[:4])[0]
+            if code in (SSL_REQUEST_CODE, GSSENC_REQUEST_CODE):
+                self.request.sendall(b"N")
+                continue
+            if code == CANCEL_REQUEST_CODE:
+                return False
+            if code != PROTOCOL_VERSION_3:
+                raise PgError("08P01", f"Unsupported protocol version {code}")
+            parts = payload[4:].split(b"\x00")
+            parameters = dict(zip(parts[0::2], parts[1::2]))
+            LOGGER.info(f"Connection from {self.client_address}: {parameters.get(b'user', b'').decode()}")
+            break
+        self.send(message(b"R", struct.pack("!i", 0)))
+        for name, value in SERVER_PARAMETERS.items():
+            self.send(message(b"S", cstr(name) + cstr(value)))
+        self.send(message(b"K", struct.pack("!ii", id(self) & 0x7FFFFFFF, 0)))
+        self.send_ready()
+        return True
+
+    def send_ready(self) -> None:
+        self.send(message(b"Z", self.transaction_status))
+        self.flush()
+
+    def send_error(self, error: PgError) -> None:
+        fields = b"SERROR\x00VERROR\x00C" + cstr(error.code) + b"M" + cstr(str(error)) + b"\x00"
+        self.send(message(b"E", fields))
+        if self.transaction_status == b"T":
+            self.transaction_status = b"E"
+
+    def dispatch(self, type_code: bytes, payload: bytes) -> None:
+        if type_code == b"Q":
+            self.simple_query(payload[:-1].decode())
+            return
+        if type_code == b"S":
+            self.skip_until_sync = False
+            self.send_ready()
+            return
+        if type_code == b"H":
+            self.flush()
+            return
+        if self.skip_until_sync:
+            return
+        try:
+            self.extended(type_code, payload)
+        except PgError as e:
+            self.send_error(e)
+            self.skip_until_sync = True
+
+    def simple_query(self, sql: str) -> None:
+        statements = split_statements(sql)
+        if not statements:
+            self.send(message(b"I"))
+        for statement in statements:
+            try:
+                plan = self.server.planner.plan(statement)
+                portal = Portal(plan=plan, formats=[])
+                self.execute(portal, 0, describe=True)
+            except PgError as e:
+                self.send_error(e)
+                break
+        self.send_ready()
+
+    def extended(self, type_code: bytes, payload: bytes) -> None:
+        if type_code == b"P":
+            name, rest = payload.split(b"\x00", 1)
+            query = rest.split(b"\x00", 1)[0].decode()
+            empty = not strip_comments(query).strip()
+            self.statements[name.decode()] = QueryPlan(tag="") if empty else self.server.planner.plan(query)
+            self.send(message(b"1"))
+        elif type_code == b"B":
+            portal_name, statement_name, rest = payload.split(b"\x00", 2)
+            formats = self.parse_bind_result_formats(rest)
+            plan = self.statements.get(statement_name.decode())
+            if plan is None:
+                raise PgError("26000", f'prepared statement "{statement_name.decode()}" does not exist')
+            self.portals[portal_name.decode()] = Portal(plan=plan, formats=formats)
+            self.send(message(b"2"))
+        elif type_code == b"D":
+            kind, name = payload[:1], payload[1:-1].decode()
+            if kind == b"S":
+                plan = self.statements[name]
+                self.send(message(b"t", struct.pack("!h", 0)))
+                self.send_row_description(self.result_columns(plan), [])
+            else:
+                portal = self.portals[name]
+                self.send_row_description(self.result_columns(portal.plan), portal.formats)
+        elif type_code == b"E":
+            name, rest = payload.split(b"\x00", 1)
+            max_rows = struct.unpack("!i", rest[:4])[0]
+            self.execute(self.portals[name.decode()], max_rows, describe=False)
+        elif type_code == b"C":
+            kind, name = payload[:1], payload[1:-1].decode()
+            (self.statements if kind == b"S" else self.portals).pop(name, None)
+            self.send(message(b"3"))
+        else:
+            raise PgError("08P01", f"Unsupported message type {type_code!r}")
+
+    @staticmethod
+    def parse_bind_result_formats(rest: bytes) -> list[int]:
+        offset = 0
+        format_count = struct.unpack_from("!h", rest, offset)[0]
+        offset += 2 + 2 * format_count
+        param_count = struct.unpack_from("!h", rest, offset)[0]
+        offset += 2
+        for _ in range(param_count):
+            length = struct.unpack_from("!i", rest, offset)[0]
+            offset += 4 + max(length, 0)
+        result_count = struct.unpack_from("!h", rest, offset)[0]
+        return list(struct.unpack_from(f"!{result_count}h", rest, offset + 2))
+
+    def result_columns(self, plan: QueryPlan) -> Optional[list[PgColumn]]:
+        if plan.tag == "FETCH":
+            cursor = self.cursors.get(plan.cursor)
+            return cursor.plan.columns if cursor else None
+        if plan.copy_format is not None:
+            return None
+        return plan.columns
+
+    def send_row_description(self, columns: Optional[list[PgColumn]], formats: list[int]) -> None:
+        if columns is None:
+            self.send(message(b"n"))
+            return
+        payload = struct.pack("!h", len(columns))
+        for column, format_code in zip(columns, self.expand_formats(formats, len(columns))):
+            payload += cstr(column.name) + struct.pack(
+                "!ihihih", 0, 0, column.type_oid, column.type_length, column.typmod, format_code
+            )
+        self.send(message(b"T", payload))
+
+    @staticmethod
+    def expand_formats(formats: list[int], column_count: int) -> list[int]:
+        if not formats:
+            return [FORMAT_TEXT] * column_count
+        if len(formats) == 1:
+            return formats * column_count
+        return formats
+
+    def execute(self, portal: Portal, max_rows: int, describe: bool) -> None:
+        plan = portal.plan
+        if plan.tag == "":
+            self.send(message(b"I"))
+            return
+        if plan.tag in ("BEGIN", "START TRANSACTION"):
+            self.transaction_status = b"T"
+        elif plan.tag in ("COMMIT", "ROLLBACK"):
+            self.transaction_status = b"I"
+        if plan.copy_format is not None:
+            self.copy_out(plan)
+            return
+        if plan.declare is not None:
+            name, inner, format_code = plan.declare
+            self.cursors[name] = Portal(plan=inner, formats=[format_code])
+            self.send(message(b"C", cstr(plan.tag)))
+            return
+        if plan.tag == "FETCH":
+            self.fetch_cursor(plan, portal.formats, describe)
+            return
+        if plan.tag == "CLOSE CURSOR":
+            self.cursors.pop(plan.cursor, None)
+        if plan.columns is None:
+            self.send(message(b"C", cstr(plan.tag)))
+            return
+        if describe:
+            self.send_row_description(plan.columns, portal.formats)
+        sent, finished = self.send_rows(portal, max_rows)
+        if finished:
+            self.send(message(b"C", cstr(f"SELECT {sent}")))
+        else:
+            self.send(message(b"s"))
+
+    def send_rows(self, portal: Portal, max_rows: int) -> tuple[int, bool]:
+        plan = portal.plan
+        formats = self.expand_formats(portal.formats, len(plan.columns))
+        if plan.source is None:
+            rows = plan.literal_rows[portal.position:]
+            if max_rows > 0:
+                rows = rows[:max_rows]
+            for row in rows:
+                self.send(data_row([encode_value(v, OID_TEXT, FORMAT_TEXT) for v in row]))
+            portal.position += len(rows)
+            return len(rows), portal.position >= len(plan.literal_rows)
+        remaining = plan.source.row_count - portal.position
+        count = remaining if max_rows <= 0 else min(max_rows, remaining)
+        for chunk in plan.source.encoded(portal.position, count, formats):
+            self.send(chunk)
+        portal.position += count
+        return count, portal.position >= plan.source.row_count
+
+    def fetch_cursor(self, plan: QueryPlan, formats: list[int], describe: bool) -> None:
+        cursor = self.cursors.get(plan.cursor)
+        if cursor is None:
+            raise PgError("34000", f'cursor "{plan.cursor}" does not exist')
+        if formats:
+            cursor.formats = formats
+        if describe:
+            self.send_row_description(cursor.plan.columns, cursor.formats)
+        sent, _ = self.send_rows(cursor, plan.fetch_count or 0)
+        self.send(message(b"C", cstr(f"FETCH {sent}")))
+
+    def copy_out(self, plan: QueryPlan) -> None:
+        binary = plan.copy_format == "binary"
+        columns = plan.columns or []
+        self.send(
+            message(b"H", struct.pack("!bh", int(binary), len(columns)) + struct.pack(f"!{len(columns)}h", *[int(binary)] * len(columns)))
+        )
+        row_count, header_sent = 0, not binary
+        if plan.source is not None and plan.source.row_count > 0:
+            formats = [FORMAT_BINARY if binary else FORMAT_TEXT] * len(columns)
+            start = 0
+            if binary:
+                # PostgreSQL sends the file header in the CopyData message of the first row
+                first_row = plan.source.encode_row(0, formats, "copy_binary")
+                self.send(message(b"d", COPY_BINARY_HEADER + first_row[5:]))
+                header_sent, start = True, 1
+            for chunk in plan.source.encoded(start, plan.source.row_count - start, formats, "copy_binary" if binary else "copy_text"):
+                self.send(chunk)
+            row_count = plan.source.row_count
+        if not header_sent:
+            self.send(message(b"d", COPY_BINARY_HEADER))
+        if plan.source is None:
+            for row in plan.literal_rows or []:
+                if binary:
+                    fields = [encode_value(v, OID_TEXT, FORMAT_BINARY) for v in row]
+                    self.send(message(b"d", copy_binary_tuple(fields)))
+                else:
+                    self.send(message(b"d", copy_text_line(row)))
+                row_count += 1
+        if binary:
+            self.send(message(b"d", COPY_BINARY_TRAILER))
+        self.send(message(b"c"))
+        self.send(message(b"C", cstr(f"COPY {row_count}")))
+
+
+class PgWireServer(socketserver.ThreadingTCPServer):
+    allow_reuse_address = True
+    daemon_threads = True
+
+    def __init__(self, address: tuple[str, int], table_rows: int, cycle_rows: int):
+        super().__init__(address, PgWireHandler)
+        self.planner = Planner(table_rows, cycle_rows)
+
+
+def parse_arguments() -> argparse.Namespace:
+    # noinspection PyTypeChecker
+    parser = argparse.ArgumentParser(
+        description="Synthetic PostgreSQL wire protocol server streaming deterministic lineitem rows.",
+        formatter_class=argparse.ArgumentDefaultsHelpFormatter,
+    )
+    parser.add_argument("--host", default="127.0.0.1", help="Listen address")
+    parser.add_argument("-p", "--port", type=int, default=15432, help="Listen port")
+    parser.add_argument("--table-rows", type=int, default=DEFAULT_TABLE_ROWS, help="Rows of lineitem without LIMIT")
+    parser.add_argument(
+        "--cycle-rows", type=int, default=DEFAULT_CYCLE_ROWS, help="Rows with distinct values, which are pre-encoded"
+    )
+    return parser.parse_args()
+
+
+def main() -> None:
+    logging.basicConfig(level=logging.INFO, format="%(levelname)s - %(name)s - %(message)s")
+    args = parse_arguments()
+    with PgWireServer((args.host, args.port), args.table_rows, args.cycle_rows) as server:
+        LOGGER.info(f"Listening on {args.host}:{args.port}")
+        server.serve_forever()
+
+
+if __name__ == "__main__":
+    main()
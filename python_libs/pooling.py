@@ -0,0 +1,231 @@
+import queue
+import random
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import ExitStack, contextmanager
+from time import perf_counter, sleep
+from typing import Any, Iterator, Optional
+
+import attrs
+
+from python_libs.config import Database, PoolingConfig
+from python_libs.consumers import make_consumer
+from python_libs.drivers import DriverPlugin, resolve_driver
+from python_libs.metrics import FetchMetrics
+from python_libs.result import PoolingResult
+from python_libs.stats import percentile
+
+STRATEGY_RECONNECT = "reconnect"
+STRATEGY_REUSE = "reuse"
+STRATEGY_POOL = "pool"
+ARRIVAL_POISSON = "poisson"
+ARRIVAL_UNIFORM = "uniform"
+
+
+@attrs.define(auto_attribs=True, kw_only=True)
+class QuerySample:
+    # milliseconds, latency is measured from the scheduled arrival, so it includes waiting for a free worker
+    latency: float = 0
+    # Time to obtain a connection: connect for reconnect, waiting for the connection or a pool slot otherwise
+    overhead: float = 0
+    rows: int = 0
+    error: Optional[str] = None
+
+
+class ConnectionStrategy:
+    """
+    Hands out connections of the driver to worker threads. Connections opened upfront are closed by close().
+    """
+
+    def __init__(self, driver: DriverPlugin, database: Database, pool_size: int):
+        self.driver = driver
+        self.database = database
+        self.pool_size = pool_size
+        self.stack = ExitStack()
+        self.connections = 0
+
+    def open(self) -> Any:
+        self.connections += 1
+        return self.stack.enter_context(self.driver.connect(self.database))
+
+    def open_upfront(self, count: int) -> list[Any]:
+        """
+        Opens count connections, those already opened are closed when one of them fails.
+        """
+        try:
+            return [self.open() for _ in range(count)]
+        except BaseException:
+            self.close()
+            raise
+
+    @contextmanager
+    def acquire(self) -> Iterator[Any]:
+        raise NotImplementedError
+
+    def close(self) -> None:
+        self.stack.close()
+
+
+class ReconnectStrategy(ConnectionStrategy):
+    """
+    New connection per query, closed when the query finishes.
+    """
+
+    def __init__(self, driver: DriverPlugin, database: Database, pool_size: int):
+        super().__init__(driver, database, pool_size)
+        self.counter_lock = threading.Lock()
+
+    @contextmanager
+    def acquire(self) -> Iterator[Any]:
+        with self.driver.connect(self.database) as connection:
+            with self.counter_lock:
+                self.connections += 1
+            yield connection
+
+
+class ReuseStrategy(ConnectionStrategy):
+    """
+    One connection reused by all queries. DB-API connections are not thread-safe, queries take turns.
+    """
+
+    def __init__(self, driver: DriverPlugin, database: Database, pool_size: int):
+        super().__init__(driver, database, pool_size)
+        self.lock = threading.Lock()
+        (self.connection,) = self.open_upfront(1)
+
+    @contextmanager
+    def acquire(self) -> Iterator[Any]:
+        with self.lock:
+            yield self.connection
+
+
+class PoolStrategy(ConnectionStrategy):
+    """
+    Bounded pool of pool_size connections opened upfront, shared by worker threads.
+    """
+
+    def __init__(self, driver: DriverPlugin, database: Database, pool_size: int):
+        super().__init__(driver, database, pool_size)
+        self.idle: queue.Queue = queue.Queue()
+        for connection in self.open_upfront(pool_size):
+            self.idle.put(connection)
+
+    @contextmanager
+    def acquire(self) -> Iterator[Any]:
+        connection = self.idle.get()
+        try:
+            yield connection
+        finally:
+            self.idle.put(connection)
+
+
+STRATEGIES: dict[str, type[ConnectionStrategy]] = {
+    STRATEGY_RECONNECT: ReconnectStrategy,
+    STRATEGY_REUSE: ReuseStrategy,
+    STRATEGY_POOL: PoolStrategy,
+}
+
+
+def check_strategy(name: str) -> None:
+    if name not in STRATEGIES:
+        raise ValueError(f"Unknown pooling strategy '{name}', use one of {list(STRATEGIES)}")
+
+
+def make_strategy(name: str, driver: DriverPlugin, database: Database, pool_size: int) -> ConnectionStrategy:
+    check_strategy(name)
+    return STRATEGIES[name](driver, database, pool_size)
+
+
+def arrival_times(rate: float, duration: float, arrival: str, seed: int) -> list[float]:
+    """
+    Offsets in seconds of query arrivals within duration, Poisson process or evenly spaced.
+    """
+    if arrival not in (ARRIVAL_POISSON, ARRIVAL_UNIFORM):
+        raise ValueError(f"Unknown arrival '{arrival}', use '{ARRIVAL_POISSON}' or '{ARRIVAL_UNIFORM}'")
+    rng = random.Random(seed)
+    times = []
+    offset = 0.0
+    while offset < duration:
+        times.append(offset)
+        offset += rng.expovariate(rate) if arrival == ARRIVAL_POISSON else 1 / rate
+    return times
+
+
+def run_query(
+    driver: DriverPlugin, strategy: ConnectionStrategy, query: str, arrival: float, consumer_mode: str
+) -> QuerySample:
+    sample = QuerySample()
+    try:
+        start = perf_counter()
+        with strategy.acquire() as connection:
+            sample.overhead = (perf_counter() - start) * 1000
+            sample.rows = driver.fetch(connection, query, FetchMetrics(), make_consumer(consumer_mode))
+    except Exception as e:
+        sample.error = str(e)
+    sample.latency = (perf_counter() - arrival) * 1000
+    return sample
+
+
+def run_pooling(
+    connection_type: str,
+    limit: int,
+    location_name: str,
+    database: Database,
+    query: str,
+    strategy_name: str,
+    arrival_rate: float,
+    config: PoolingConfig,
+) -> PoolingResult:
+    """
+    Open-loop load: queries arrive at arrival_rate per second regardless of how fast previous queries finish
+    and are executed by config.workers threads with connections handed out by the strategy.
+    """
+    driver = resolve_driver(database, connection_type)
+    samples: list[QuerySample] = []
+    connections = 0
+    elapsed = 0.0
+    error = None
+    try:
+        offsets = arrival_times(arrival_rate, config.duration, config.arrival, config.seed)
+        strategy = make_strategy(strategy_name, driver, database, config.pool_size)
+        try:
+            with ThreadPoolExecutor(max_workers=config.workers) as pool:
+                start = perf_counter()
+                futures = []
+                for offset in offsets:
+                    arrival = start + offset
+                    if (delay := arrival - perf_counter()) > 0:
+                        sleep(delay)
+                    futures.append(pool.submit(run_query, driver, strategy, query, arrival, config.consumer))
+                samples = [future.result() for future in futures]
+                elapsed = perf_counter() - start
+        finally:
+            connections = strategy.connections
+            strategy.close()
+    except Exception as e:
+        error = str(e)
+
+    succeeded = [s for s in samples if s.error is None]
+    latencies = [s.latency for s in succeeded]
+    overheads = [s.overhead for s in succeeded]
+    errors = [s.error for s in samples if s.error is not None]
+    return PoolingResult(
+        limit=limit,
+        location=location_name,
+        database=database.name,
+        connection_type=connection_type,
+        strategy=strategy_name,
+        arrival_rate=arrival_rate,
+        queries=len(succeeded),
+        queries_per_sec=len(succeeded) / elapsed if elapsed else 0,
+        rows=sum(s.rows for s in succeeded),
+        p50_latency=percentile(latencies, 50),
+        p95_latency=percentile(latencies, 95),
+        p99_latency=percentile(latencies, 99),
+        max_latency=max(latencies, default=0),
+        avg_overhead=sum(overheads) / len(overheads) if overheads else 0,
+        p95_overhead=percentile(overheads, 95),
+        connections=connections,
+        failed_queries=len(errors),
+        error=error or (errors[0] if errors else None),
+    )
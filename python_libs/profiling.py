@@ -0,0 +1,152 @@
+import os
+import shutil
+import signal
+import subprocess
+import sys
+import threading
+from collections import Counter
+from pathlib import Path
+from typing import Optional
+
+from python_libs.config import ProfilingConfig
+
+PROFILER_PY_SPY = "py-spy"
+PROFILER_PYTHON = "python"
+FORMAT_FLAMEGRAPH = "flamegraph"
+FORMAT_RAW = "raw"
+PY_SPY_TIMEOUT = 60
+
+
+class Profiler:
+    """
+    Sampling profiler of this process, a context manager sampling from enter to exit into path.
+    """
+
+    def __init__(self, config: ProfilingConfig, path: Path):
+        self.config = config
+        self.path = path
+
+    @staticmethod
+    def extension(config: ProfilingConfig) -> str:
+        raise NotImplementedError
+
+    def start(self) -> None:
+        raise NotImplementedError
+
+    def stop(self) -> None:
+        raise NotImplementedError
+
+    def __enter__(self) -> "Profiler":
+        self.start()
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb) -> None:
+        self.stop()
+
+
+class PySpyProfiler(Profiler):
+    """
+    py-spy attached to this process, it samples from its own process, so the overhead in the measured process
+    is only the short stop while a stack is read. Native frames (C, C++, Rust of drivers, pyarrow, libpq)
+    need native=True. Attaching to the parent process needs ptrace permission (kernel.yama.ptrace_scope=0 or root).
+    """
+
+    def __init__(self, config: ProfilingConfig, path: Path):
+        super().__init__(config, path)
+        self.process: Optional[subprocess.Popen] = None
+
+    @staticmethod
+    def extension(config: ProfilingConfig) -> str:
+        return "svg" if config.format == FORMAT_FLAMEGRAPH else "folded"
+
+    def start(self) -> None:
+        executable = shutil.which("py-spy")
+        if executable is None:
+            raise RuntimeError("py-spy is not installed, pip install py-spy or use the python profiler")
+        args = [
+            executable, "record", "--pid", str(os.getpid()), "--rate", str(self.config.rate),
+            "--format", self.config.format, "--output", str(self.path),
+        ]
+        if self.config.native:
+            args.append("--native")
+        self.process = subprocess.Popen(args, stdout=subprocess.DEVNULL, stderr=subprocess.PIPE, text=True)
+        # py-spy reports on stderr once it is attached and sampling
+        for line in self.process.stderr:
+            if "Sampling process" in line:
+                return
+        self.process.wait()
+        raise RuntimeError(f"py-spy failed to attach with exit code {self.process.returncode}")
+
+    def stop(self) -> None:
+        if self.process is None or self.process.poll() is not None:
+            return
+        # py-spy writes the output on Ctrl-C
+        self.process.send_signal(signal.SIGINT)
+        try:
+            self.process.communicate(timeout=PY_SPY_TIMEOUT)
+        except subprocess.TimeoutExpired:
+            self.process.kill()
+            raise
+
+
+class PythonProfiler(Profiler):
+    """
+    Built-in sampler reading stacks of all other threads by sys._current_frames(). Python frames only,
+    time spent in native code is attributed to the Python frame calling it. The sampler thread holds the GIL
+    while reading stacks, which costs more than py-spy. Writes collapsed stacks (flamegraph.pl, speedscope).
+    """
+
+    def __init__(self, config: ProfilingConfig, path: Path):
+        super().__init__(config, path)
+        self.stacks: Counter = Counter()
+        self.stopped = threading.Event()
+        self.thread = threading.Thread(target=self.sample, name="PythonProfiler", daemon=True)
+
+    @staticmethod
+    def extension(config: ProfilingConfig) -> str:
+        return "folded"
+
+    def sample(self) -> None:
+        interval = 1 / self.config.rate
+        own_id = threading.get_ident()
+        names = {}
+        while not self.stopped.wait(interval):
+            for thread_id, frame in sys._current_frames().items():
+                if thread_id == own_id:
+                    continue
+                if thread_id not in names:
+                    names = {thread.ident: thread.name for thread in threading.enumerate()}
+                frames = []
+                while frame is not None:
+                    frames.append(f"{frame.f_code.co_name} ({os.path.basename(frame.f_code.co_filename)})")
+                    frame = frame.f_back
+                self.stacks[";".join([names.get(thread_id, str(thread_id))] + frames[::-1])] += 1
+
+    def start(self) -> None:
+        self.thread.start()
+
+    def stop(self) -> None:
+        self.stopped.set()
+        self.thread.join()
+        with open(self.path, "w") as fp:
+            for stack, count in self.stacks.most_common():
+                fp.write(f"{stack} {count}\n")
+
+
+PROFILERS: dict[str, type[Profiler]] = {
+    PROFILER_PY_SPY: PySpyProfiler,
+    PROFILER_PYTHON: PythonProfiler,
+}
+
+
+def profile_extension(config: ProfilingConfig) -> str:
+    if config.profiler not in PROFILERS:
+        raise ValueError(f"Unknown profiler '{config.profiler}', use one of {list(PROFILERS)}")
+    return PROFILERS[config.profiler].extension(config)
+
+
+def make_profiler(config: ProfilingConfig, path: Path) -> Profiler:
+    if config.format not in (FORMAT_FLAMEGRAPH, FORMAT_RAW):
+        raise ValueError(f"Unknown profile format '{config.format}', use {FORMAT_FLAMEGRAPH} or {FORMAT_RAW}")
+    path.parent.mkdir(parents=True, exist_ok=True)
+    return PROFILERS[config.profiler](config, path)
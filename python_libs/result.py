@@ -1,9 +1,95 @@
-from typing import Optional
+from typing import Any, Optional
 
 import attrs
 from python_libs.config import Base
 
 
+@attrs.define(auto_attribs=True, kw_only=True)
+class BatchMetrics(Base):
+    # milliseconds since the query was started
+    arrival: float
+    rows: int
+    nbytes: int
+
+
+@attrs.define(auto_attribs=True, kw_only=True)
+class MemoryMetrics(Base):
+    # bytes
+    peak_rss_delta: int
+    # False if peak RSS could not be reset before the iteration (non-Linux)
+    peak_rss_reset: bool
+    arrow_peak: Optional[int]
+    arrow_allocated: int
+    arrow_backend: str
+    native_heap_delta: Optional[int]
+    retained_bytes: int
+
+
+@attrs.define(auto_attribs=True, kw_only=True)
+class IterationMetrics(Base):
+    # milliseconds, measured by the monotonic clock
+    duration: float
+    execute_duration: Optional[float]
+    first_batch_duration: Optional[float]
+    rows: int
+    nbytes: int
+    rows_per_sec: float
+    mb_per_sec: Optional[float]
+    batches: list[BatchMetrics]
+    memory: Optional[MemoryMetrics] = None
+    # Time until all batches were fetched, duration then includes consumer finish (e.g. draining the sink)
+    fetch_duration: Optional[float] = None
+    # Sink only, time spent in the file writer and size of the written file
+    write_duration: Optional[float] = None
+    written_bytes: Optional[int] = None
+    # CPU time of the process (all threads) during the iteration, milliseconds
+    user_cpu: Optional[float] = None
+    system_cpu: Optional[float] = None
+    # Conversion consumers only, time of the conversion into the dataframe (after fetch, part of duration),
+    # size of the dataframe and bytes of it not shared with fetched Arrow buffers
+    conversion_duration: Optional[float] = None
+    dataframe_bytes: Optional[int] = None
+    copied_bytes: Optional[int] = None
+    zero_copy: Optional[bool] = None
+
+
+@attrs.define(auto_attribs=True, kw_only=True)
+class DurationStats(Base):
+    # Measured iterations, milliseconds
+    iterations: int
+    median: float
+    p95: float
+    stdev: float
+    # 95% confidence interval of the median
+    ci_low: float
+    ci_high: float
+    # Iterations outside of Tukey fences (1.5 IQR)
+    outliers: int
+
+
+@attrs.define(auto_attribs=True, kw_only=True)
+class JvmMetrics(Base):
+    """
+    JMH statistics of a Java result, allocation and GC metrics only when the gc profiler ran.
+    """
+
+    # JMH score (average duration in milliseconds) and its 99.9% confidence half-width
+    score: Optional[float]
+    score_error: Optional[float]
+    # Percentile ("50.0", "99.0", ...) to milliseconds
+    percentiles: dict[str, float] = attrs.field(factory=dict)
+    alloc_mb_per_sec: Optional[float] = None
+    alloc_bytes_per_op: Optional[float] = None
+    # alloc_bytes_per_op divided by the row limit
+    alloc_bytes_per_row: Optional[float] = None
+    # Totals over measurement iterations, GC time in milliseconds
+    gc_count: Optional[float] = None
+    gc_time: Optional[float] = None
+    # CPU time of the benchmark JVM (all threads, incl. GC and JIT) per operation, milliseconds
+    cpu_time_per_op: Optional[float] = None
+    cpu_time_per_row_us: Optional[float] = None
+
+
 @attrs.define(auto_attribs=True, kw_only=True)
 class PythonResult(Base):
     limit: int
@@ -13,6 +99,26 @@ class PythonResult(Base):
     durations: list[float]
     avg_duration: float
     error: Optional[str]
+    # Async drivers only, event loop stall per iteration in milliseconds
+    loop_stalls: list[float] = attrs.field(factory=list)
+    max_loop_stall: Optional[float] = None
+    # Python drivers only, streaming metrics per iteration
+    iterations: list[IterationMetrics] = attrs.field(factory=list)
+    # What happened to fetched batches: discard, retain or table
+    consumer: Optional[str] = None
+    stats: Optional[DurationStats] = None
+    # Versions of driver packages, e.g. "turbodbc==4.5.10", Python drivers only
+    driver_version: Optional[str] = None
+    # Reused from the result cache, not measured in this run
+    cached: bool = False
+    # Run that measured the result, stored in the result cache
+    measured_run_id: Optional[str] = None
+    # Name of the query in config.queries
+    query: Optional[str] = None
+    # Java results only
+    jvm: Optional[JvmMetrics] = None
+    # Profile of measured iterations, with --profile
+    profile_file: Optional[str] = None
 
 
 @attrs.define(auto_attribs=True, kw_only=True)
@@ -20,19 +126,238 @@ class PythonResults(Base):
     results: list[PythonResult]
 
 
+@attrs.define(auto_attribs=True, kw_only=True)
+class AttributionResult(Base):
+    limit: int
+    location: str
+    database: str
+    connection_type: str
+    iterations: int
+    rows: int
+    # Medians over iterations in milliseconds, server duration is per execution of the query
+    duration: Optional[float]
+    server_duration: Optional[float]
+    # explain, pg_stat_statements or query_history, None if the database has no server timing
+    server_timing: Optional[str]
+    # User and system CPU time of the client process, all threads
+    client_cpu: Optional[float]
+    # Rest of the duration: network transfer and waiting (duration - server - client CPU, at least 0)
+    network_wait: Optional[float]
+    # Bytes received by network interfaces of the host per iteration, protocol headers included (Linux only)
+    received_bytes: Optional[int]
+    # server, client_cpu or network_wait, whichever takes most of the duration
+    bottleneck: Optional[str]
+    error: Optional[str]
+
+
+@attrs.define(auto_attribs=True, kw_only=True)
+class CostModelResult(Base):
+    """
+    Fitted duration = fixed_ms + per_row_us / 1000 * rows of one connection type over swept row counts.
+    """
+
+    query: Optional[str]
+    location: str
+    database: str
+    connection_type: str
+    # Row counts with results and their range
+    points: int
+    min_rows: int
+    max_rows: int
+    fixed_ms: Optional[float] = None
+    per_row_us: Optional[float] = None
+    # Largest relative difference between fitted and measured median duration
+    fit_error_pct: Optional[float] = None
+    # Predicted milliseconds by row count (config.sweep.extrapolate)
+    extrapolated: dict[int, float] = attrs.field(factory=dict)
+    error: Optional[str] = None
+
+
+@attrs.define(auto_attribs=True, kw_only=True)
+class CrossoverResult(Base):
+    query: Optional[str]
+    location: str
+    database: str
+    # Connection type with the lower fixed overhead and the one with the lower per-row cost
+    faster_below: str
+    faster_above: str
+    rows: int
+    # Predicted milliseconds of both at the crossover
+    duration: float
+    # False if the crossover is outside of row counts swept by both connection types
+    measured: bool
+
+
+@attrs.define(auto_attribs=True, kw_only=True)
+class TuningResult(Base):
+    limit: int
+    location: str
+    database: str
+    connection_type: str
+    method: str
+    # Number of searched option combinations
+    candidates: int
+    default_options: dict[str, Any]
+    best_options: Optional[dict[str, Any]]
+    # Median durations of the final head-to-head run in milliseconds
+    default_median: Optional[float]
+    best_median: Optional[float]
+    # default_median / best_median
+    speedup: Optional[float]
+    error: Optional[str]
+
+
+@attrs.define(auto_attribs=True, kw_only=True)
+class PoolingResult(Base):
+    limit: int
+    location: str
+    database: str
+    connection_type: str
+    strategy: str
+    # Scheduled queries per second
+    arrival_rate: float
+    queries: int
+    # Completed queries per second
+    queries_per_sec: float
+    rows: int
+    # milliseconds from the scheduled arrival
+    p50_latency: float
+    p95_latency: float
+    p99_latency: float
+    max_latency: float
+    # milliseconds to obtain a connection
+    avg_overhead: float
+    p95_overhead: float
+    # Connections opened
+    connections: int
+    failed_queries: int
+    error: Optional[str]
+
+
+@attrs.define(auto_attribs=True, kw_only=True)
+class ColdStartSample(Base):
+    """
+    Phases of one fresh process in milliseconds, measured by the process itself.
+    """
+
+    import_duration: Optional[float] = None
+    connect_duration: Optional[float] = None
+    # From start of the first query
+    first_execute_duration: Optional[float] = None
+    first_batch_duration: Optional[float] = None
+    first_query_duration: Optional[float] = None
+    steady_durations: list[float] = attrs.field(factory=list)
+    error: Optional[str] = None
+
+
+@attrs.define(auto_attribs=True, kw_only=True)
+class ColdStartResult(Base):
+    limit: int
+    location: str
+    database: str
+    connection_type: str
+    processes: int
+    # Medians over processes in milliseconds, process duration includes interpreter start and harness imports
+    process_duration: Optional[float]
+    import_duration: Optional[float]
+    connect_duration: Optional[float]
+    first_execute_duration: Optional[float]
+    first_batch_duration: Optional[float]
+    first_query_duration: Optional[float]
+    steady_duration: Optional[float]
+    error: Optional[str]
+
+
+@attrs.define(auto_attribs=True, kw_only=True)
+class LoadResult(Base):
+    limit: int
+    location: str
+    database: str
+    connection_type: str
+    executor: str
+    concurrency: int
+    # seconds
+    elapsed: float
+    queries: int
+    rows: int
+    rows_per_sec: float
+    queries_per_sec: float
+    # milliseconds
+    p50_latency: float
+    p95_latency: float
+    p99_latency: float
+    failed_clients: int
+    error: Optional[str]
+
+
+@attrs.define(auto_attribs=True, kw_only=True)
+class PrepareResult(Base):
+    location: str
+    database: str
+    scale_factor: float
+    rows: int
+    # Arrow size of generated batches
+    nbytes: int
+    # seconds, generation overlaps with the load and is included in duration
+    duration: float
+    generate_duration: float
+    rows_per_sec: float
+    mb_per_sec: float
+    error: Optional[str]
+
+
+@attrs.define(auto_attribs=True, kw_only=True)
+class RunInfo(Base):
+    run_id: str
+    # UTC, ISO 8601
+    timestamp: str
+    host: str
+    git_commit: Optional[str]
+    # Hash of config.yaml (without passwords) and the queries
+    config_hash: str
+
+
+@attrs.define(auto_attribs=True, kw_only=True)
+class ComparisonResult(Base):
+    query: Optional[str]
+    location: str
+    database: str
+    connection_type: str
+    limit: int
+    baseline_driver_version: Optional[str]
+    driver_version: Optional[str]
+    # milliseconds
+    baseline_median: float
+    median: float
+    change_pct: float
+    p_value: float
+    regression: bool
+    # The cell was reused from the result cache in the compared run, measured by measured_run_id
+    cached: bool = False
+    measured_run_id: Optional[str] = None
+
+
 @attrs.define(auto_attribs=True, kw_only=True)
 class JavaResultParams(Base):
     connectionType: str
     dbType: str
     limit: str
+    sqlFileNameIn: Optional[str] = None
 
 
 @attrs.define(auto_attribs=True, kw_only=True)
 class JavaResultMetric(Base):
-    rawData: list[list[float]]
+    # JMH writes "NaN" when the error cannot be computed (single iteration)
+    score: Optional[float] = None
+    scoreError: Optional[float] = None
+    scoreUnit: Optional[str] = None
+    scorePercentiles: dict[str, float] = attrs.field(factory=dict)
+    rawData: list[list[float]] = attrs.field(factory=list)
 
 
 @attrs.define(auto_attribs=True, kw_only=True)
 class JavaResult(Base):
     params: JavaResultParams
     primaryMetric: JavaResultMetric
+    # Profiler metrics, e.g. "gc.alloc.rate.norm" (older JMH versions prefix names with "·")
+    secondaryMetrics: dict[str, JavaResultMetric] = attrs.field(factory=dict)
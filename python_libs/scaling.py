@@ -0,0 +1,145 @@
+import itertools
+import math
+from collections import defaultdict
+from typing import Optional
+
+from python_libs.config import SweepConfig
+from python_libs.result import CostModelResult, CrossoverResult, PythonResult
+
+# Sweep points are rounded to this many significant digits
+SIGNIFICANT_DIGITS = 2
+
+
+def round_significant(value: float, digits: int = SIGNIFICANT_DIGITS) -> int:
+    scale = 10 ** max(0, math.floor(math.log10(value)) + 1 - digits)
+    return int(round(value / scale) * scale)
+
+
+def sweep_limits(bottom_limit: int, top_limit: int, points_per_decade: int) -> list[int]:
+    """
+    Geometric row counts from bottom_limit to top_limit (both included), points_per_decade per factor of 10.
+    """
+    if bottom_limit <= 0 or top_limit < bottom_limit:
+        raise ValueError(f"Sweep needs 0 < bottom_limit <= top_limit, got {bottom_limit} and {top_limit}")
+    steps = math.ceil(math.log10(top_limit / bottom_limit) * points_per_decade)
+    limits = {bottom_limit, top_limit}
+    for i in range(1, steps):
+        limits.add(round_significant(bottom_limit * 10 ** (i / points_per_decade)))
+    return sorted(limit for limit in limits if bottom_limit <= limit <= top_limit)
+
+
+def fit_cost_model(points: list[tuple[int, float]]) -> tuple[float, float]:
+    """
+    Least squares fit of duration = fixed + per_row * rows, returns fixed (ms) and per_row (ms).
+    Residuals are relative to the duration (weights 1/duration^2), so points with few rows keep their weight
+    against points with millions of rows. A negative fixed overhead is noise, the model is fitted through zero then.
+    """
+    weights = [1 / duration ** 2 for _, duration in points]
+    sw = sum(weights)
+    sx = sum(w * rows for w, (rows, _) in zip(weights, points))
+    sy = sum(w * duration for w, (_, duration) in zip(weights, points))
+    sxx = sum(w * rows * rows for w, (rows, _) in zip(weights, points))
+    sxy = sum(w * rows * duration for w, (rows, duration) in zip(weights, points))
+    determinant = sw * sxx - sx * sx
+    if determinant > 0:
+        per_row = (sw * sxy - sx * sy) / determinant
+        fixed = (sy - per_row * sx) / sw
+        if fixed >= 0:
+            return fixed, per_row
+    return 0.0, sxy / sxx
+
+
+def predict(model: CostModelResult, rows: int) -> float:
+    return model.fixed_ms + model.per_row_us / 1000 * rows
+
+
+def result_point(result: PythonResult) -> Optional[tuple[int, float]]:
+    """
+    Fetched rows (fewer than the limit when the table is smaller) and median duration of a result.
+    """
+    if result.error or not result.durations:
+        return None
+    rows = result.iterations[0].rows if result.iterations else result.limit
+    duration = result.stats.median if result.stats else result.avg_duration
+    return (rows, duration) if rows > 0 and duration > 0 else None
+
+
+def fit_cost_models(results: list[PythonResult], config: SweepConfig) -> list[CostModelResult]:
+    """
+    One model per query, location, database and connection type, from results of at least two row counts.
+    """
+    groups: dict[tuple, list[tuple[int, float]]] = defaultdict(list)
+    for result in results:
+        point = result_point(result)
+        if point is not None:
+            groups[(result.query, result.location, result.database, result.connection_type)].append(point)
+    models = []
+    for (query, location, database, connection_type), points in groups.items():
+        model = CostModelResult(
+            query=query,
+            location=location,
+            database=database,
+            connection_type=connection_type,
+            points=len(points),
+            min_rows=min(rows for rows, _ in points),
+            max_rows=max(rows for rows, _ in points),
+        )
+        if len({rows for rows, _ in points}) < 2:
+            model.error = "Less than two row counts"
+        else:
+            fixed, per_row = fit_cost_model(points)
+            model.fixed_ms = fixed
+            model.per_row_us = per_row * 1000
+            model.fit_error_pct = max(abs(predict(model, rows) - duration) / duration for rows, duration in points) * 100
+            model.extrapolated = {rows: predict(model, rows) for rows in config.extrapolate}
+        models.append(model)
+    return models
+
+
+def find_crossovers(models: list[CostModelResult]) -> list[CrossoverResult]:
+    """
+    Row counts where one connection type overtakes another of the same query, location and database.
+    The one with the lower fixed overhead is faster below the crossover, the one with the lower per-row cost above it.
+    """
+    groups: dict[tuple, list[CostModelResult]] = defaultdict(list)
+    for model in models:
+        if model.error is None:
+            groups[(model.query, model.location, model.database)].append(model)
+    crossovers = []
+    for (query, location, database), group in groups.items():
+        for first, second in itertools.combinations(group, 2):
+            if first.per_row_us == second.per_row_us:
+                continue
+            # fixed_1 + per_row_1 * rows = fixed_2 + per_row_2 * rows
+            rows = (second.fixed_ms - first.fixed_ms) / (first.per_row_us - second.per_row_us) * 1000
+            if rows <= 0:
+                continue
+            faster_below, faster_above = (first, second) if first.fixed_ms < second.fixed_ms else (second, first)
+            crossovers.append(
+                CrossoverResult(
+                    query=query,
+                    location=location,
+                    database=database,
+                    faster_below=faster_below.connection_type,
+                    faster_above=faster_above.connection_type,
+                    rows=int(rows),
+                    duration=predict(first, int(rows)),
+                    # Crossovers outside of swept row counts are extrapolated
+                    measured=max(first.min_rows, second.min_rows) <= rows <= min(first.max_rows, second.max_rows),
+                )
+            )
+    return sorted(crossovers, key=lambda c: (c.query or "", c.location, c.database, c.rows))
+
+
+def fastest_by_rows(models: list[CostModelResult], rows: int) -> dict[tuple, str]:
+    """
+    Connection type with the lowest predicted duration at rows per query, location and database.
+    """
+    fastest: dict[tuple, CostModelResult] = {}
+    for model in models:
+        if model.error is not None:
+            continue
+        key = (model.query, model.location, model.database)
+        if key not in fastest or predict(model, rows) < predict(fastest[key], rows):
+            fastest[key] = model
+    return {key: model.connection_type for key, model in fastest.items()}
@@ -0,0 +1,112 @@
+import queue
+import threading
+from pathlib import Path
+from time import perf_counter_ns
+from typing import Any, Optional
+
+import pyarrow as pa
+import pyarrow.parquet as pq
+
+from python_libs.config import SinkConfig
+from python_libs.consumers import BatchConsumer
+
+SINK_PARQUET = "parquet"
+SINK_IPC = "ipc"
+SINK_FEATHER = "feather"
+SINK_FILE_EXTENSIONS = {SINK_PARQUET: "parquet", SINK_IPC: "arrows", SINK_FEATHER: "feather"}
+# Signals the writer thread that no more batches arrive
+END_OF_STREAM = object()
+
+
+def open_writer(path: Path, schema: pa.Schema, config: SinkConfig) -> Any:
+    if config.format == SINK_PARQUET:
+        return pq.ParquetWriter(path, schema, compression=config.compression or "none")
+    options = pa.ipc.IpcWriteOptions(compression=config.compression)
+    if config.format == SINK_IPC:
+        return pa.ipc.new_stream(path, schema, options=options)
+    if config.format == SINK_FEATHER:
+        # Feather V2 is the Arrow IPC file format
+        return pa.ipc.new_file(path, schema, options=options)
+    raise ValueError(f"Unknown sink format '{config.format}', use one of {list(SINK_FILE_EXTENSIONS)}")
+
+
+class SinkConsumer(BatchConsumer):
+    """
+    Streams record batches into a Parquet, Arrow IPC stream or Feather file as they arrive.
+    With config.overlap, batches are written by a background thread, so writes overlap with the network fetch.
+    Batches are passed to the inner consumer too, so the consumer mode stays the same with or without the sink.
+    """
+
+    def __init__(self, inner: BatchConsumer, path: Path, config: SinkConfig):
+        self.inner = inner
+        self.path = path
+        self.config = config
+        self.writer: Any = None
+        self.write_ns = 0
+        self.written_bytes = 0
+        self.error: Optional[Exception] = None
+        self.queue: Optional[queue.Queue] = None
+        self.thread: Optional[threading.Thread] = None
+        if config.overlap:
+            self.queue = queue.Queue(maxsize=config.queue_size)
+            self.thread = threading.Thread(target=self.run, name=f"sink-{path.name}", daemon=True)
+            self.thread.start()
+
+    @property
+    def mode(self) -> str:
+        return self.inner.mode
+
+    def write(self, batch: pa.RecordBatch) -> None:
+        start = perf_counter_ns()
+        if self.writer is None:
+            self.writer = open_writer(self.path, batch.schema, self.config)
+        self.writer.write_batch(batch)
+        self.write_ns += perf_counter_ns() - start
+
+    def run(self) -> None:
+        while (batch := self.queue.get()) is not END_OF_STREAM:
+            if self.error is not None:
+                # Keep draining the queue, so the fetching thread does not block on a full queue
+                continue
+            try:
+                self.write(batch)
+            except Exception as e:
+                self.error = e
+
+    def consume(self, batch: Any) -> None:
+        if not isinstance(batch, pa.RecordBatch):
+            raise ValueError("Sink requires Arrow record batches")
+        self.inner.consume(batch)
+        if self.queue is not None:
+            self.queue.put(batch)
+        else:
+            self.write(batch)
+
+    def close(self) -> None:
+        """
+        Stops the writer thread and closes the file (footer included), also when the fetch failed midway.
+        """
+        if self.thread is not None:
+            self.queue.put(END_OF_STREAM)
+            self.thread.join()
+            self.thread = None
+        if self.writer is not None:
+            start = perf_counter_ns()
+            self.writer.close()
+            self.write_ns += perf_counter_ns() - start
+            self.writer = None
+            self.written_bytes = self.path.stat().st_size
+
+    def finish(self) -> None:
+        self.close()
+        if self.error is not None:
+            raise self.error
+        self.inner.finish()
+
+    @property
+    def write_duration(self) -> float:
+        return self.write_ns / 1_000_000
+
+    @property
+    def retained_bytes(self) -> int:
+        return self.inner.retained_bytes
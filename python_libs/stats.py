@@ -0,0 +1,138 @@
+import math
+import statistics
+from time import perf_counter
+from typing import Iterator, Optional
+
+from python_libs.config import AdaptiveConfig
+from python_libs.result import DurationStats
+
+# Two-sided 95% quantile of the standard normal distribution
+Z_95 = 1.959964
+# Tukey fences: values further than 1.5 IQR from the quartiles are outliers
+OUTLIER_IQR_FACTOR = 1.5
+
+
+def percentile(values: list[float], pct: float) -> float:
+    """
+    Percentile with linear interpolation between closest ranks (same as numpy default).
+    """
+    if not values:
+        return 0
+    ordered = sorted(values)
+    rank = (len(ordered) - 1) * pct / 100
+    lower = math.floor(rank)
+    upper = math.ceil(rank)
+    return ordered[lower] + (ordered[upper] - ordered[lower]) * (rank - lower)
+
+
+def median_confidence_interval(values: list[float]) -> tuple[float, float]:
+    """
+    Distribution-free 95% confidence interval of the median, order statistics at ranks n/2 -+ z * sqrt(n)/2.
+    With few values the interval is the whole range.
+    """
+    ordered = sorted(values)
+    n = len(ordered)
+    half_width = Z_95 * math.sqrt(n) / 2
+    lower = max(0, math.floor(n / 2 - half_width))
+    upper = min(n - 1, math.ceil(n / 2 + half_width))
+    return ordered[lower], ordered[upper]
+
+
+def count_outliers(values: list[float]) -> int:
+    q1, q3 = percentile(values, 25), percentile(values, 75)
+    fence = OUTLIER_IQR_FACTOR * (q3 - q1)
+    return sum(1 for v in values if v < q1 - fence or v > q3 + fence)
+
+
+def summarize(values: list[float]) -> Optional[DurationStats]:
+    if not values:
+        return None
+    ci_low, ci_high = median_confidence_interval(values)
+    return DurationStats(
+        iterations=len(values),
+        median=percentile(values, 50),
+        p95=percentile(values, 95),
+        stdev=statistics.stdev(values) if len(values) > 1 else 0,
+        ci_low=ci_low,
+        ci_high=ci_high,
+        outliers=count_outliers(values),
+    )
+
+
+def relative_ci_width(values: list[float]) -> float:
+    """
+    Width of the 95% confidence interval of the median in percent of the median.
+    """
+    median = percentile(values, 50)
+    if not median:
+        return 0
+    ci_low, ci_high = median_confidence_interval(values)
+    return (ci_high - ci_low) / median * 100
+
+
+class IterationSchedule:
+    """
+    Decides how many iterations of a use case run: warmup iterations (not measured) and then either a fixed number
+    of measured iterations or, in adaptive mode, iterations until the confidence interval of the median is narrow
+    enough, max_iterations is reached or the time budget runs out.
+    """
+
+    def __init__(self, iterations: int, warmup_iterations: int = 0, adaptive: Optional[AdaptiveConfig] = None):
+        self.iterations = iterations
+        self.warmup_iterations = warmup_iterations
+        self.adaptive = adaptive
+
+    def is_finished(self, durations: list[float], elapsed: float) -> bool:
+        if len(durations) < self.iterations:
+            return False
+        if self.adaptive is None:
+            return True
+        return (
+            relative_ci_width(durations) <= self.adaptive.ci_width_pct
+            or len(durations) >= self.adaptive.max_iterations
+            or elapsed >= self.adaptive.time_budget
+        )
+
+    def run(self, durations: list[float]) -> Iterator[tuple[int, bool]]:
+        """
+        Yields iteration number and whether it is a warmup iteration.
+        The caller appends durations of measured iterations to durations before the next step.
+        """
+        for i in range(1, self.warmup_iterations + 1):
+            yield i, True
+        start = perf_counter()
+        i = 0
+        while i == 0 or not self.is_finished(durations, perf_counter() - start):
+            i += 1
+            yield i, False
+
+
+def mann_whitney_greater(current: list[float], baseline: list[float]) -> float:
+    """
+    One-sided Mann-Whitney U test, p-value of the hypothesis that current values are greater than baseline values.
+    Normal approximation with tie and continuity correction.
+    """
+    n1, n2 = len(current), len(baseline)
+    if not n1 or not n2:
+        return 1.0
+    combined = sorted([(v, 0) for v in current] + [(v, 1) for v in baseline])
+    ranks = [0.0] * len(combined)
+    tie_sum = 0
+    i = 0
+    while i < len(combined):
+        j = i
+        while j + 1 < len(combined) and combined[j + 1][0] == combined[i][0]:
+            j += 1
+        for k in range(i, j + 1):
+            # Average rank of tied values, ranks start at 1
+            ranks[k] = (i + j) / 2 + 1
+        tie_sum += (j - i + 1) ** 3 - (j - i + 1)
+        i = j + 1
+    rank_sum = sum(rank for rank, (_, group) in zip(ranks, combined) if group == 0)
+    u = rank_sum - n1 * (n1 + 1) / 2
+    n = n1 + n2
+    variance = n1 * n2 / 12 * ((n + 1) - tie_sum / (n * (n - 1)))
+    if variance <= 0:
+        return 1.0
+    z = (u - n1 * n2 / 2 - 0.5) / math.sqrt(variance)
+    return 0.5 * math.erfc(z / math.sqrt(2))
@@ -0,0 +1,232 @@
+import io
+from time import perf_counter_ns
+from typing import Iterator
+
+import numpy as np
+import pyarrow as pa
+import pyarrow.csv
+
+from python_libs.config import Database, PrepareConfig
+from python_libs.drivers import DB_TYPE_POSTGRESQL, DB_TYPE_SNOWFLAKE, DB_TYPE_VERTICA, DRIVER_PLUGINS
+from python_libs.metrics import NS_IN_MS
+from python_libs.result import PrepareResult
+
+LINEITEM_TABLE = "lineitem"
+# Cardinalities at scale factor 1, lineitem has 1 to 7 lines per order (about 6M rows)
+ORDERS_PER_SCALE_FACTOR = 1_500_000
+PARTS_PER_SCALE_FACTOR = 200_000
+SUPPLIERS_PER_SCALE_FACTOR = 10_000
+START_DATE = np.datetime64("1992-01-01")
+CURRENT_DATE = np.datetime64("1995-06-17")
+END_DATE = np.datetime64("1998-12-31")
+# Orders are placed at least 151 days before END_DATE, so all lines are received by END_DATE
+ORDER_DATE_DAYS = int((END_DATE - np.timedelta64(151, "D") - START_DATE).astype(int))
+# Lines received before CURRENT_DATE are returned (R) or accepted (A) at random, later lines are not yet (N)
+RETURN_FLAGS = ["R", "A", "N"]
+SHIP_INSTRUCTS = ["DELIVER IN PERSON", "COLLECT COD", "NONE", "TAKE BACK RETURN"]
+SHIP_MODES = ["REG AIR", "AIR", "RAIL", "SHIP", "TRUCK", "MAIL", "FOB"]
+COMMENT_WORDS = [
+    "furiously", "sly", "careful", "blithe", "quick", "fluffy", "slow", "quiet", "ruthless", "thin", "close",
+    "dogged", "daring", "brave", "stealthy", "permanent", "enticing", "idle", "busy", "regular", "final",
+    "ironic", "even", "bold", "silent", "packages", "requests", "accounts", "deposits", "foxes", "ideas",
+    "theodolites", "pinto", "beans", "instructions", "dependencies", "excuses", "platelets", "asymptotes",
+    "courts", "dolphins", "sleep", "wake", "are", "cajole", "haggle", "nag", "use", "boost", "affix", "detect",
+    "integrate", "maintain", "nod", "was", "lose", "sublate", "solve", "thrash", "promise", "engage", "hinder",
+]
+# Comments are sampled from a pool, generating them per row would dominate the generation time
+COMMENT_POOL_SIZE = 100_000
+COMMENT_MAX_LENGTH = 43
+LINEITEM_COLUMNS = [
+    ("l_orderkey", pa.int64(), "BIGINT"),
+    ("l_partkey", pa.int64(), "BIGINT"),
+    ("l_suppkey", pa.int64(), "BIGINT"),
+    ("l_linenumber", pa.int32(), "INTEGER"),
+    ("l_quantity", pa.decimal128(15, 2), "NUMERIC(15, 2)"),
+    ("l_extendedprice", pa.decimal128(15, 2), "NUMERIC(15, 2)"),
+    ("l_discount", pa.decimal128(15, 2), "NUMERIC(15, 2)"),
+    ("l_tax", pa.decimal128(15, 2), "NUMERIC(15, 2)"),
+    ("l_returnflag", pa.string(), "VARCHAR(1)"),
+    ("l_linestatus", pa.string(), "VARCHAR(1)"),
+    ("l_shipdate", pa.date32(), "DATE"),
+    ("l_commitdate", pa.date32(), "DATE"),
+    ("l_receiptdate", pa.date32(), "DATE"),
+    ("l_shipinstruct", pa.string(), "VARCHAR(25)"),
+    ("l_shipmode", pa.string(), "VARCHAR(10)"),
+    ("l_comment", pa.string(), "VARCHAR(44)"),
+]
+LINEITEM_SCHEMA = pa.schema([(name, arrow_type) for name, arrow_type, _ in LINEITEM_COLUMNS])
+
+
+def decimal_array(cents: np.ndarray) -> pa.Array:
+    # decimal128 values are 16-byte little-endian two's complement integers, cents are never negative
+    words = np.zeros((len(cents), 2), dtype="<i8")
+    words[:, 0] = cents
+    return pa.Array.from_buffers(pa.decimal128(15, 2), len(cents), [None, pa.py_buffer(words)])
+
+
+def choice_array(values: list[str], indices: np.ndarray) -> pa.Array:
+    return pa.array(values).take(pa.array(indices))
+
+
+def make_comment_pool(rng: np.random.Generator) -> pa.Array:
+    words = rng.choice(COMMENT_WORDS, size=(COMMENT_POOL_SIZE, 8))
+    lengths = rng.integers(10, COMMENT_MAX_LENGTH + 1, COMMENT_POOL_SIZE)
+    return pa.array([" ".join(row)[:length].strip() for row, length in zip(words, lengths)])
+
+
+def generate_lineitem(config: PrepareConfig) -> Iterator[pa.RecordBatch]:
+    """
+    Generates TPC-H lineitem with dbgen value domains (not byte-identical with dbgen).
+    Columns are generated by NumPy for a chunk of config.orders_per_batch orders at a time, one record batch per chunk.
+    Each chunk has its own random generator seeded by config.seed and the chunk position, so output is deterministic.
+    """
+    scale_factor = config.scale_factor
+    order_count = int(ORDERS_PER_SCALE_FACTOR * scale_factor)
+    part_count = max(1, int(PARTS_PER_SCALE_FACTOR * scale_factor))
+    supplier_count = max(1, int(SUPPLIERS_PER_SCALE_FACTOR * scale_factor))
+    comment_pool = make_comment_pool(np.random.default_rng(config.seed))
+    for first_order in range(0, order_count, config.orders_per_batch):
+        rng = np.random.default_rng([config.seed, first_order])
+        order_index = np.arange(first_order, min(first_order + config.orders_per_batch, order_count), dtype=np.int64)
+        lines = rng.integers(1, 8, len(order_index))
+        # Order keys are sparse like in dbgen: 8 keys used out of every 32
+        order_keys = order_index // 8 * 32 + order_index % 8 + 1
+        orderkey = np.repeat(order_keys, lines)
+        row_count = len(orderkey)
+        linenumber = np.arange(row_count) - np.repeat(np.cumsum(lines) - lines, lines) + 1
+        orderdate = START_DATE + np.repeat(rng.integers(0, ORDER_DATE_DAYS, len(order_index)), lines)
+        partkey = rng.integers(1, part_count + 1, row_count)
+        suppkey = (partkey + rng.integers(0, 4, row_count) * (supplier_count // 4 + (partkey - 1) // supplier_count)) % supplier_count + 1
+        quantity = rng.integers(1, 51, row_count)
+        retail_price = 90_000 + (partkey // 10) % 20_001 + 100 * (partkey % 1_000)
+        shipdate = orderdate + rng.integers(1, 122, row_count)
+        commitdate = orderdate + rng.integers(30, 91, row_count)
+        receiptdate = shipdate + rng.integers(1, 31, row_count)
+        returnflag = np.where(receiptdate <= CURRENT_DATE, rng.integers(0, 2, row_count), 2)
+        yield pa.RecordBatch.from_arrays(
+            [
+                pa.array(orderkey),
+                pa.array(partkey),
+                pa.array(suppkey),
+                pa.array(linenumber.astype(np.int32)),
+                decimal_array(quantity * 100),
+                decimal_array(quantity * retail_price),
+                decimal_array(rng.integers(0, 11, row_count)),
+                decimal_array(rng.integers(0, 9, row_count)),
+                choice_array(RETURN_FLAGS, returnflag),
+                choice_array(["F", "O"], (shipdate > CURRENT_DATE).astype(np.int8)),
+                pa.array(shipdate),
+                pa.array(commitdate),
+                pa.array(receiptdate),
+                choice_array(SHIP_INSTRUCTS, rng.integers(0, len(SHIP_INSTRUCTS), row_count)),
+                choice_array(SHIP_MODES, rng.integers(0, len(SHIP_MODES), row_count)),
+                comment_pool.take(pa.array(rng.integers(0, COMMENT_POOL_SIZE, row_count))),
+            ],
+            schema=LINEITEM_SCHEMA,
+        )
+
+
+def folded_identifier(name: str, db_type: str) -> str:
+    """
+    Name of an unquoted identifier as stored in the catalog, which is needed by ADBC ingestion (quotes identifiers).
+    """
+    return name.upper() if db_type == DB_TYPE_SNOWFLAKE else name.lower()
+
+
+def create_lineitem_statements(schema: str) -> list[str]:
+    columns = ", ".join(f'"{name}" {sql_type}' for name, _, sql_type in LINEITEM_COLUMNS)
+    return [
+        f"CREATE SCHEMA IF NOT EXISTS {schema}",
+        f'DROP TABLE IF EXISTS {schema}."{LINEITEM_TABLE}"',
+        f'CREATE TABLE {schema}."{LINEITEM_TABLE}" ({columns})',
+    ]
+
+
+class GenerationTimer:
+    """
+    Wraps the generator and measures time spent in generation, which overlaps with the load.
+    """
+
+    def __init__(self, batches: Iterator[pa.RecordBatch]):
+        self.batches = batches
+        self.generate_ns = 0
+        self.rows = 0
+        self.nbytes = 0
+
+    def __iter__(self) -> Iterator[pa.RecordBatch]:
+        while True:
+            start = perf_counter_ns()
+            batch = next(self.batches, None)
+            self.generate_ns += perf_counter_ns() - start
+            if batch is None:
+                return
+            self.rows += batch.num_rows
+            self.nbytes += batch.nbytes
+            yield batch
+
+
+def ingest_adbc(database: Database, schema: str, batches: GenerationTimer) -> None:
+    """
+    ADBC bulk ingestion: COPY ... FROM STDIN (FORMAT BINARY) in PostgreSQL, Parquet files staged by PUT in Snowflake.
+    """
+    with DRIVER_PLUGINS["python_adbc"].connect(database) as connection:
+        with connection.cursor() as cursor:
+            for statement in create_lineitem_statements(schema):
+                cursor.execute(statement)
+            reader = pa.RecordBatchReader.from_batches(LINEITEM_SCHEMA, iter(batches))
+            cursor.adbc_ingest(
+                LINEITEM_TABLE, reader, mode="append", db_schema_name=folded_identifier(schema, database.db_type)
+            )
+        connection.commit()
+
+
+def ingest_vertica(database: Database, schema: str, batches: GenerationTimer) -> None:
+    """
+    Vertica has no ADBC driver, batches are written as CSV by Arrow and streamed by COPY ... FROM STDIN.
+    """
+    with DRIVER_PLUGINS["python_vertica"].connect(database) as connection:
+        cursor = connection.cursor()
+        for statement in create_lineitem_statements(schema):
+            cursor.execute(statement)
+        copy = f'COPY {schema}."{LINEITEM_TABLE}" FROM STDIN DELIMITER \',\' ENCLOSED BY \'"\' DIRECT'
+        write_options = pyarrow.csv.WriteOptions(include_header=False)
+        for batch in batches:
+            buffer = io.BytesIO()
+            pyarrow.csv.write_csv(batch, buffer, write_options=write_options)
+            cursor.copy(copy, buffer.getvalue())
+        connection.commit()
+
+
+INGESTERS = {
+    DB_TYPE_POSTGRESQL: ingest_adbc,
+    DB_TYPE_SNOWFLAKE: ingest_adbc,
+    DB_TYPE_VERTICA: ingest_vertica,
+}
+
+
+def load_lineitem(location_name: str, database: Database, config: PrepareConfig) -> PrepareResult:
+    """
+    Generates lineitem and streams it into the database while generating, the table is recreated.
+    """
+    batches = GenerationTimer(generate_lineitem(config))
+    start = perf_counter_ns()
+    error = None
+    try:
+        if database.db_type not in INGESTERS:
+            raise ValueError(f"Loading {database.db_type} is not supported, use one of {list(INGESTERS)}")
+        INGESTERS[database.db_type](database, config.schema, batches)
+    except Exception as e:
+        error = str(e)
+    seconds = (perf_counter_ns() - start) / NS_IN_MS / 1000
+    return PrepareResult(
+        location=location_name,
+        database=database.name,
+        scale_factor=config.scale_factor,
+        rows=batches.rows,
+        nbytes=batches.nbytes,
+        duration=seconds,
+        generate_duration=batches.generate_ns / NS_IN_MS / 1000,
+        rows_per_sec=batches.rows / seconds if seconds else 0,
+        mb_per_sec=batches.nbytes / 1024 / 1024 / seconds if seconds else 0,
+        error=error,
+    )
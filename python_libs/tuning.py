@@ -0,0 +1,107 @@
+import itertools
+import math
+from typing import Any, Callable, Optional
+
+from python_libs.config import Database, TuningConfig
+from python_libs.drivers import DRIVER_PLUGINS, DriverPlugin
+from python_libs.result import TuningResult
+from python_libs.stats import percentile
+
+METHOD_GRID = "grid"
+METHOD_HALVING = "halving"
+
+# Measures the driver configured with options and returns measured durations in milliseconds, raises on failure
+Measure = Callable[[DriverPlugin, int], list[float]]
+
+
+def make_candidates(space: dict[str, list[Any]]) -> list[dict[str, Any]]:
+    names = list(space)
+    return [dict(zip(names, values)) for values in itertools.product(*(space[name] for name in names))]
+
+
+def measure_median(driver: DriverPlugin, options: dict[str, Any], iterations: int, measure: Measure) -> float:
+    durations = measure(driver.with_options(options), iterations)
+    if not durations:
+        raise RuntimeError(f"No durations measured with {options}")
+    return percentile(durations, 50)
+
+
+def search_grid(
+    driver: DriverPlugin, candidates: list[dict[str, Any]], config: TuningConfig, measure: Measure
+) -> dict[str, Any]:
+    medians = [measure_median(driver, options, config.iterations, measure) for options in candidates]
+    return candidates[medians.index(min(medians))]
+
+
+def search_halving(
+    driver: DriverPlugin, candidates: list[dict[str, Any]], config: TuningConfig, measure: Measure
+) -> dict[str, Any]:
+    """
+    Successive halving: every round measures remaining candidates, keeps the fastest 1/eta of them
+    and multiplies iterations by eta, so most of the budget goes to promising candidates.
+    """
+    iterations = config.iterations
+    while len(candidates) > 1:
+        medians = [measure_median(driver, options, iterations, measure) for options in candidates]
+        ranked = sorted(range(len(candidates)), key=lambda i: medians[i])
+        keep = max(1, math.ceil(len(candidates) / config.eta))
+        candidates = [candidates[i] for i in ranked[:keep]]
+        iterations *= config.eta
+    return candidates[0]
+
+
+SEARCHES = {
+    METHOD_GRID: search_grid,
+    METHOD_HALVING: search_halving,
+}
+
+
+def tune_driver(
+    driver: DriverPlugin,
+    limit: int,
+    location_name: str,
+    database: Database,
+    config: TuningConfig,
+    measure: Measure,
+) -> Optional[TuningResult]:
+    """
+    Searches options of the driver, then measures the best and default options head to head.
+    Defaults are reported as best when the search winner is not faster than them.
+    Returns None when the driver has nothing to tune for the database.
+    """
+    space = driver.tuning_space(database)
+    if not space:
+        return None
+    if config.method not in SEARCHES:
+        raise ValueError(f"Unknown tuning method '{config.method}', use one of {list(SEARCHES)}")
+    if config.eta < 2:
+        raise ValueError("Tuning eta must be at least 2")
+    candidates = make_candidates(space)
+    # Library defaults of the plugin, the driver may carry driver_options of the config
+    defaults = {name: DRIVER_PLUGINS[driver.connection_type].options[name] for name in space}
+    best = None
+    default_median = best_median = None
+    error = None
+    try:
+        best = SEARCHES[config.method](driver, candidates, config, measure)
+        default_median = measure_median(driver, defaults, config.final_iterations, measure)
+        best_median = measure_median(driver, best, config.final_iterations, measure)
+        if best_median >= default_median:
+            # The search winner lost the head-to-head, the defaults stay the best options
+            best, best_median = defaults, default_median
+    except Exception as e:
+        error = str(e)
+    return TuningResult(
+        limit=limit,
+        location=location_name,
+        database=database.name,
+        connection_type=driver.connection_type,
+        method=config.method,
+        candidates=len(candidates),
+        default_options=defaults,
+        best_options=best,
+        default_median=default_median,
+        best_median=best_median,
+        speedup=default_median / best_median if default_median and best_median else None,
+        error=error,
+    )
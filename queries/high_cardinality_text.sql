@@ -0,0 +1,6 @@
+-- Long, mostly unique text values
+SELECT
+  "l_comment" as line_comment,
+  "l_shipinstruct" || ' ' || "l_comment" as instruction_comment,
+  CAST("l_orderkey" AS VARCHAR(20)) || '-' || CAST("l_linenumber" AS VARCHAR(2)) || ' ' || "l_comment" as keyed_comment
+FROM tpch_1D0g."lineitem"
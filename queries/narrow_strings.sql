@@ -0,0 +1,6 @@
+-- Three short low-cardinality strings, same as query.sql
+SELECT
+  "l_shipmode" as ship_mode,
+  "l_linestatus" as line_status,
+  "l_returnflag" as return_flag
+FROM tpch_1D0g."lineitem"
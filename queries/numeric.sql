@@ -0,0 +1,12 @@
+-- Integers and NUMERIC(15, 2) decimals
+SELECT
+  "l_orderkey" as order_key,
+  "l_partkey" as part_key,
+  "l_suppkey" as supplier_key,
+  "l_linenumber" as line_number,
+  "l_quantity" as quantity,
+  "l_extendedprice" as extended_price,
+  "l_discount" as discount,
+  "l_tax" as tax,
+  "l_extendedprice" * (1 - "l_discount") * (1 + "l_tax") as charge
+FROM tpch_1D0g."lineitem"
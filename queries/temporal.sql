@@ -0,0 +1,9 @@
+-- Dates and timestamps
+SELECT
+  "l_shipdate" as ship_date,
+  "l_commitdate" as commit_date,
+  "l_receiptdate" as receipt_date,
+  CAST("l_shipdate" AS TIMESTAMP) as ship_timestamp,
+  CAST("l_commitdate" AS TIMESTAMP) as commit_timestamp,
+  CAST("l_receiptdate" AS TIMESTAMP) as receipt_timestamp
+FROM tpch_1D0g."lineitem"
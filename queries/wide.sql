@@ -0,0 +1,55 @@
+-- 52 columns of mixed types
+SELECT
+  "l_orderkey",
+  "l_partkey",
+  "l_suppkey",
+  "l_linenumber",
+  "l_quantity",
+  "l_extendedprice",
+  "l_discount",
+  "l_tax",
+  "l_returnflag",
+  "l_linestatus",
+  "l_shipdate",
+  "l_commitdate",
+  "l_receiptdate",
+  "l_shipinstruct",
+  "l_shipmode",
+  "l_comment",
+  "l_orderkey" + 1 as orderkey_1,
+  "l_extendedprice" * 1 as price_1,
+  "l_shipmode" || '_1' as shipmode_1,
+  "l_shipdate" + 1 as shipdate_1,
+  "l_orderkey" + 2 as orderkey_2,
+  "l_extendedprice" * 2 as price_2,
+  "l_shipmode" || '_2' as shipmode_2,
+  "l_shipdate" + 2 as shipdate_2,
+  "l_orderkey" + 3 as orderkey_3,
+  "l_extendedprice" * 3 as price_3,
+  "l_shipmode" || '_3' as shipmode_3,
+  "l_shipdate" + 3 as shipdate_3,
+  "l_orderkey" + 4 as orderkey_4,
+  "l_extendedprice" * 4 as price_4,
+  "l_shipmode" || '_4' as shipmode_4,
+  "l_shipdate" + 4 as shipdate_4,
+  "l_orderkey" + 5 as orderkey_5,
+  "l_extendedprice" * 5 as price_5,
+  "l_shipmode" || '_5' as shipmode_5,
+  "l_shipdate" + 5 as shipdate_5,
+  "l_orderkey" + 6 as orderkey_6,
+  "l_extendedprice" * 6 as price_6,
+  "l_shipmode" || '_6' as shipmode_6,
+  "l_shipdate" + 6 as shipdate_6,
+  "l_orderkey" + 7 as orderkey_7,
+  "l_extendedprice" * 7 as price_7,
+  "l_shipmode" || '_7' as shipmode_7,
+  "l_shipdate" + 7 as shipdate_7,
+  "l_orderkey" + 8 as orderkey_8,
+  "l_extendedprice" * 8 as price_8,
+  "l_shipmode" || '_8' as shipmode_8,
+  "l_shipdate" + 8 as shipdate_8,
+  "l_orderkey" + 9 as orderkey_9,
+  "l_extendedprice" * 9 as price_9,
+  "l_shipmode" || '_9' as shipmode_9,
+  "l_shipdate" + 9 as shipdate_9
+FROM tpch_1D0g."lineitem"
@@ -1,13 +1,21 @@
 package perfjdbc;
 
+import java.util.List;
+
 public class ConfigBase {
     public String query;
     public Integer measurement_iterations;
+    // Named queries, default is query
+    public List<ConfigQuery> queries;
+    // JMH profilers, e.g. gc
+    public List<String> java_profilers;
 
     @Override
     public String toString() {
         return "BasicConfig{" +
                 "query='" + query + '\'' +
+                ", queries=" + queries +
+                ", java_profilers=" + java_profilers +
                 '}';
     }
 }
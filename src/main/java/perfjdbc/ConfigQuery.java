@@ -0,0 +1,14 @@
+package perfjdbc;
+
+public class ConfigQuery {
+    public String name;
+    public String file;
+
+    @Override
+    public String toString() {
+        return "ConfigQuery{" +
+                "name='" + name + '\'' +
+                ", file='" + file + '\'' +
+                '}';
+    }
+}
@@ -0,0 +1,43 @@
+package perfjdbc;
+
+import com.sun.management.OperatingSystemMXBean;
+import org.openjdk.jmh.infra.BenchmarkParams;
+import org.openjdk.jmh.infra.IterationParams;
+import org.openjdk.jmh.profile.InternalProfiler;
+import org.openjdk.jmh.results.AggregationPolicy;
+import org.openjdk.jmh.results.IterationResult;
+import org.openjdk.jmh.results.Result;
+import org.openjdk.jmh.results.ScalarResult;
+
+import java.lang.management.ManagementFactory;
+import java.util.Collection;
+import java.util.List;
+
+/**
+ * CPU time of the benchmark JVM (user and system, all threads incl. GC and JIT) per operation,
+ * reported as the secondary metric cpu.time.norm next to wall time.
+ */
+public class CpuTimeProfiler implements InternalProfiler {
+    private final OperatingSystemMXBean osBean =
+            (OperatingSystemMXBean) ManagementFactory.getOperatingSystemMXBean();
+    private long startCpuNs;
+
+    @Override
+    public String getDescription() {
+        return "Process CPU time per operation";
+    }
+
+    @Override
+    public void beforeIteration(BenchmarkParams benchmarkParams, IterationParams iterationParams) {
+        startCpuNs = osBean.getProcessCpuTime();
+    }
+
+    @Override
+    public Collection<? extends Result> afterIteration(BenchmarkParams benchmarkParams, IterationParams iterationParams,
+                                                       IterationResult result) {
+        long cpuNs = osBean.getProcessCpuTime() - startCpuNs;
+        long ops = result.getMetadata().getMeasuredOps();
+        double cpuMsPerOp = ops == 0 ? Double.NaN : cpuNs / 1_000_000.0 / ops;
+        return List.of(new ScalarResult("cpu.time.norm", cpuMsPerOp, "ms/op", AggregationPolicy.AVG));
+    }
+}
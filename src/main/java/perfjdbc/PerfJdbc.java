@@ -10,6 +10,7 @@ import org.apache.arrow.adbc.core.AdbcDatabase;
 import org.apache.arrow.adbc.core.AdbcDriver;
 import org.apache.arrow.adbc.core.AdbcException;
 import org.apache.arrow.adbc.core.AdbcStatement;
+import org.apache.arrow.adbc.driver.flightsql.FlightSqlDriver;
 import org.apache.arrow.adbc.driver.jdbc.JdbcDriver;
 import org.apache.arrow.memory.BufferAllocator;
 import org.apache.arrow.memory.RootAllocator;
@@ -37,12 +38,16 @@ import java.nio.file.Path;
 import java.sql.Connection;
 import java.sql.DriverManager;
 import java.sql.ResultSet;
+import java.sql.ResultSetMetaData;
 import java.sql.SQLException;
 import java.sql.Statement;
+import java.sql.Types;
+import java.util.Arrays;
 import java.util.HashMap;
 import java.util.List;
 import java.util.Map;
 import java.util.concurrent.TimeUnit;
+import java.util.stream.Collectors;
 
 public class PerfJdbc {
     // 128 MB
@@ -54,15 +59,14 @@ public class PerfJdbc {
     }
 
     public enum DbType {
-        POSTGRESQL, SNOWFLAKE, VERTICA
+        POSTGRESQL, SNOWFLAKE, VERTICA, FLIGHTSQL
     }
 
     @State(Scope.Benchmark)
     public static class Params {
         @Param({"query.sql"})
         String sqlFileNameIn;
-        // For the future usage, if we need to distinguish between different databases in the test
-        @SuppressWarnings("unused")
+        // FLIGHTSQL databases use the native ADBC Flight SQL driver
         @Param("POSTGRESQL")
         DbType dbType;
         @Param({"org.postgresql.Driver"})
@@ -73,7 +77,10 @@ public class PerfJdbc {
         String user;
         @Param({"passw0rd"})
         String password;
-        @Param({"1000", "10000", "100000", "1000000", "10000000"})
+        // FLIGHTSQL only, ADBC connects to grpc://host:port natively instead of wrapping JDBC
+        @Param({""})
+        String flightUri;
+        @Param({"1000", "10000", "100000", "1000000", "5000000"})
         String limit;
         @Param({"JDBC", "JDBC_ARROW", "ADBC"})
         ConnectionType connectionType;
@@ -110,14 +117,24 @@ public class PerfJdbc {
 
             if (ConnectionType.JDBC == connectionType || ConnectionType.JDBC_ARROW == connectionType) {
                 Class.forName(driver);
-                c = DriverManager.getConnection(url, user, dbPassword);
+                // Flight SQL servers without authentication reject the handshake sent with credentials
+                c = user.isEmpty() ? DriverManager.getConnection(url) : DriverManager.getConnection(url, user, dbPassword);
             }
             if (ConnectionType.ADBC == connectionType) {
                 final Map<String, Object> parameters = new HashMap<>();
-                parameters.put(AdbcDriver.PARAM_URI.getKey(), url);
-                parameters.put(AdbcDriver.PARAM_USERNAME.getKey(), user);
-                parameters.put(AdbcDriver.PARAM_PASSWORD.getKey(), dbPassword);
-                adb = new JdbcDriver(bufferAllocator).open(parameters);
+                if (DbType.FLIGHTSQL == dbType) {
+                    parameters.put(AdbcDriver.PARAM_URI.getKey(), flightUri);
+                    if (!user.isEmpty()) {
+                        parameters.put(AdbcDriver.PARAM_USERNAME.getKey(), user);
+                        parameters.put(AdbcDriver.PARAM_PASSWORD.getKey(), dbPassword);
+                    }
+                    adb = new FlightSqlDriver(bufferAllocator).open(parameters);
+                } else {
+                    parameters.put(AdbcDriver.PARAM_URI.getKey(), url);
+                    parameters.put(AdbcDriver.PARAM_USERNAME.getKey(), user);
+                    parameters.put(AdbcDriver.PARAM_PASSWORD.getKey(), dbPassword);
+                    adb = new JdbcDriver(bufferAllocator).open(parameters);
+                }
                 ac = adb.connect();
             }
         }
@@ -160,11 +177,17 @@ public class PerfJdbc {
                     stmt = params.c.createStatement();
                     //noinspection SqlSourceToSinkFlow
                     rs = stmt.executeQuery(params.query);
+                    // Column types are resolved once per query, each value is read by the getter of its type
+                    ResultSetMetaData metaData = rs.getMetaData();
+                    int columnCount = metaData.getColumnCount();
+                    int[] columnTypes = new int[columnCount];
+                    for (int i = 0; i < columnCount; i++) {
+                        columnTypes[i] = metaData.getColumnType(i + 1);
+                    }
                     while (rs.next()) {
-                        // We rely on that the SQL query returns exactly 3 columns
-                        bh.consume(rs.getString(1));
-                        bh.consume(rs.getString(2));
-                        bh.consume(rs.getString(3));
+                        for (int i = 0; i < columnCount; i++) {
+                            consumeColumn(bh, rs, i + 1, columnTypes[i]);
+                        }
                     }
                     break;
                 case JDBC_ARROW:
@@ -194,6 +217,50 @@ public class PerfJdbc {
         }
     }
 
+    private static void consumeColumn(Blackhole bh, ResultSet rs, int column, int type) throws SQLException {
+        switch (type) {
+            case Types.SMALLINT:
+            case Types.INTEGER:
+                bh.consume(rs.getInt(column));
+                break;
+            case Types.BIGINT:
+                bh.consume(rs.getLong(column));
+                break;
+            case Types.REAL:
+            case Types.FLOAT:
+            case Types.DOUBLE:
+                bh.consume(rs.getDouble(column));
+                break;
+            case Types.NUMERIC:
+            case Types.DECIMAL:
+                bh.consume(rs.getBigDecimal(column));
+                break;
+            case Types.BOOLEAN:
+            case Types.BIT:
+                bh.consume(rs.getBoolean(column));
+                break;
+            case Types.DATE:
+                bh.consume(rs.getDate(column));
+                break;
+            case Types.TIME:
+                bh.consume(rs.getTime(column));
+                break;
+            case Types.TIMESTAMP:
+            case Types.TIMESTAMP_WITH_TIMEZONE:
+                bh.consume(rs.getTimestamp(column));
+                break;
+            default:
+                bh.consume(rs.getString(column));
+        }
+    }
+
+    private static List<String> getQueryFiles(ConfigPerf configPerf) {
+        if (configPerf.config.queries == null || configPerf.config.queries.isEmpty()) {
+            return List.of(configPerf.config.query);
+        }
+        return configPerf.config.queries.stream().map(q -> q.file).collect(Collectors.toList());
+    }
+
     private static ChainedOptionsBuilder getChainedOptionsBuilder(String locationName, ConfigDatabase database,  ConfigPerf configPerf) {
         ChainedOptionsBuilder opt = new OptionsBuilder()
                 .include(PerfJdbc.class.getSimpleName())
@@ -206,22 +273,46 @@ public class PerfJdbc {
                 .warmupIterations(1)
                 .measurementIterations(configPerf.config.measurement_iterations)
                 .measurementTime(TimeValue.seconds(Long.parseLong(database.measurement_duration)));
-        opt = opt.param("sqlFileNameIn", configPerf.config.query);
+        // CPU time per operation is always reported, it costs two system calls per iteration
+        opt = opt.addProfiler(CpuTimeProfiler.class);
+        if (configPerf.config.java_profilers != null) {
+            for (String profiler : configPerf.config.java_profilers) {
+                // gc adds gc.alloc.rate, gc.alloc.rate.norm (bytes per operation), gc.count and gc.time,
+                // options follow the name like on the JMH command line, e.g. async:libPath=...;output=flamegraph
+                String[] nameAndOptions = profiler.split(":", 2);
+                opt = nameAndOptions.length == 2
+                        ? opt.addProfiler(nameAndOptions[0], nameAndOptions[1])
+                        : opt.addProfiler(profiler);
+            }
+        }
+        // Results report the SQL file, the Python runner maps it back to the query name
+        opt = opt.param("sqlFileNameIn", getQueryFiles(configPerf).toArray(new String[0]));
         opt = opt.param("dbType", database.db_type);
         opt = opt.param("driver", database.jdbc_driver_class);
         opt = opt.param("url", database.jdbc_url);
-        opt = opt.param("user", database.user);
+        opt = opt.param("user", database.user == null ? "" : database.user);
+        if (DbType.FLIGHTSQL.name().equals(database.db_type)) {
+            opt = opt.param("flightUri", String.format("grpc://%s:%s", database.host, database.port));
+        }
 
         opt = opt.param("password", database.password);
-        if (database.connection_types != null && !database.connection_types.isEmpty()) {
-            opt = opt.param("connectionType", database.connection_types.toArray(new String[0]));
+        // connection_types is shared with the Python runner, pick only connection types known here
+        List<String> connectionTypes = database.connection_types == null ? List.of() : database.connection_types.stream()
+                .filter(ct -> Arrays.stream(ConnectionType.values()).anyMatch(v -> v.name().equals(ct)))
+                .collect(Collectors.toList());
+        if (!connectionTypes.isEmpty()) {
+            opt = opt.param("connectionType", connectionTypes.toArray(new String[0]));
         } else {
             // Default is all connection types
             opt = opt.param("connectionType", List.of("JDBC", "JDBC_ARROW", "ADBC").toArray(new String[0]));
         }
-        String bottomLimit = database.bottom_limit != null ? database.bottom_limit : ROW_LIMITS.get(0);
-        String topLimit = database.top_limit != null ? database.top_limit : ROW_LIMITS.get(ROW_LIMITS.size() - 1);
-        List<String> limits = ROW_LIMITS.subList(ROW_LIMITS.indexOf(bottomLimit), ROW_LIMITS.indexOf(topLimit) + 1);
+        // Same selection as the Python runner, bounds do not have to be on the ladder
+        long bottomLimit = Long.parseLong(database.bottom_limit != null ? database.bottom_limit : ROW_LIMITS.get(0));
+        long topLimit = Long.parseLong(
+                database.top_limit != null ? database.top_limit : ROW_LIMITS.get(ROW_LIMITS.size() - 1));
+        List<String> limits = ROW_LIMITS.stream()
+                .filter(limit -> bottomLimit <= Long.parseLong(limit) && Long.parseLong(limit) <= topLimit)
+                .collect(Collectors.toList());
         opt = opt.param("limit", limits.toArray(new String[0]));
         return opt;
     }
@@ -0,0 +1,56 @@
+import asyncio
+from typing import Any
+
+from poc_drivers import PoCDbDriversExecutor
+from python_libs.async_drivers import AsyncDriverPlugin
+from python_libs.config import AsyncConfig, Database, Location
+from python_libs.consumers import CONSUMER_DISCARD
+from python_libs.stats import IterationSchedule
+
+
+class FlakyDriver(AsyncDriverPlugin):
+    """
+    Fails to open every third connection, the others open after the failure.
+    """
+
+    connection_type = "python_flaky"
+
+    def __init__(self):
+        self.attempts = 0
+        self.opened = []
+        self.closed = []
+
+    async def connect(self, database: Database) -> Any:
+        self.attempts += 1
+        number = self.attempts
+        if number % 3 == 0:
+            raise ConnectionRefusedError(f"connection {number} refused")
+        await asyncio.sleep(0.01)
+        self.opened.append(number)
+        return number
+
+    async def close(self, connection: Any) -> None:
+        self.opened.remove(connection)
+        self.closed.append(connection)
+
+
+def test_connections_closed_when_connect_fails():
+    database = Database(name="db", db_type="postgres", host="", db_name="", user="", password="", odbc_driver_path="")
+    driver = FlakyDriver()
+    result = asyncio.run(
+        PoCDbDriversExecutor(None).execute_use_case_async(
+            driver.connection_type,
+            100,
+            Location(name="local", databases=[database]),
+            database,
+            "SELECT l_orderkey FROM lineitem",
+            driver,
+            4,
+            IterationSchedule(iterations=1),
+            AsyncConfig(),
+            CONSUMER_DISCARD,
+        )
+    )
+    assert result.error == "connection 3 refused"
+    assert driver.opened == []
+    assert sorted(driver.closed) == [1, 2, 4]
@@ -0,0 +1,63 @@
+from contextlib import nullcontext
+from typing import Any, Iterator
+
+import pyarrow as pa
+import pytest
+
+from python_libs import attribution
+from python_libs.attribution import ServerTiming, select_probe
+from python_libs.config import AttributionConfig, Database
+from python_libs.drivers import DRIVER_PLUGINS, DriverPlugin
+from python_libs.metrics import FetchMetrics
+
+DATABASE = Database(name="db", db_type="POSTGRESQL", host="", db_name="", user="", password="", odbc_driver_path="")
+
+
+class FakeDriver(DriverPlugin):
+    connection_type = "python_fake"
+    db_types = ("POSTGRESQL",)
+
+    def connect(self, database: Database) -> Any:
+        return nullcontext(self)
+
+    def cursor(self) -> Any:
+        # Probe cursor, FailingTiming does not use it
+        return self
+
+    def close(self) -> None:
+        pass
+
+    def fetch_batches(self, connection: Any, query: str, metrics: FetchMetrics) -> Iterator[pa.RecordBatch]:
+        metrics.mark_executed()
+        yield pa.record_batch({"x": pa.array(range(100))})
+
+
+class FailingTiming(ServerTiming):
+    name = "failing"
+    db_types = ("POSTGRESQL",)
+    probe_connection_types = (FakeDriver.connection_type,)
+
+    def finish(self, cursor: Any, query: str, iterations: int) -> None:
+        raise RuntimeError("pg_stat_statements is not installed")
+
+
+def test_probe_falls_back_to_installed_plugin(monkeypatch):
+    timing = attribution.ExplainTiming()
+    installed = {"python_psycopg3_copy"}
+    monkeypatch.setattr(attribution, "is_installed", lambda plugin, database: plugin.connection_type in installed)
+    assert select_probe(timing, DRIVER_PLUGINS["python_adbc"], DATABASE).connection_type == "python_psycopg3_copy"
+    # A measured driver able to run the timing statements probes by its own plugin
+    assert select_probe(timing, DRIVER_PLUGINS["python_psycopg2"], DATABASE).connection_type == "python_psycopg2"
+    installed.clear()
+    with pytest.raises(RuntimeError, match="needs one of"):
+        select_probe(timing, DRIVER_PLUGINS["python_adbc"], DATABASE)
+
+
+def test_failed_server_timing_leaves_split_empty(monkeypatch):
+    monkeypatch.setattr(attribution, "select_server_timing", lambda database, config: FailingTiming())
+    result = attribution.run_attribution(
+        FakeDriver(), 100, "local", DATABASE, "SELECT x", AttributionConfig(iterations=3), "discard"
+    )
+    assert result.error == "pg_stat_statements is not installed"
+    assert result.duration is not None and result.client_cpu is not None
+    assert result.network_wait is None and result.bottleneck is None
@@ -0,0 +1,40 @@
+from python_libs.config import HistoryConfig
+from python_libs.history import append_run, compare_runs, read_history, select_runs
+from python_libs.result import PythonResult, PythonResults, RunInfo
+
+
+def make_result(durations: list[float], cached: bool = False, measured_run_id=None) -> PythonResult:
+    return PythonResult(
+        query="query",
+        limit=1000,
+        location="local",
+        database="postgres",
+        connection_type="python_psycopg2",
+        durations=durations,
+        avg_duration=sum(durations) / len(durations),
+        error=None,
+        cached=cached,
+        measured_run_id=measured_run_id,
+    )
+
+
+def make_run_info(run_id: str) -> RunInfo:
+    return RunInfo(run_id=run_id, timestamp="", host="host", git_commit=None, config_hash="hash")
+
+
+def test_compare_cached_run(tmp_path):
+    config = HistoryConfig(path=str(tmp_path))
+    durations = [10.0, 11.0, 12.0, 10.5, 11.5]
+    append_run(config, make_run_info("1"), PythonResults(results=[make_result(durations)]))
+    # Second run reused the cell measured by the first one
+    cached = make_result(durations, cached=True, measured_run_id="1")
+    append_run(config, make_run_info("2"), PythonResults(results=[cached]))
+
+    history = read_history(config)
+    current, baseline = select_runs(history, None, None)
+    assert (current["run_id"], baseline["run_id"]) == ("2", "1")
+    (comparison,) = compare_runs(history, "2", "1", config)
+    assert comparison.cached and comparison.measured_run_id == "1"
+    assert comparison.change_pct == 0 and not comparison.regression
+    (measured,) = {row["measured_run_id"] for row in history if row["run_id"] == "1"}
+    assert measured == "1"
@@ -0,0 +1,67 @@
+from datetime import datetime
+from decimal import Decimal
+from pathlib import Path
+
+import pytest
+
+from python_libs.pgwire_server import (
+    OID_NUMERIC,
+    OID_TEXT,
+    OID_TIMESTAMP,
+    Planner,
+    PgError,
+    encode_numeric_binary,
+    split_statements,
+    strip_comments,
+)
+
+ROOT = Path(__file__).resolve().parent.parent
+SHIPPED_QUERIES = [ROOT / "query.sql"] + sorted((ROOT / "queries").glob("*.sql"))
+
+
+def test_strip_comments():
+    sql = "-- header; not a statement\nSELECT '--x' /* block; */, \"a--b\" -- tail\nFROM lineitem"
+    assert strip_comments(sql).split() == ["SELECT", "'--x'", ",", '"a--b"', "FROM", "lineitem"]
+    assert split_statements(sql + ";") == [strip_comments(sql).strip()]
+
+
+@pytest.mark.parametrize("path", SHIPPED_QUERIES, ids=lambda path: path.name)
+def test_plan_shipped_query(path: Path):
+    plan = Planner(1_000_000, 1_000).plan(path.read_text() + " LIMIT 100")
+    assert plan.tag == "SELECT"
+    assert plan.source.row_count == 100
+    assert len(plan.columns) == len(plan.source.values)
+
+
+def plan_one(expression: str):
+    plan = Planner(1_000, 100).plan(f"SELECT {expression} AS x FROM lineitem")
+    return plan.columns[0], plan.source.values[0]
+
+
+def test_select_expressions():
+    column, value = plan_one('"l_extendedprice" * (1 - "l_discount") * (1 + "l_tax")')
+    assert column.type_oid == OID_NUMERIC
+    assert value(3) == Decimal("3600.12") * Decimal("0.97") * Decimal("1.03")
+    column, value = plan_one("CAST(l_shipdate AS TIMESTAMP)")
+    assert column.type_oid == OID_TIMESTAMP and value(0) == datetime(1992, 1, 2)
+    column, value = plan_one("CAST(\"l_orderkey\" AS VARCHAR(20)) || '-' || l_linenumber::text")
+    assert column.type_oid == OID_TEXT and column.is_key and value(5) == "2-2"
+
+
+def test_unsupported_expression():
+    with pytest.raises(PgError, match="Expression not supported"):
+        plan_one("upper(l_comment)")
+
+
+@pytest.mark.parametrize("value", ["0.03", "3600.12", "0.00", "-0.5", "12345678.0001", "100"])
+def test_encode_numeric_binary(value: str):
+    # numeric_send of PostgreSQL 14
+    expected = {
+        "0.03": "0001ffff00000002012c",
+        "3600.12": "00020000000000020e1004b0",
+        "0.00": "0000000000000002",
+        "-0.5": "0001ffff400000011388",
+        "12345678.0001": "000300010000000404d2162e0001",
+        "100": "00010000000000000064",
+    }
+    assert encode_numeric_binary(Decimal(value)).hex() == expected[value]
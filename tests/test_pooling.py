@@ -0,0 +1,48 @@
+from contextlib import contextmanager
+from typing import Any, Iterator
+
+import pytest
+
+from python_libs.config import Database
+from python_libs.drivers import DriverPlugin
+from python_libs.pooling import STRATEGY_POOL, make_strategy
+
+DATABASE = Database(name="db", db_type="POSTGRESQL", host="", db_name="", user="", password="", odbc_driver_path="")
+
+
+class FlakyDriver(DriverPlugin):
+    """
+    Fails to open the third connection.
+    """
+
+    connection_type = "python_flaky"
+    db_types = ("POSTGRESQL",)
+
+    def __init__(self):
+        self.attempts = 0
+        self.open = set()
+
+    @contextmanager
+    def connect(self, database: Database) -> Iterator[Any]:
+        self.attempts += 1
+        if self.attempts == 3:
+            raise ConnectionRefusedError("too many connections")
+        number = self.attempts
+        self.open.add(number)
+        try:
+            yield number
+        finally:
+            self.open.remove(number)
+
+
+def test_unknown_strategy():
+    with pytest.raises(ValueError, match="Unknown pooling strategy 'x', use one of"):
+        make_strategy("x", FlakyDriver(), DATABASE, 4)
+
+
+def test_pool_closes_opened_connections_when_one_fails():
+    driver = FlakyDriver()
+    with pytest.raises(ConnectionRefusedError):
+        make_strategy(STRATEGY_POOL, driver, DATABASE, 4)
+    assert driver.attempts == 3
+    assert driver.open == set()
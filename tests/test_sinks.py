@@ -0,0 +1,47 @@
+import threading
+from contextlib import contextmanager
+
+import pyarrow as pa
+import pyarrow.parquet as pq
+import pytest
+
+from poc_drivers import PATH_TO_RESULT_FILES, PoCDbDriversExecutor
+from python_libs.config import Database, Location, SinkConfig
+from python_libs.consumers import CONSUMER_DISCARD
+from python_libs.stats import IterationSchedule
+
+
+@contextmanager
+def fake_connect():
+    yield None
+
+
+def fetch_and_fail(connection, query, metrics, consumer):
+    for i in range(2):
+        consumer.consume(pa.record_batch({"l_orderkey": pa.array(range(i * 100, (i + 1) * 100))}))
+    raise ConnectionError("connection reset by peer")
+
+
+@pytest.mark.parametrize("overlap", [True, False])
+def test_sink_closed_when_fetch_fails(tmp_path, monkeypatch, overlap: bool):
+    monkeypatch.chdir(tmp_path)
+    PATH_TO_RESULT_FILES.mkdir(parents=True)
+    database = Database(name="db", db_type="postgres", host="", db_name="", user="", password="", odbc_driver_path="")
+    result = PoCDbDriversExecutor(None).execute_use_case(
+        "fake",
+        200,
+        Location(name="local", databases=[database]),
+        database,
+        "SELECT l_orderkey FROM lineitem",
+        fake_connect,
+        {},
+        IterationSchedule(iterations=1),
+        fetch_and_fail,
+        CONSUMER_DISCARD,
+        sink_config=SinkConfig(overlap=overlap),
+    )
+    assert result.error == "connection reset by peer"
+    assert not any(thread.name.startswith("sink-") for thread in threading.enumerate())
+    # Batches fetched before the failure are in a readable file
+    (path,) = PATH_TO_RESULT_FILES.iterdir()
+    assert pq.read_table(path).num_rows == 200
@@ -0,0 +1,27 @@
+from python_libs.config import Database, TuningConfig
+from python_libs.drivers import DRIVER_PLUGINS
+from python_libs.tuning import tune_driver
+
+DATABASE = Database(name="db", db_type="POSTGRESQL", host="", db_name="", user="", password="", odbc_driver_path="")
+
+
+def tune(default_duration: float, tuned_duration: float):
+    driver = DRIVER_PLUGINS["python_adbc"]
+
+    def measure(tuned, iterations: int) -> list[float]:
+        return [default_duration if tuned.options == driver.options else tuned_duration] * iterations
+
+    return tune_driver(driver, 1000, "local", DATABASE, TuningConfig(), measure)
+
+
+def test_tuned_options_faster():
+    result = tune(default_duration=9, tuned_duration=8)
+    assert result.best_options != result.default_options
+    assert result.speedup == 9 / 8
+
+
+def test_defaults_kept_when_not_faster():
+    result = tune(default_duration=9, tuned_duration=10)
+    assert result.best_options == result.default_options
+    assert result.best_median == result.default_median
+    assert result.speedup == 1.0